@@ -0,0 +1,69 @@
+import vrep
+from vrep.const import *
+from vrep.vrchk import vrchk
+from vrep.loopback import LoopbackServer
+from functools import wraps
+from time import perf_counter as timer
+
+# Measures the per-call cost of the python layer of the remote API clients, with calls that do not
+# wait for the server (simx_opmode_oneshot setters and simx_opmode_buffer getters):
+#
+# - before: the functions wrapped with the previous validate_output decorator (below);
+# - after: the functions as they are called now (validate_output fast path).
+#
+# The ctypes binding is only measured if the remoteApi library is available for this platform.
+
+calls = 100000
+
+
+def legacy_validate_output(func):
+    # validate_output as it was: vrchk on every call and tuple slicing of the outputs
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if isinstance(result, tuple):
+            vrchk(result[0])
+            if len(result) == 2:
+                return result[1]
+            return tuple(result[1:])
+        vrchk(result)
+    return wrapper
+
+
+def per_call(function, *args):
+    start = timer()
+    for _ in range(calls):
+        function(*args)
+    return (timer() - start) / calls * 1e9
+
+
+def measure(name, client, handle):
+    cls = type(client)
+    for function, args in [('simxSetJointTargetVelocity', (handle, 0.5, simx_opmode_oneshot)),
+                           ('simxGetJointPosition', (handle, simx_opmode_buffer)),
+                           ('simxGetIntegerSignal', ('signal', simx_opmode_buffer))]:
+        legacy = legacy_validate_output(getattr(cls, function).__wrapped__)
+        before = per_call(legacy, client, *args)
+        after = per_call(getattr(client, function), *args)
+        print('%-7s %-27s before: %6.0f ns/call  after: %6.0f ns/call' %
+              (name, function, before, after))
+
+
+if __name__ == '__main__':
+    server = LoopbackServer(objects=['joint']).start()
+    server.integer_signals[b'signal\0'] = 1
+    clients = [('python', vrep.RemoteVRep)]
+    if vrep.libsimx is not None:
+        clients.append(('ctypes', vrep.CVRep))
+    else:
+        print('ctypes backend: remoteApi library not available on this platform')
+
+    for name, cls in clients:
+        client = cls('127.0.0.1', server.port, True, True, 2000, 5)
+        handle = client.simxGetObjectHandle('joint', simx_opmode_blocking)
+        client.simxGetJointPosition(handle, simx_opmode_streaming)
+        client.simxGetIntegerSignal('signal', simx_opmode_streaming)
+        client.simxGetPingTime()
+        measure(name, client, handle)
+        cls.simxFinish(client.clientID)
+    server.stop()
@@ -0,0 +1,133 @@
+import numpy as np
+from time import perf_counter as timer
+from youbot import YouBot
+from youbot.scan import hokuyo_range
+from youbot.transforms import homtrans, transl, trotx, troty, trotz
+
+# Measures YouBot.hokuyo_read on synthetic scans of 2x684 beams, without a simulator: the client
+# below returns the same two aux packets at every read, so only the processing of the scan is
+# timed (the target is under 50 us per scan).
+#
+# - before: hokuyo_read as it was (homogeneous coordinates, hstack, 4x4 products at every call);
+# - after: the polar scans (distances only), with and without computing the points (in the
+#   buffer of the geometry).
+#
+# The size and copy time of a scan are compared as well (scan histories, logs).
+
+beams = 684
+reads = 10000
+target = 50
+
+# Perspective angle of the subsensors of the Hokuyo
+view_angle = 2 * np.pi / 3
+
+
+def perspective_beams(width, angle=view_angle):
+    # Directions (3xN unit vectors) of the beams of a perspective vision sensor of width x 1
+    # pixels, in its frame: the sensor looks along its z axis and its pixels are evenly spaced on
+    # the image plane (in the tangent of the angle of the beams, not in angle).
+    x = np.tan(angle / 2) * ((np.arange(width) + .5) / width * 2 - 1)
+    directions = np.vstack((x, np.zeros(width), np.ones(width)))
+    return directions / np.linalg.norm(directions, axis=0)
+
+
+class SyntheticHokuyo:
+    # Client answering simxReadVisionSensor with the scans of a room by the Hokuyo of a youBot
+    # (see synthetic_youbot): the walls are lines n . (x, y) = c and the pillars are circles
+    # (x, y, radius) in the ref frame of the robot, the beams without obstacle stop at the range
+    # of the sensor.
+    def __init__(self, youbot, widths=(beams, beams),
+                 walls=(((1, 0), 3), ((0, 1), 2)), pillars=((1.5, .5, .3),)):
+        self.packets = {}
+        for handle, trans, width in zip((youbot.hokuyo1, youbot.hokuyo2),
+                                        (youbot.hokuyo1_trans, youbot.hokuyo2_trans), widths):
+            directions = perspective_beams(width)
+            distances = self.distances(trans[:2, 3], np.dot(trans[:2, :3], directions), walls,
+                                       pillars)
+            points = np.empty((width, 4), np.float32)
+            points[:, :3] = (directions * distances).T
+            points[:, 3] = distances
+            self.packets[handle] = [np.zeros(15, np.float32),
+                                    np.concatenate(([width, 1], points.ravel())).astype(np.float32)]
+
+    @staticmethod
+    def distances(origin, directions, walls, pillars):
+        # Distance to the first obstacle along each beam (directions: 2xN, horizontal unit vectors)
+        distances = np.full(directions.shape[1], hokuyo_range)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for normal, c in walls:
+                t = (c - np.dot(normal, origin)) / np.dot(normal, directions)
+                distances = np.where(t > 0, np.minimum(distances, t), distances)
+            for x, y, radius in pillars:
+                offset = origin - (x, y)
+                b = np.dot(offset, directions)
+                t = -b - np.sqrt(b ** 2 - np.dot(offset, offset) + radius ** 2)
+                distances = np.where(t > 0, np.minimum(distances, t), distances)
+        return distances
+
+    def simxReadVisionSensor(self, sensorHandle, operationMode, asArray=False):
+        return False, self.packets[sensorHandle]
+
+
+def legacy_hokuyo_read(youbot, vrep, opmode, trans=None):
+    t1 = youbot.hokuyo1_trans
+    t2 = youbot.hokuyo2_trans
+    if trans is not None:
+        t1 = np.dot(trans, youbot.hokuyo1_trans)
+        t2 = np.dot(trans, youbot.hokuyo2_trans)
+    _, aux_data = vrep.simxReadVisionSensor(youbot.hokuyo1, opmode, asArray=True)
+    pts1 = aux_data[1][2:].reshape((-1, 4)).T
+    obst1 = pts1[3, :] < 4.9999
+    pts1 = pts1[:3, :]
+    _, aux_data = vrep.simxReadVisionSensor(youbot.hokuyo2, opmode, asArray=True)
+    pts2 = aux_data[1][2:].reshape((-1, 4)).T
+    obst2 = pts2[3, :] < 4.9999
+    pts2 = pts2[:3, :]
+    return np.hstack((homtrans(t1, pts1), homtrans(t2, pts2))), np.hstack((obst1, obst2))
+
+
+def synthetic_youbot():
+    # A YouBot with the Hokuyo geometry of the scene, without connecting to a simulator
+    youbot = YouBot.__new__(YouBot)
+    youbot.hokuyo1, youbot.hokuyo2 = 1, 2
+    youbot.hokuyo_geometry = None
+    # The subsensors look forward, 60 degrees to the left and to the right, their x axis (the
+    # rows of their pixels) horizontal
+    youbot.hokuyo1_trans = transl([0.2, 0.03, 0.1]) @ trotz(np.pi / 3) @ troty(np.pi / 2) @ \
+                           trotz(np.pi / 2)
+    youbot.hokuyo2_trans = transl([0.2, -0.03, 0.1]) @ trotz(-np.pi / 3) @ troty(np.pi / 2) @ \
+                           trotz(np.pi / 2)
+    return youbot
+
+
+def per_read(function, *args):
+    start = timer()
+    for _ in range(reads):
+        function(*args)
+    return (timer() - start) / reads * 1e6
+
+
+if __name__ == '__main__':
+    youbot = synthetic_youbot()
+    vrep = SyntheticHokuyo(youbot)
+    pose = transl([1, 2, 0]) @ trotx(0.01) @ troty(-0.02) @ trotz(0.5)
+
+    for name, trans in [('robot frame', None), ('world frame', pose)]:
+        points, contacts = legacy_hokuyo_read(youbot, vrep, 0, trans)
+        scan = youbot.hokuyo_read(vrep, 0, trans)
+        assert np.allclose(points, scan.points, atol=1e-4)
+        assert np.array_equal(contacts, scan.contacts)
+        before = per_read(legacy_hokuyo_read, youbot, vrep, 0, trans)
+        after = per_read(youbot.hokuyo_read, vrep, 0, trans)
+        points = per_read(lambda: youbot.hokuyo_read(vrep, 0, trans).points)
+        print('%-12s before: %6.1f us/scan  after: %6.1f us/scan  with the points: %6.1f us/scan '
+              '(%s the %d us target)' % (name, before, after, points,
+                                         'under' if points < target else 'OVER', target))
+
+    points, contacts = legacy_hokuyo_read(youbot, vrep, 0)
+    scan = youbot.hokuyo_read(vrep, 0)
+    for name, size, copy in [
+            ('before', points.nbytes + contacts.nbytes, lambda: (points.copy(), contacts.copy())),
+            ('float32', scan.nbytes(), scan.copy),
+            ('uint16', scan.quantized().nbytes(), scan.quantized().copy)]:
+        print('%-12s %6d bytes/scan  copy: %5.2f us' % (name, size, per_read(copy)))
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from time import perf_counter as timer
+
+# Cold start of `import vrep, youbot`, in a fresh interpreter each time (as paid by short-lived
+# tools and the worker processes of vrep/pool.py): best wall time of the whole process, and the
+# modules that take the most time to import (python -X importtime, cumulative times).
+
+statement = 'import vrep, youbot'
+
+
+def measure(repeat=10):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    baseline = best = float('inf')
+    for _ in range(repeat):
+        start = timer()
+        subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+        baseline = min(baseline, timer() - start)
+        start = timer()
+        subprocess.run([sys.executable, '-c', statement], env=env, check=True)
+        best = min(best, timer() - start)
+    return best, baseline, env
+
+
+def slowest_imports(env, count=10):
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], env=env,
+                            check=True, stderr=subprocess.PIPE, universal_newlines=True).stderr
+    imports = []
+    for line in output.splitlines()[1:]:
+        # import time: self [us] | cumulative | imported package
+        self_time, cumulative, name = line.split('|')
+        imports.append((int(cumulative), int(self_time.split(':')[1]), name.rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+if __name__ == '__main__':
+    best, baseline, env = measure()
+    print('%s: %.1f ms (interpreter alone: %.1f ms)' % (statement, best * 1000, baseline * 1000))
+    print('%12s %12s  module' % ('cumulative', 'self'))
+    for cumulative, self_time, name in slowest_imports(env):
+        print('%9.1f ms %9.1f ms  %s' % (cumulative / 1000, self_time / 1000, name))
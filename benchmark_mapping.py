@@ -0,0 +1,47 @@
+import numpy as np
+from time import perf_counter as timer
+from youbot.mapping import OccupancyGrid, TiledOccupancyGrid
+from youbot.transforms import transl, trotz
+from benchmark_hokuyo import SyntheticHokuyo, synthetic_youbot
+
+# Measures OccupancyGrid.integrate with synthetic scans of 2x684 beams (see benchmark_hokuyo.py)
+# on a 0.05 m grid of the house, the robot moving and turning between the scans. At 20 scans per
+# second, a scan should take a few milliseconds at most.
+#
+# The dense grid is compared with the tiled one (TiledOccupancyGrid), on the house and on a finer
+# grid of a much larger area, of which the robot only explores the same part: the memory of the
+# tiled grid follows the explored area. The collision queries (occupied_at) are timed as well.
+
+scans = 200
+queries = 100000
+
+if __name__ == '__main__':
+    youbot = synthetic_youbot()
+    vrep = SyntheticHokuyo(youbot)
+    poses = [transl([np.cos(a) * 3, np.sin(a) * 3, 0]) @ trotz(a)
+             for a in np.linspace(0, 2 * np.pi, scans)]
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-7.5, 7.5, (2, queries))
+
+    for name, grid in [
+            ('dense', OccupancyGrid()),
+            ('tiled', TiledOccupancyGrid()),
+            ('dense 0.02 m 60x60 m', OccupancyGrid((-30, -30), (60, 60), .02)),
+            ('tiled 0.02 m 60x60 m', TiledOccupancyGrid((-30, -30), (60, 60), .02))]:
+        read = integrate = 0
+        for pose in poses:
+            start = timer()
+            scan = youbot.hokuyo_read(vrep, 0, pose)
+            read += timer() - start
+            start = timer()
+            grid.integrate(scan)
+            integrate += timer() - start
+        start = timer()
+        grid.occupied_at(x, y)
+        query = timer() - start
+        print('%s: grid %dx%d, %d beams: read %.2f ms/scan, integrate %.2f ms/scan' %
+              (name, grid.shape[0], grid.shape[1], len(scan), read / scans * 1000,
+               integrate / scans * 1000))
+        print('    %d occupied cells, %d free cells, %.2f MB, %d queries: %.2f ms' %
+              (grid.occupied().sum(),
+               (grid.log_odds < 0).sum(), grid.nbytes() / 2**20, queries, query * 1000))
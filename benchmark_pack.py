@@ -0,0 +1,38 @@
+from vrep import simxPackFloats, simxUnpackFloats, simxPackInts, simxUnpackInts
+from time import perf_counter as timer
+import numpy as np
+
+# Times simxPackFloats/simxUnpackFloats and simxPackInts/simxUnpackInts from 10^3 to 10^6
+# elements, with numpy arrays in. The time per element should stay roughly constant (linear
+# scaling).
+#
+# With asArray=True, unpacking only creates a view of the buffer: the copy that a consumer
+# keeping the values makes (e.g. when the buffer is reused by the next call) is part of the timed
+# region. The list output (asArray=False) is timed as well.
+
+
+def measure(func, arg, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = timer()
+        func(arg)
+        best = min(best, timer() - start)
+    return best
+
+
+if __name__ == '__main__':
+    print('%9s' % 'elements' + ''.join('%14s' % s for s in
+                                       ['pack floats', 'unpack (copy)', 'unpack (list)',
+                                        'pack ints', 'unpack (copy)', 'unpack (list)']))
+    for n in [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]:
+        floats = np.random.rand(n).astype(np.float32)
+        ints = np.arange(n, dtype=np.int32)
+        times = [measure(simxPackFloats, floats),
+                 measure(lambda b: simxUnpackFloats(b, asArray=True).copy(),
+                         simxPackFloats(floats)),
+                 measure(simxUnpackFloats, simxPackFloats(floats)),
+                 measure(simxPackInts, ints),
+                 measure(lambda b: simxUnpackInts(b, asArray=True).copy(), simxPackInts(ints)),
+                 measure(simxUnpackInts, simxPackInts(ints))]
+        # nanoseconds per element
+        print('%9d' % n + ''.join('%11.2f ns' % (t / n * 1e9) for t in times))
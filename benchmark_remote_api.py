@@ -0,0 +1,57 @@
+import vrep
+from vrep.const import *
+from vrep.loopback import LoopbackServer
+from time import perf_counter as timer
+
+# Measures the throughput of the remote API clients against the loopback server of
+# vrep/loopback.py (no V-REP needed).
+#
+# - round trips: one simx_opmode_blocking call per command, which is how the ctypes binding is
+#   used by the YouBot for its blocking calls;
+# - pipelined: simx_opmode_oneshot commands queued and sent together by a blocking call every
+#   `batch` commands. Each command of a batch targets a joint of its own, so that no command
+#   replaces a previous one in the outbox of the client.
+#
+# The ctypes binding is only measured if the remoteApi library is available for this platform:
+# it is shipped for Windows (vrep/remoteApi.dll) and macOS (vrep/remoteApi.dylib). On Linux, build
+# remoteApi.so from programming/remoteApi in the V-REP installation (extApi.c and
+# extApiPlatform.c, with -DNON_MATLAB_PARSING -DMAX_EXT_API_CONNECTIONS=255 -shared -fPIC), copy
+# it to vrep/ and run this script again.
+
+calls = 5000
+batch = 50
+
+
+def round_trips(client, handles):
+    start = timer()
+    for _ in range(calls):
+        client.simxGetJointPosition(handles[0], simx_opmode_blocking)
+    return calls / (timer() - start)
+
+
+def pipelined(client, handles):
+    start = timer()
+    for i in range(calls):
+        if (i + 1) % batch:
+            client.simxSetJointTargetVelocity(handles[i % batch], i, simx_opmode_oneshot)
+        else:
+            client.simxGetJointPosition(handles[0], simx_opmode_blocking)
+    return calls / (timer() - start)
+
+
+if __name__ == '__main__':
+    server = LoopbackServer(objects=['joint%d' % i for i in range(batch)]).start()
+    clients = [('python', vrep.RemoteVRep)]
+    if vrep.libsimx is not None:
+        clients.append(('ctypes', vrep.CVRep))
+    else:
+        print('ctypes backend: remoteApi library not available on this platform')
+
+    for name, cls in clients:
+        client = cls('127.0.0.1', server.port, True, True, 2000, 5)
+        handles = [client.simxGetObjectHandle('joint%d' % i, simx_opmode_blocking)
+                   for i in range(batch)]
+        print('%-7s round trips: %8.0f calls/s' % (name, round_trips(client, handles)))
+        print('%-7s pipelined:   %8.0f calls/s' % (name, pipelined(client, handles)))
+        cls.simxFinish(client.clientID)
+    server.stop()
@@ -8,6 +8,8 @@ import numpy as np
 # bool or boolean). This allows to use as little memory as possible for the same map size (and 
 # thus to have faster operations on the map). To store larger elements, you could use 'uint8' 
 # (unsigned integer, 8 bits) or 'int8' (signed integer, 8 bits).
+# A boolean still takes a byte: np.packbits stores 8 cells per byte (see 
+# youbot.mapping.TiledOccupancyGrid, which also only stores the explored parts of a map).
 world_map = np.ones((64, 64), np.bool)  # At first, no cell is accessible.
 world_map[19:40, 19:40] = 0 # Dig a rectangle in it.
 world_map[29, 19:40] = 1    # Draw three walls.
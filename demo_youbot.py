@@ -1,14 +1,18 @@
-from vrep import VRep
 from vrep.const import *
+from vrep.transfer import SplitTransfer
+from vrep.profiler import connect
 from youbot import YouBot
+from youbot.mapfile import MappedOccupancyGrid
+from youbot.mapping import TiledOccupancyGrid
 from time import sleep
 import numpy as np
 import atexit
+import os
 import matplotlib.pyplot as plt
 from matplotlib.path import Path as PolygonPath
 from mpl_toolkits.mplot3d import Axes3D     # Implicitely needed for 3D projections
 from time import perf_counter as timer
-from youbot.transforms import angdiff
+from youbot.transforms import angdiff, transl, trotx, troty, trotz
 
 # Illustrates the V-REP bindings.
 
@@ -23,17 +27,18 @@ from youbot.transforms import angdiff
 if __name__ == '__main__':
     ## Initiate the connection to the simulator. 
     print('Program started')
-    VRep.simxFinish(-1)
-    vrep = VRep('127.0.0.1', 19998, True, True, 2000, 5)
+    # The communication cycle and timeout are tuned to the measured round trip (see 
+    # vrep/profiler.py)
+    vrep, _ = connect('127.0.0.1', 19998)
     print('Connection %d to the remote API server open.\n' % vrep.clientID)
     
     # Reset the simulation if it was left running
-    # Load the scene if it was not already loaded
+    # Load the scene if it was not already loaded (the load has a timeout of its own, longer 
+    # than the tuned one)
     vrep.simxStopSimulation(simx_opmode_blocking)
-    try:
-        vrep.simxLoadScene("world/house.ttt", True, simx_opmode_blocking)
-    except:
-        pass
+    ret, _ = vrep.simxLoadScene("world/house.ttt", True, simx_opmode_blocking, returnCode=True)
+    if ret != simx_return_ok:
+        print('world/house.ttt could not be loaded (error code %d), using the open scene' % ret)
 
     # This will only work in "continuous remote API server service". 
     # See http://www.v-rep.eu/helpFiles/en/remoteApiServerSide.htm
@@ -51,10 +56,23 @@ if __name__ == '__main__':
     youbot = YouBot(vrep)
     youbot.streaming_init(vrep)
     youbot.hokuyo_init(vrep)
+    # Point clouds and images are fetched in chunks, so that they do not hold the drive commands 
+    # back (see vrep/transfer.py).
+    transfer = SplitTransfer(vrep)
+    # The occupancy map of the scene (see youbot/mapping.py). With PYTRS_PERSISTENT_MAP=1, it is 
+    # kept across runs in a memory-mapped file (see youbot/mapfile.py): this run goes on with the 
+    # map of the previous ones. 
+    persistent_map = os.environ.get('PYTRS_PERSISTENT_MAP') == '1'
+    if persistent_map:
+        world_map = MappedOccupancyGrid.for_scene(vrep)
+        atexit.register(world_map.close)
+    else:
+        world_map = TiledOccupancyGrid()
+    last_flush = timer()
     
-    # Let a few cycles pass to make sure there's a value waiting for us next time we try to get a 
-    # joint angle or the robot pose with the simx_opmode_buffer option.
-    sleep(.2)
+    # streaming_init waits until every stream has delivered a value, so there is one waiting for 
+    # us next time we try to get a joint angle or the robot pose with the simx_opmode_buffer 
+    # option. youbot.streams.latest tells how old a streamed value is.
 
     ## Youbot constants
     # The time step the simulator is using (your code should run close to it). 
@@ -88,10 +106,9 @@ if __name__ == '__main__':
                             # robot's speed). 
 
     # Set the arm to its starting configuration. 
-    vrep.simxPauseCommunication(True) 
-    for arm_joint, starting_joint in zip(youbot.arm_joints, starting_joints):
-        vrep.simxSetJointTargetPosition(arm_joint, starting_joint, simx_opmode_oneshot)
-    vrep.simxPauseCommunication(False) 
+    with vrep.batch() as batch:
+        for arm_joint, starting_joint in zip(youbot.arm_joints, starting_joints):
+            batch.simxSetJointTargetPosition(arm_joint, starting_joint, simx_opmode_oneshot)
 
     # Initialise the plot. 
     plot_data = True
@@ -122,11 +139,22 @@ if __name__ == '__main__':
         if vrep.simxGetConnectionId() == -1:
             raise Exception('Lost connection to remote API.')
 
-        # Get the position and the orientation of the robot. 
-        youbot_pos = vrep.simxGetObjectPosition(youbot.ref, -1, simx_opmode_buffer)
-        youbot_euler = vrep.simxGetObjectOrientation(youbot.ref, -1, simx_opmode_buffer)
+        # Get the position and the orientation of the robot (the joint angles are in the same 
+        # snapshot). 
+        snapshot = youbot.snapshot(vrep)
+        youbot_pos = snapshot[youbot.ref]['position']
+        youbot_euler = snapshot[youbot.ref]['orientation']
         angle = -np.pi / 2
 
+        # Fuse the Hokuyo scan into the map, in the world frame, and write the updated tiles of a 
+        # persistent map to the disk every second. 
+        world_trans = (transl(youbot_pos) @ trotx(youbot_euler[0]) @ troty(youbot_euler[1]) @ 
+                       trotz(youbot_euler[2]))
+        world_map.integrate(youbot.hokuyo_read(vrep, simx_opmode_buffer, world_trans))
+        if persistent_map and start_time - last_flush > 1:
+            world_map.flush()
+            last_flush = start_time
+
         ## Plot something if required. 
         if plot_data:
             # Read data from the depth sensor, more often called the Hokuyo (if you want to be more
@@ -199,15 +227,17 @@ if __name__ == '__main__':
             if (youbot_pos[0] + 3.167 < .001) and (abs(youbot_pos[0] - prev_position) < .001):
                 forw_back_vel = 0
 
-                # Change the orientation of the camera to focus on the table (preparation for 
-                # the next state).
-                vrep.simxSetObjectOrientation(youbot.rgbd_casing, youbot.ref, [0, 0, np.pi / 4], 
-                                              simx_opmode_oneshot)
+                with vrep.batch() as batch:
+                    # Change the orientation of the camera to focus on the table (preparation 
+                    # for the next state).
+                    batch.simxSetObjectOrientation(youbot.rgbd_casing, youbot.ref, 
+                                                   [0, 0, np.pi / 4], simx_opmode_oneshot)
 
-                # Move the arm to the preset pose pickupJoints (only useful for this demo you 
-                # should compute it based on the object to grasp).
-                for arm_joint, pickup_joint in zip(youbot.arm_joints, pickup_joints):
-                    vrep.simxSetJointTargetPosition(arm_joint, pickup_joint, simx_opmode_oneshot)
+                    # Move the arm to the preset pose pickupJoints (only useful for this demo you 
+                    # should compute it based on the object to grasp).
+                    for arm_joint, pickup_joint in zip(youbot.arm_joints, pickup_joints):
+                        batch.simxSetJointTargetPosition(arm_joint, pickup_joint, 
+                                                         simx_opmode_oneshot)
 
                 fsm = 'snapshot'
             prev_position = youbot_pos[0]
@@ -238,9 +268,9 @@ if __name__ == '__main__':
 
             # Then retrieve the last point cloud the depth sensor took.
             # If you were to try to capture multiple images in a row, try other values than 
-            # vrep.simx_opmode_oneshot_wait. 
+            # vrep.simx_opmode_oneshot_wait. Here, it comes in chunks (simx_opmode_oneshot_split).
             print('Capturing a point cloud...')
-            pts = youbot.xyz_read(vrep, simx_opmode_oneshot_wait)
+            pts = youbot.xyz_read(vrep, simx_opmode_oneshot_wait, transfer)
             # Each column of pts has [xyzdistancetosensor]. However, plot3 does not have the same 
             # frame of reference as the output data. To get a correct plot, you should invert the
             # y and z dimensions. 
@@ -279,9 +309,9 @@ if __name__ == '__main__':
             #     ^^^^^^^^^^^^^^^^^^^^^^^^^     ^^^^^^                            ^^^
             #     simxGetVisionSensorImage2     h.rgbSensor                       0
             # If you were to try to capture multiple images in a row, try other values than 
-            # simx_opmode_oneshot_wait. 
+            # simx_opmode_oneshot_wait. Here, it comes in chunks (simx_opmode_oneshot_split).
             print('Capturing image...')
-            image = vrep.simxGetVisionSensorImage(youbot.rgb_sensor, 0, simx_opmode_oneshot_wait)
+            image = transfer.fetch('simxGetVisionSensorImage', youbot.rgb_sensor, 0)
             print("Captured %dx%dx%d image." % image.shape)
 
             # Finally, show the image. 
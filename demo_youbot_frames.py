@@ -3,8 +3,7 @@ from vrep.const import *
 from youbot import YouBot
 from vrep import VRep
 import numpy as np
-from robopy.base import transl, trotx, troty, trotz
-from youbot.transforms import homtrans
+from youbot.transforms import homtrans, transl, trotx, troty, trotz
 
 # (C) Copyright Renaud Detry 2013, Thibaut Cuvelier 2017.
 # Distributed under the GNU General Public License.
@@ -25,13 +24,15 @@ youbot.streaming_init(vrep)
 youbot.hokuyo_init(vrep)
 
 ## Read data from the depth camera (Hokuyo)
-# Get the position and orientation of the youBot in the world reference frame (as if with a GPS).
-youbot_pos = vrep.simxGetObjectPosition(youbot.ref, -1, simx_opmode_buffer)
-youbot_euler = vrep.simxGetObjectOrientation(youbot.ref, -1, simx_opmode_buffer)
+# Get the position and orientation of the youBot in the world reference frame (as if with a GPS),
+# from the pose snapshot streamed by streaming_init.
+pose = youbot.snapshot(vrep)[youbot.ref]
+youbot_pos = pose['position']
+youbot_euler = pose['orientation']
 
 # Determine the position of the Hokuyo with global coordinates (world reference frame).
-trf = np.asarray(transl(youbot_pos) * trotx(youbot_euler[0]) * troty(youbot_euler[1]) *\
-                 trotz(youbot_euler[2]))
+trf = transl(youbot_pos) @ trotx(youbot_euler[0]) @ troty(youbot_euler[1]) @ \
+      trotz(youbot_euler[2])
 world_hokuyo1 = homtrans(trf, np.asarray(youbot.hokuyo1_pos)[:, None])
 world_hokuyo2 = homtrans(trf, np.asarray(youbot.hokuyo2_pos)[:, None])
 
@@ -0,0 +1,18 @@
+import pytest
+from vrep.loopback import LoopbackServer
+from vrep.remote import RemoteVRep
+
+
+@pytest.fixture
+def server():
+    server = LoopbackServer(objects=['youBot_center', 'rollingJoint_fl', 'rollingJoint_rl'])
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def vrep(server):
+    vrep = RemoteVRep('127.0.0.1', server.port, True, True, 2000, 5)
+    yield vrep
+    RemoteVRep.simxFinish(vrep.clientID)
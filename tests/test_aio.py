@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import pytest
+from vrep.aio import AsyncVRep
+from vrep.const import *
+
+
+class Client:
+    # Client recording the thread of each call
+    def __init__(self):
+        self.threads = {}
+
+    def simxGetObjectHandle(self, objectName, operationMode):
+        self.threads[objectName] = threading.current_thread().name
+        if objectName == 'nothing':
+            raise Exception('Remote function call failed, error code: 8')
+        return len(objectName)
+
+    def simxGetPingTime(self):
+        self.threads['ping'] = threading.current_thread().name
+        return 1
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_blocking_calls_run_off_the_loop():
+    client = Client()
+
+    async def main():
+        async with AsyncVRep(client) as avrep:
+            handle = await avrep.simxGetObjectHandle('camera', simx_opmode_blocking)
+            streamed = await avrep.simxGetObjectHandle('hokuyo', operationMode=simx_opmode_buffer)
+            ping = await avrep.simxGetPingTime()
+            return handle, streamed, ping, threading.current_thread().name
+
+    handle, streamed, ping, loop_thread = run(main())
+    assert (handle, streamed, ping) == (6, 6, 1)
+    assert client.threads['camera'].startswith('vrep')
+    assert client.threads['ping'].startswith('vrep')
+    # The calls that only read the local buffers run on the loop
+    assert client.threads['hokuyo'] == loop_thread
+
+
+def test_errors():
+    async def main():
+        async with AsyncVRep(Client()) as avrep:
+            with pytest.raises(Exception, match='error code: 8'):
+                await avrep.simxGetObjectHandle('nothing', simx_opmode_blocking)
+            with pytest.raises(AttributeError):
+                avrep.close_all()
+    run(main())
+
+
+def test_concurrent_calls(vrep, server):
+    server.add_object('camera')
+
+    async def main():
+        async with AsyncVRep(vrep) as avrep:
+            handles = await asyncio.gather(
+                *[avrep.simxGetObjectHandle(name, simx_opmode_blocking)
+                  for name in ('youBot_center', 'rollingJoint_fl', 'camera')],
+                avrep.simxGetObjectHandle('nothing', simx_opmode_blocking),
+                return_exceptions=True)
+            position = await avrep.simxGetObjectPosition(handles[0], -1, simx_opmode_blocking)
+            return handles, position
+
+    handles, position = run(main())
+    assert handles[:3] == [1, 2, 4]
+    assert 'error code: 8' in str(handles[3])
+    assert position == [0, 0, 0]
@@ -0,0 +1,66 @@
+import threading
+import pytest
+from vrep.const import *
+
+
+@pytest.fixture
+def joints(vrep):
+    return [vrep.simxGetObjectHandle(name, simx_opmode_blocking)
+            for name in ('rollingJoint_fl', 'rollingJoint_rl')]
+
+
+def test_writes_are_coalesced(vrep, server, joints):
+    fl, rl = joints
+    with vrep.batch() as batch:
+        batch.simxSetJointTargetVelocity(fl, 1, simx_opmode_oneshot)
+        batch.simxSetJointTargetVelocity(rl, 2, simx_opmode_oneshot)
+        batch.simxSetJointTargetVelocity(fl, 3, simx_opmode_oneshot)
+        assert server.joint_targets == {}
+    assert (batch.recorded, batch.sent, batch.coalesced) == (3, 2, 1)
+    vrep.simxGetPingTime()
+    assert server.joint_targets == {fl: 3, rl: 2}
+
+
+def test_other_calls_are_immediate(vrep, server, joints):
+    fl, _ = joints
+    server.joint_positions[fl] = .5
+    with vrep.batch() as batch:
+        batch.simxSetJointTargetVelocity(fl, 1, simx_opmode_blocking)
+        assert server.joint_targets == {fl: 1}
+        assert batch.simxGetJointPosition(fl, simx_opmode_blocking) == .5
+    assert batch.recorded == 0
+
+
+def test_nested_batches_join(vrep, server, joints):
+    fl, rl = joints
+    with vrep.batch() as batch:
+        with batch.batch() as inner:
+            assert inner is batch
+            inner.simxSetJointTargetVelocity(fl, 1, simx_opmode_oneshot)
+        assert batch.sent == 0
+        batch.simxSetJointTargetVelocity(rl, 2, simx_opmode_oneshot)
+    assert batch.sent == 2
+
+
+def test_client_is_not_patched(vrep, server, joints):
+    # Calls made directly on the client, e.g. from another thread, are not batched
+    fl, rl = joints
+    with vrep.batch() as batch:
+        batch.simxSetJointTargetVelocity(fl, 1, simx_opmode_oneshot)
+        thread = threading.Thread(target=vrep.simxSetJointTargetVelocity,
+                                  args=(rl, 2, simx_opmode_blocking))
+        thread.start()
+        thread.join()
+        assert server.joint_targets == {rl: 2}
+        assert 'simxSetJointTargetVelocity' not in vars(vrep)
+
+
+def test_exception_warns_about_dropped_writes(vrep, server, joints):
+    fl, _ = joints
+    with pytest.warns(UserWarning, match='1 batched writes were not sent'):
+        with pytest.raises(KeyError):
+            with vrep.batch() as batch:
+                batch.simxSetJointTargetVelocity(fl, 1, simx_opmode_oneshot)
+                raise KeyError()
+    vrep.simxGetPingTime()
+    assert server.joint_targets == {}
@@ -0,0 +1,34 @@
+from vrep.const import *
+from vrep.handles import HandleResolver
+
+
+def test_resolve(vrep, server):
+    handles = HandleResolver(vrep)
+    assert handles.cache_dir is None
+    assert handles['youBot_center'] == 1
+    assert 'rollingJoint_fl' in handles
+    # Objects added later are resolved one by one
+    ref = server.add_object('ref')
+    assert 'ref' not in handles
+    assert handles['ref'] == ref
+
+
+def test_cache(vrep, server, tmp_path):
+    assert not HandleResolver(vrep, tmp_path).from_cache
+    cached = HandleResolver(vrep, tmp_path)
+    assert cached.from_cache
+    assert cached.handles == HandleResolver(vrep).handles
+    cached.refresh(use_cache=False)
+    assert not cached.from_cache
+
+
+def test_cache_of_another_scene(vrep, server, tmp_path):
+    HandleResolver(vrep, tmp_path)
+    # Same handles, another scene file
+    server.string_parameters[sim_stringparam_scene_path_and_name] = '/scenes/other.ttt'
+    assert not HandleResolver(vrep, tmp_path).from_cache
+    # Another object
+    ref = server.add_object('ref')
+    handles = HandleResolver(vrep, tmp_path)
+    assert not handles.from_cache
+    assert handles.handles['ref'] == ref
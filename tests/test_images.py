@@ -0,0 +1,25 @@
+import time
+import numpy as np
+from vrep.const import *
+from vrep.images import ImageRing
+from vrep.metrics import Metrics
+
+
+def test_ring(vrep, server):
+    handle = server.add_object('camera', object_type=sim_object_visionsensor_type)
+    server.images[handle] = np.full((8, 4, 3), 7, np.uint8)
+    metrics = Metrics(vrep)
+    ring = ImageRing(vrep, handle, np.zeros((3, 8, 4, 3), np.uint8))
+    assert ring.read() is None
+    ring.start()
+    end = time.time() + 2
+    frame = None
+    while frame is None and time.time() < end:
+        frame = ring.read()
+    assert frame.sequence == 1
+    assert (frame.image == 7).all()
+    assert ring.latest().sequence == 1
+    ring.stop()
+    # The reads go through the wrappers of the client
+    assert metrics.calls[('simxGetVisionSensorImage', 'buffer')] >= 2
+    metrics.uninstall()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from vrep.const import *
+from youbot.mapfile import MappedOccupancyGrid, map_path, scene_key
+from youbot.scan import BeamGeometry, Scan
+
+
+def scan(angle, distance):
+    directions = np.array([[np.cos(angle)], [np.sin(angle)], [0]], np.float32)
+    return Scan(np.array([distance], np.float32),
+                BeamGeometry(np.zeros((3, 1), np.float32), directions))
+
+
+def test_persistence(tmp_path):
+    path = tmp_path / 'map.bin'
+    with MappedOccupancyGrid(path, tile_size=8) as grid:
+        grid.integrate(scan(0, 1.))
+        log_odds = grid.log_odds.copy()
+    with MappedOccupancyGrid(path, tile_size=8, readonly=True) as grid:
+        assert np.array_equal(grid.log_odds, log_odds)
+        assert grid.occupied_at([1.02], [.02]).tolist() == [True]
+
+
+def test_grow_closes_the_old_mapping(tmp_path):
+    with MappedOccupancyGrid(tmp_path / 'map.bin', tile_size=8) as grid:
+        old = grid._mmap
+        # Beams in every direction, over more than 16 tiles
+        for angle in np.linspace(-np.pi, np.pi, 64, endpoint=False):
+            grid.integrate(scan(angle, 3.))
+        assert len(grid.tiles) > 16
+        assert old.closed
+        assert grid.occupied_at([3.01], [.01]).tolist() == [True]
+
+
+def test_grow_with_arrays_in_use(tmp_path):
+    with MappedOccupancyGrid(tmp_path / 'map.bin', tile_size=8) as grid:
+        grid.integrate(scan(0, 1.))
+        kept = grid.tiles
+        for angle in np.linspace(-np.pi, np.pi, 64, endpoint=False):
+            grid.integrate(scan(angle, 3.))
+        # The old mapping still backs the kept tiles
+        assert len(kept) == 16 and kept[1].any()
+        del kept
+
+
+def test_close_with_arrays_in_use(tmp_path):
+    grid = MappedOccupancyGrid(tmp_path / 'map.bin', tile_size=8)
+    tiles = grid.tiles
+    with pytest.raises(BufferError):
+        grid.close()
+    del tiles
+    grid._mmap.close()
+
+
+def test_scene_key(vrep, server):
+    server.string_parameters[sim_stringparam_scene_path_and_name] = '/scenes/house.ttt'
+    assert scene_key(vrep) == '/scenes/house.ttt'
+    assert map_path('/scenes/house.ttt') != map_path('/scenes/other.ttt')
+    # A scene that was never saved is keyed by its objects
+    server.string_parameters[sim_stringparam_scene_path_and_name] = ''
+    key = scene_key(vrep)
+    server.add_object('ref')
+    assert scene_key(vrep) != key
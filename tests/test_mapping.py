@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from youbot.mapping import OccupancyGrid, TiledOccupancyGrid
+from youbot.scan import BeamGeometry, Scan, hokuyo_range
+from youbot.transforms import transl, trotz
+
+
+def geometry(angles):
+    # Beams from the origin of the ref frame, in its horizontal plane
+    angles = np.asarray(angles, np.float32)
+    directions = np.vstack((np.cos(angles), np.sin(angles), np.zeros_like(angles)))
+    return BeamGeometry(np.zeros((3, len(angles)), np.float32), directions.astype(np.float32))
+
+
+def scan(ranges, angles, trans=None):
+    return Scan(np.asarray(ranges, np.float32), geometry(angles), trans)
+
+
+def test_integrate():
+    grid = OccupancyGrid(origin=(-1, -1), size=(4, 2), resolution=.1)
+    # A beam along x hitting an obstacle at 1.05 m, a beam along y without contact
+    grid.integrate(scan([1.05, hokuyo_range], [0, np.pi / 2]))
+    rows, cols, inside = grid.cells(np.array([.05, .55, 1.05, -.05]), np.array([.05] * 4))
+    assert inside.all()
+    assert grid.log_odds[rows[:2], cols[:2]].tolist() == [grid.l_free] * 2
+    assert grid.log_odds[rows[2], cols[2]] == grid.l_occupied
+    # Behind the sensor
+    assert grid.log_odds[rows[3], cols[3]] == 0
+    # The beam without contact leaves the grid: free up to its edge, nothing occupied
+    column = grid.log_odds[:, cols[0]]
+    assert (column[rows[0]:] == grid.l_free).all()
+    assert grid.occupied().sum() == 1
+    assert grid.occupied_at([1.05, .55, 10.], [.05, .05, .05]).tolist() == [True, False, False]
+
+
+def test_integrate_in_world_frame():
+    grid = OccupancyGrid(origin=(-2, -2), size=(4, 4), resolution=.05)
+    # Robot at (1, 0), turned by 90 degrees: its beam along x goes along y in the world
+    grid.integrate(scan([.5], [0], transl([1, 0, 0]) @ trotz(np.pi / 2)))
+    assert grid.occupied_at([1.], [.5 + .025]).tolist() == [True]
+    assert grid.probabilities()[grid.cells(1., .25)[:2]] == pytest.approx(
+        1 - 1 / (1 + np.exp(grid.l_free)))
+
+
+def test_clamping():
+    grid = OccupancyGrid(origin=(-1, -1), size=(2, 2), resolution=.1, l_min=-1, l_max=2)
+    for _ in range(20):
+        grid.integrate(scan([.55], [0]))
+    assert grid.log_odds.max() == 2
+    assert grid.log_odds.min() == -1
+
+
+def test_many_beams():
+    # A full Hokuyo scan around the robot, every beam at 2 m
+    grid = OccupancyGrid()
+    angles = np.linspace(-np.pi, np.pi, 1368, endpoint=False)
+    grid.integrate(scan(np.full(1368, 2.), angles))
+    # The endpoints are occupied, the cells the beams crossed are free
+    assert grid.occupied_at(2 * np.cos(angles), 2 * np.sin(angles)).mean() > .99
+    assert not grid.occupied_at(1.5 * np.cos(angles), 1.5 * np.sin(angles)).any()
+
+
+def random_scans(count, seed=0):
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(-np.pi, np.pi, 360, endpoint=False)
+    for _ in range(count):
+        ranges = np.where(rng.random(360) < .2, hokuyo_range, rng.uniform(.1, hokuyo_range, 360))
+        pose = transl([*rng.uniform(-6, 6, 2), 0]) @ trotz(rng.uniform(-np.pi, np.pi))
+        yield scan(ranges, angles, pose)
+
+
+def test_tiled_grid_matches_dense_grid():
+    dense = OccupancyGrid()
+    tiled = TiledOccupancyGrid(tile_size=32)
+    for s in random_scans(5):
+        dense.integrate(s)
+        tiled.integrate(s)
+    assert np.array_equal(tiled.log_odds, dense.log_odds)
+    assert np.array_equal(tiled.packed_occupied(), dense.packed_occupied())
+    assert np.array_equal(tiled.packed_free(), dense.packed_free())
+    x, y = np.random.default_rng(1).uniform(-8, 8, (2, 10000))
+    assert np.array_equal(tiled.occupied_at(x, y), dense.occupied_at(x, y))
+    # The pool grew past its initial 16 tiles
+    assert tiled.tile_count > 16
+
+
+def test_tiles_only_where_scanned():
+    # A grid much larger than the explored area
+    tiled = TiledOccupancyGrid(origin=(-50, -50), size=(100, 100), tile_size=64)
+    tiled.integrate(scan([1.], [0]))
+    # The unknown tile, and the tile of the beam
+    assert tiled.tile_count == 2
+    assert tiled.nbytes() < OccupancyGrid(origin=(-50, -50), size=(100, 100)).nbytes() / 100
+    assert tiled.occupied_at([1.02, -20.], [.02, 0.]).tolist() == [True, False]
+
+
+def test_tile_size():
+    with pytest.raises(Exception, match='multiple of 8'):
+        TiledOccupancyGrid(tile_size=12)
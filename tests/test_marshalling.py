@@ -0,0 +1,102 @@
+import ctypes as ct
+import numpy as np
+import pytest
+from vrep import c_array_copy, c_aux_packets, c_buffer, c_concat_strings, c_strings
+
+
+def c_floats(values):
+    return (ct.c_float * max(len(values), 1))(*values)
+
+
+def c_counts(sizes):
+    return (ct.c_int * (len(sizes) + 1))(len(sizes), *sizes)
+
+
+@pytest.mark.parametrize('asArray', [False, True])
+def test_aux_packets(asArray):
+    # The 15 values of the first packet, then a Hokuyo packet (width, height and 2 points)
+    values = list(np.arange(15) / 4) + [2, 1, .5, 0, 0, .5, 0, 1, 0, 1]
+    packets = c_aux_packets(c_floats(values), c_counts([15, 10]), asArray)
+    assert [list(p) for p in packets] == [values[:15], values[15:]]
+    if asArray:
+        assert all(p.dtype == np.float32 for p in packets)
+        # A single copy of the C values: the packets are views into it
+        assert packets[0].base is packets[1].base is not None
+        assert packets[1][2:].reshape((-1, 4)).tolist() == [[.5, 0, 0, .5], [0, 1, 0, 1]]
+    else:
+        assert all(type(p) is list for p in packets)
+
+
+@pytest.mark.parametrize('asArray', [False, True])
+def test_empty_aux_packets(asArray):
+    assert list(c_aux_packets(c_floats([]), c_counts([]), asArray)) == []
+    packets = c_aux_packets(c_floats([1]), c_counts([0, 1, 0]), asArray)
+    assert [list(p) for p in packets] == [[], [1], []]
+
+
+def test_aux_packets_are_copied():
+    values = c_floats([1, 2, 3])
+    packets = c_aux_packets(values, c_counts([3]), True)
+    # The C buffer is released after the call
+    values[0] = 7
+    assert packets[0].tolist() == [1, 2, 3]
+
+
+def test_script_strings():
+    strings = ['path', '', 'é', b'raw']
+    c_array = c_concat_strings(strings)
+    assert bytes(c_array) == b'path\0\0\xc3\xa9\0raw\0'
+    assert c_strings(c_array, len(strings)) == ['path', '', 'é', 'raw']
+    # Fewer strings than the array holds
+    assert c_strings(c_array, 1) == ['path']
+    assert len(c_concat_strings([])) == 0
+    assert c_strings(ct.POINTER(ct.c_char)(), 0) == []
+
+
+def test_script_arrays():
+    ints = (ct.c_int * 3)(1, -2, 3)
+    copy = c_array_copy(ct.cast(ints, ct.POINTER(ct.c_int)), 3)
+    ints[0] = 7
+    assert copy.tolist() == [1, -2, 3]
+    assert copy.dtype == np.int32
+    # No values: the C pointer may be NULL
+    empty = c_array_copy(ct.POINTER(ct.c_float)(), 0)
+    assert empty.shape == (0,)
+    assert empty.dtype == np.float32
+
+
+@pytest.mark.parametrize('data', [b'xyz', bytearray(b'xyz'), memoryview(b'xyz'),
+                                  np.frombuffer(b'xyz', np.uint8), 'xyz'])
+def test_buffer(data):
+    pointer, size = c_buffer(data)
+    assert size == 3
+    assert ct.string_at(pointer, size) == b'xyz'
+
+
+def test_buffer_is_not_copied():
+    data = bytearray(b'abc')
+    pointer, size = c_buffer(data)
+    data[0] = ord('z')
+    assert ct.string_at(pointer, size) == b'zbc'
+    assert c_buffer(b'')[1] == 0
+
+
+def test_image_buffer():
+    # An image is passed as signed bytes, from its own memory
+    image = np.arange(24, dtype=np.uint8).reshape((2, 4, 3)) * 10
+    pointer, size = c_buffer(image, ct.c_byte)
+    assert size == image.size
+    assert np.ctypeslib.as_array(ct.cast(pointer, ct.POINTER(ct.c_ubyte)), (size,)).tolist() == \
+        image.ravel().tolist()
+    assert ct.addressof(pointer.contents) == image.ctypes.data
+    # The pointer keeps the data alive
+    del image
+    assert ct.string_at(pointer, 3) == bytes([0, 10, 20])
+
+
+def test_signal_bytes():
+    # Binary payloads (null bytes included) are read back by their length, not by strlen
+    payload = bytes(range(256))
+    pointer, size = c_buffer(payload)
+    assert bytearray(ct.string_at(pointer, size)) == payload
+    assert ct.string_at(c_buffer(b'ab\0cd')[0]) == b'ab'
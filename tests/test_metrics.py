@@ -0,0 +1,25 @@
+from vrep.const import *
+from vrep.metrics import Metrics
+
+
+def test_calls_and_sizes(vrep):
+    metrics = Metrics(vrep)
+    vrep.simxGetObjectHandle('youBot_center', simx_opmode_blocking)
+    vrep.simxGetPingTime()
+    snapshot = metrics.snapshot()
+    assert {'function': 'simxGetObjectHandle', 'opmode': 'blocking', 'count': 1} in \
+        snapshot['calls']
+    assert snapshot['latency_ms']['simxGetPingTime']['count'] == 1
+    assert snapshot['message_bytes']['in']['samples'] >= 2
+    assert 'vrep_message_bytes_available 1' in metrics.prometheus()
+    metrics.uninstall()
+    assert 'simxGetObjectHandle' not in vrep.__dict__
+
+
+def test_sizes_not_available():
+    # Client without message_sizes, e.g. the remoteApi library
+    metrics = Metrics()
+    assert metrics.snapshot()['message_bytes'] is None
+    text = metrics.prometheus()
+    assert 'vrep_message_bytes_available 0' in text
+    assert 'vrep_message_bytes{' not in text
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from vrep import simxPackFloats, simxPackInts, simxUnpackFloats, simxUnpackInts
+
+
+@pytest.mark.parametrize('values', [[], [0, 1, -1, 2**31 - 1, -2**31], list(range(-500, 500))])
+def test_ints(values):
+    packed = simxPackInts(values)
+    assert type(packed) is bytearray
+    assert len(packed) == 4 * len(values)
+    assert packed == b''.join(v.to_bytes(4, 'little', signed=True) for v in values)
+    assert simxUnpackInts(packed) == values
+    assert simxPackInts(np.array(values, np.int64)) == packed
+
+
+@pytest.mark.parametrize('values', [[], [0., 1.5, -2.25, 1e-3], np.linspace(-10, 10, 1000)])
+def test_floats(values):
+    packed = simxPackFloats(values)
+    assert len(packed) == 4 * len(values)
+    assert simxUnpackFloats(packed) == np.float32(values).tolist()
+    assert simxUnpackFloats(bytes(packed)) == simxUnpackFloats(packed)
+
+
+def test_trailing_bytes():
+    # The bytes after the last whole value are ignored
+    assert simxUnpackInts(simxPackInts([-3, 4]) + b'\x01\x02\x03') == [-3, 4]
+    assert simxUnpackFloats(simxPackFloats([.5]) + b'\x01') == [.5]
+    assert simxUnpackInts(b'\x01\x02') == []
+    assert simxUnpackFloats(b'') == []
+
+
+def test_as_array():
+    packed = simxPackInts([1, -2, 3])
+    ints = simxUnpackInts(packed, asArray=True)
+    assert ints.dtype == np.dtype('<i4')
+    assert ints.tolist() == [1, -2, 3]
+    # A view of the packed bytes, without a copy
+    packed[:4] = simxPackInts([7])
+    assert ints[0] == 7
+    floats = simxUnpackFloats(simxPackFloats([.25, -1]) + b'\x00', asArray=True)
+    assert floats.dtype == np.dtype('<f4')
+    assert floats.tolist() == [.25, -1]
+    assert simxUnpackInts(b'', asArray=True).shape == (0,)
@@ -0,0 +1,31 @@
+import os
+import pytest
+from vrep.const import *
+from vrep.pool import ConnectionPool, EpisodePool
+from vrep.remote import RemoteVRep
+
+
+def episode(vrep, name):
+    return os.getpid(), vrep.simxGetObjectHandle(name, simx_opmode_blocking)
+
+
+def test_connection_pool(server):
+    with ConnectionPool([server.port, server.port], client_class=RemoteVRep) as pool:
+        assert len(pool) == 2
+        assert pool.map(episode, [('youBot_center',)] * 4)[0][1] == 1
+
+
+def test_replaced_workers_take_the_ports_back(server):
+    # Each worker runs a single episode, the next one needs the port of the previous one
+    with EpisodePool([server.port], maxtasksperchild=1) as pool:
+        results = pool.map(episode, [('youBot_center',), ('rollingJoint_fl',), ('youBot_center',)])
+    assert [handle for _, handle in results] == [1, 2, 1]
+    assert len(set(pid for pid, _ in results)) == 3
+
+
+def test_connection_error(server):
+    port = server.port
+    server.stop()
+    with EpisodePool([port], timeOutInMs=100) as pool:
+        with pytest.raises(Exception, match='could not connect'):
+            pool.map(episode, [('youBot_center',)])
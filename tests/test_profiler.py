@@ -0,0 +1,92 @@
+import pytest
+from vrep.profiler import ConnectionProfiler, Timing, connect
+from vrep.remote import RemoteVRep
+
+
+class Pings:
+    # Client answering simxGetPingTime with the given round trips, and recording set_timing
+    def __init__(self, pings):
+        self.pings = list(pings)
+        self.timings = []
+
+    def simxGetPingTime(self):
+        return self.pings.pop(0) if len(self.pings) > 1 else self.pings[0]
+
+    def set_timing(self, commThreadCycleInMs, timeOutInMs):
+        self.timings.append((commThreadCycleInMs, timeOutInMs))
+
+
+class LibraryClient:
+    # Client without set_timing, like the remoteApi library, recording its connections
+    connections = []
+
+    def __init__(self, *args):
+        self.clientID = len(self.connections)
+        self.connections.append(args)
+
+    def simxGetPingTime(self):
+        return 3
+
+    @staticmethod
+    def simxFinish(clientID):
+        LibraryClient.connections[clientID] = None
+
+
+def test_profile():
+    profiler = ConnectionProfiler(Pings(range(1, 101)), window=100)
+    profile = profiler.warm_up()
+    assert profile.samples == 100
+    assert profile.p50 == pytest.approx(50.5)
+    assert profile.p90 == pytest.approx(90.1)
+    assert profile.p99 == pytest.approx(99.01)
+    assert profile.max == 100
+    assert profiler.recommend() == Timing(50, 1981)
+
+
+@pytest.mark.parametrize('ping, timing', [(0, (1, 500)), (4, (4, 500)), (200, (50, 4000))])
+def test_recommend_bounds(ping, timing):
+    profiler = ConnectionProfiler(Pings([ping]), window=10)
+    profiler.warm_up()
+    assert profiler.recommend() == timing
+
+
+def test_update_after_a_shift():
+    # Nothing to tune before the settings are applied
+    assert ConnectionProfiler(Pings([10])).update() is None
+
+    vrep = Pings([10] * 10 + [12] * 10 + [30] * 10)
+    profiler = ConnectionProfiler(vrep, window=10, shift=.5)
+    profiler.warm_up()
+    assert profiler.apply() == (10, 500)
+    # A median of 12 ms is within the shift of 10 ms: the settings stay
+    for _ in range(10):
+        assert profiler.update() is None
+    assert profiler.profile().p50 == 12
+    # The median shifts past 15 ms with the 5th sample of 30 ms, then stays within the shift of
+    # the new settings
+    updates = [profiler.update() for _ in range(10)]
+    assert updates == [None] * 4 + [(21, 600)] + [None] * 5
+    assert vrep.timings == [(10, 500), (21, 600)]
+
+
+def test_apply_to_the_library_client():
+    with pytest.raises(Exception, match='set when connecting'):
+        ConnectionProfiler(LibraryClient()).apply()
+
+
+def test_connect(server):
+    vrep, profiler = connect('127.0.0.1', server.port, RemoteVRep, window=5)
+    try:
+        assert profiler.profile().samples == 5
+        assert profiler.applied == profiler.recommend()
+        assert vrep._timeout == profiler.applied.timeOutInMs / 1000
+    finally:
+        RemoteVRep.simxFinish(vrep.clientID)
+
+
+def test_connect_with_the_library_client():
+    LibraryClient.connections = []
+    vrep, profiler = connect('127.0.0.1', 19997, LibraryClient, window=5)
+    # Connected again with the tuned cycle and a timeout long enough for the long calls
+    assert LibraryClient.connections == [None, ('127.0.0.1', 19997, True, True, -5000, 3)]
+    assert profiler.vrep is vrep
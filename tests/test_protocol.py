@@ -0,0 +1,81 @@
+import socket
+import pytest
+from vrep.const import *
+from vrep.protocol import *
+
+
+def test_message_round_trip():
+    commands = [Command(simx_cmd_get_joint_position | simx_opmode_blocking, 0, INT.pack(7), b''),
+                Command(simx_cmd_set_integer_signal | simx_opmode_oneshot, 0, pack_name('sig'),
+                        INT.pack(42), 0, simx_cmdoption_no_overwrite)]
+    message = pack_message(3, 1000, commands)
+    header, decoded = unpack_message(message)
+    assert header.version == SIMX_PROTOCOL_VERSION
+    assert header.crc == 0
+    assert header.message_id == 3 and header.client_time == 1000
+    assert [c.cmd for c in decoded] == [c.cmd for c in commands]
+    assert bytes(decoded[1].ident) == b'sig\0'
+    assert INT.unpack(decoded[1].data)[0] == 42
+    assert decoded[1].status == simx_cmdoption_no_overwrite
+    assert not any(is_chunk(c) for c in decoded)
+
+
+def test_subheader_offsets():
+    message = pack_message(1, 2, [Command(simx_cmd_get_object_position | simx_opmode_streaming,
+                                          100, INT2.pack(5, -1), b'', 0, 1)])
+    command = message[SIMX_HEADER_SIZE:]
+    assert struct.unpack_from('<i', command, simx_cmdheaderoffset_mem_size)[0] == 34
+    assert struct.unpack_from('<i', command, simx_cmdheaderoffset_full_mem_size)[0] == 34
+    assert struct.unpack_from('<H', command, simx_cmdheaderoffset_pdata_offset0)[0] == 8
+    assert struct.unpack_from('<i', command, simx_cmdheaderoffset_cmd)[0] == \
+        0x200e | simx_opmode_streaming
+    assert struct.unpack_from('<H', command, simx_cmdheaderoffset_delay_or_split)[0] == 100
+    assert command[simx_cmdheaderoffset_status] == 1
+    assert message[simx_headeroffset_version] == 11
+
+
+def test_split_command():
+    command = Command(simx_cmd_get_vision_sensor_image_rgb, 0, INT.pack(1), bytes(range(250)))
+    chunks = split_command(command, 100)
+    assert [len(c.data) for c in chunks] == [100, 100, 50]
+    assert [c.data_offset for c in chunks] == [0, 100, 200]
+    _, decoded = unpack_message(pack_message(1, 0, chunks))
+    assert all(is_chunk(c) and c.data_size == 250 for c in decoded)
+    assert b''.join(bytes(c.data) for c in decoded) == command.data
+
+
+def test_packets():
+    # A message larger than a packet is split, each packet being at most SOCKET_MAX_PACKET_SIZE
+    # bytes with its header
+    a, b = socket.socketpair()
+    message = pack_message(1, 0, [Command(simx_cmd_set_string_signal, 0, pack_name('s'),
+                                          bytes(3000))])
+    send_message(a, message)
+    a.close()
+    data = b''
+    while True:
+        received = b.recv(65536)
+        if not received:
+            break
+        data += received
+    packets = []
+    while data:
+        one, size, left = PACKET_HEADER.unpack_from(data)
+        assert one == 1 and PACKET_HEADER.size + size <= SOCKET_MAX_PACKET_SIZE
+        packets.append(left)
+        data = data[PACKET_HEADER.size + size:]
+    assert packets == [2, 1, 0]
+
+
+def test_message_reader_keeps_partial_messages():
+    a, b = socket.socketpair()
+    b.settimeout(0.05)
+    reader = MessageReader(b)
+    message = pack_message(1, 0, [Command(simx_cmd_set_string_signal, 0, pack_name('s'),
+                                          bytes(2000))])
+    size = SOCKET_MAX_PACKET_DATA_SIZE
+    a.sendall(PACKET_HEADER.pack(1, size, 1) + message[:size])
+    with pytest.raises(socket.timeout):
+        reader.read()
+    a.sendall(PACKET_HEADER.pack(1, len(message) - size, 0) + message[size:])
+    assert reader.read() == message
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from vrep.const import *
+from vrep.record import Recorder, ReplayVRep, record_magic
+from vrep.remote import RemoteVRep
+from vrep.streams import StreamRegistry
+
+
+def session(vrep):
+    handle = vrep.simxGetObjectHandle('youBot_center', simx_opmode_blocking)
+    with vrep.batch() as batch:
+        batch.simxSetObjectPosition(handle, -1, (1., 2., 3.), simx_opmode_oneshot)
+    position = vrep.simxGetObjectPosition(handle, -1, simx_opmode_blocking)
+    depth = vrep.simxGetVisionSensorDepthBuffer(handle, simx_opmode_blocking,
+                                                out=np.zeros((4, 2), np.float32))
+    streams = StreamRegistry(vrep)
+    streams.track(handle, 'joint_position')
+    missing = streams.refresh()
+    return handle, position, depth.copy(), missing
+
+
+def test_record_and_replay(vrep, server, tmp_path):
+    path = tmp_path / 'session.rec'
+    handle = server.handles[b'youBot_center\0']
+    server.depth_buffers[handle] = np.arange(8, dtype=np.float32).reshape(4, 2)
+    with Recorder(vrep, path) as recorder:
+        recorded = session(recorder)
+    # The client is left untouched
+    assert type(vrep) is RemoteVRep
+    assert 'simxGetObjectHandle' not in vrep.__dict__
+    assert recorder.count == 7
+    with open(path, 'rb') as f:
+        assert f.read(len(record_magic)) == record_magic
+
+    replay = ReplayVRep(path)
+    replayed = session(replay)
+    assert replayed[:2] == recorded[:2] == (handle, [1, 2, 3])
+    assert (replayed[2] == recorded[2]).all()
+    assert replayed[3] == recorded[3] == 1
+    assert replay.count == recorder.count
+
+
+def test_diverging_arguments(vrep, server, tmp_path):
+    path = tmp_path / 'session.rec'
+    with Recorder(vrep, path) as recorder:
+        recorder.simxGetObjectHandle('youBot_center', simx_opmode_blocking)
+    with pytest.raises(Exception, match='diverged at call 0'):
+        ReplayVRep(path).simxGetObjectHandle('rollingJoint_fl', simx_opmode_blocking)
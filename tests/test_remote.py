@@ -0,0 +1,152 @@
+import struct
+import time
+import numpy as np
+import pytest
+from vrep.const import *
+from vrep.remote import RemoteVRep
+
+
+def wait_for(predicate, timeout=2.):
+    end = time.time() + timeout
+    while not predicate():
+        assert time.time() < end
+        time.sleep(.01)
+
+
+def test_object_pose(vrep, server):
+    handle = vrep.simxGetObjectHandle('youBot_center', simx_opmode_blocking)
+    vrep.simxSetObjectPosition(handle, -1, (1, 2, 3), simx_opmode_blocking)
+    vrep.simxSetObjectOrientation(handle, -1, (.1, .2, .3), simx_opmode_blocking)
+    assert vrep.simxGetObjectPosition(handle, -1, simx_opmode_blocking) == [1, 2, 3]
+    assert vrep.simxGetObjectOrientation(handle, -1, simx_opmode_blocking) == \
+        pytest.approx([.1, .2, .3])
+    assert server.positions[handle] == (1, 2, 3)
+
+
+def test_unknown_object(vrep):
+    with pytest.raises(Exception, match='error code: 8'):
+        vrep.simxGetObjectHandle('nothing', simx_opmode_blocking)
+
+
+def test_simulation_state(vrep, server):
+    vrep.simxStartSimulation(simx_opmode_blocking)
+    assert server.running
+    vrep.simxPauseSimulation(simx_opmode_blocking)
+    assert not server.running
+    vrep.simxStartSimulation(simx_opmode_blocking)
+    vrep.simxStopSimulation(simx_opmode_blocking)
+    assert not server.running
+
+
+def test_parameters(vrep):
+    vrep.simxSetBooleanParameter(sim_boolparam_display_enabled, False, simx_opmode_blocking)
+    assert vrep.simxGetBooleanParameter(sim_boolparam_display_enabled,
+                                        simx_opmode_blocking) is False
+    assert vrep.simxGetFloatingParameter(sim_floatparam_simulation_time_step,
+                                         simx_opmode_blocking) == pytest.approx(.05)
+    assert vrep.simxGetPingTime() >= 0
+
+
+def test_streaming(vrep, server):
+    handle = vrep.simxGetObjectHandle('rollingJoint_fl', simx_opmode_blocking)
+    vrep.simxGetJointPosition(handle, simx_opmode_streaming)
+    server.joint_positions[handle] = 1.5
+    wait_for(lambda: vrep.simxGetJointPosition(handle, simx_opmode_buffer) == 1.5)
+
+
+def test_pipelined_writes(vrep, server):
+    # Writes to distinct joints are all sent, a later write to the same joint replaces the
+    # earlier one
+    fl = vrep.simxGetObjectHandle('rollingJoint_fl', simx_opmode_blocking)
+    rl = vrep.simxGetObjectHandle('rollingJoint_rl', simx_opmode_blocking)
+    vrep.simxPauseCommunication(True)
+    vrep.simxSetJointTargetVelocity(fl, 1, simx_opmode_oneshot)
+    vrep.simxSetJointTargetVelocity(rl, 2, simx_opmode_oneshot)
+    vrep.simxSetJointTargetVelocity(fl, 3, simx_opmode_oneshot)
+    assert len(vrep._outbox) == 2
+    vrep.simxPauseCommunication(False)
+    vrep.simxGetPingTime()
+    assert server.joint_targets == {fl: 3, rl: 2}
+
+
+def test_no_overwrite(vrep):
+    vrep.simxPauseCommunication(True)
+    vrep.simxAddStatusbarMessage('a', simx_opmode_oneshot)
+    vrep.simxAddStatusbarMessage('a', simx_opmode_oneshot)
+    assert len(vrep._outbox) == 2
+    vrep.simxPauseCommunication(False)
+
+
+def test_split_streaming(vrep, server):
+    handle = vrep.simxGetObjectHandle('youBot_center', simx_opmode_blocking)
+    server.images[handle] = np.random.randint(0, 255, (64, 32, 3), np.uint8)
+    vrep.simxGetVisionSensorImage(handle, 0, simx_opmode_streaming_split + 1000)
+    wait_for(lambda: vrep.simxGetVisionSensorImage(handle, 0, simx_opmode_buffer) is not None)
+    image = vrep.simxGetVisionSensorImage(handle, 0, simx_opmode_buffer)
+    assert (image == server.images[handle]).all()
+    # The reply was received in chunks of (at most) 1000 bytes
+    assert max(received for _, received in vrep.message_sizes) < 1100
+    gray = vrep.simxGetVisionSensorImage(handle, 1, simx_opmode_blocking)
+    assert gray.shape == (64, 32, 1)
+
+
+def test_vision_sensor_resolution(vrep, server):
+    # A sensor 3 pixels wide and 2 high: V-REP sends the width first, then the rows
+    handle = server.add_object('camera', object_type=sim_object_visionsensor_type)
+    server.images[handle] = np.arange(18, dtype=np.uint8).reshape((2, 3, 3))
+    server.depth_buffers[handle] = np.arange(6, dtype=np.float32).reshape((2, 3))
+    reply = server._get_vision_sensor_depth_buffer(struct.pack('<i', handle), b'')
+    assert struct.unpack_from('<2i', reply) == (3, 2)
+    image = vrep.simxGetVisionSensorImage(handle, 0, simx_opmode_blocking)
+    assert image.shape == (2, 3, 3)
+    assert (image == server.images[handle]).all()
+    # The image can be changed in place, as with the ctypes client
+    image[0, 0] = 255
+    depth = vrep.simxGetVisionSensorDepthBuffer(handle, simx_opmode_blocking)
+    assert depth.tolist() == [[0, 1, 2], [3, 4, 5]]
+    out = np.zeros((2, 3), np.float32)
+    assert vrep.simxGetVisionSensorDepthBuffer(handle, simx_opmode_blocking, out=out) is out
+    assert (out == depth).all()
+
+
+def test_call_script_function(vrep, server):
+    server.script_functions['echo'] = lambda ints, floats, strings, buffer: \
+        (ints[::-1], floats, strings + ['!'], buffer)
+    assert vrep.simxCallScriptFunction('remoteApiCommandServer', sim_scripttype_childscript,
+                                       'echo', [1, 2], [.5], ['a'], b'xy',
+                                       simx_opmode_blocking) == ([2, 1], [.5], ['a', '!'],
+                                                                 bytearray(b'xy'))
+
+
+def test_timeout_keeps_connection(vrep, server, monkeypatch):
+    # A blocking call that times out returns simx_return_timeout_flag, and the late reply does
+    # not disturb the next calls
+    server.script_functions['slow'] = lambda *args: (time.sleep(.3), args)[1]
+    vrep.set_timing(5, 100)
+    monkeypatch.setattr('vrep.remote.long_command_timeout', .1)
+    with pytest.raises(Exception, match='error code: 2'):
+        vrep.simxCallScriptFunction('s', sim_scripttype_childscript, 'slow', [1], [], [], b'',
+                                    simx_opmode_blocking)
+    vrep.set_timing(5, 2000)
+    assert vrep.simxGetConnectionId() == vrep.clientID
+    handle = vrep.simxGetObjectHandle('youBot_center', simx_opmode_blocking)
+    assert handle == server.handles[b'youBot_center\0']
+
+
+def test_long_command_timeout(vrep, server):
+    # The timeout tuned to the round trip does not apply to the commands that can take long
+    server.script_functions['slow'] = lambda *args: (time.sleep(.3), args)[1]
+    vrep.set_timing(5, 100)
+    assert vrep.simxCallScriptFunction('s', sim_scripttype_childscript, 'slow', [1], [], [], b'',
+                                       simx_opmode_blocking)[0] == [1]
+    with pytest.raises(Exception, match='error code: 32'):
+        vrep.simxLoadScene('scene.ttt', 1, simx_opmode_blocking)
+
+
+def test_finish(vrep, server):
+    RemoteVRep.simxFinish(vrep.clientID)
+    assert vrep.simxGetConnectionId() == -1
+
+
+def test_unimplemented_functions_are_not_defined(vrep):
+    assert not hasattr(vrep, 'simxGetObjectVelocity')
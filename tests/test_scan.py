@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from benchmark_hokuyo import SyntheticHokuyo, legacy_hokuyo_read, synthetic_youbot
+from youbot.scan import hokuyo_range
+from youbot.transforms import transl, trotx, troty, trotz
+
+
+class Hokuyo:
+    # Client answering simxReadVisionSensor with the packets of each subsensor
+    def __init__(self, packets):
+        self.packets = packets
+
+    def simxReadVisionSensor(self, sensorHandle, operationMode, asArray=False):
+        points = self.packets[sensorHandle]
+        return False, [np.zeros(15, np.float32),
+                       np.concatenate(([len(points), 1], points.ravel())).astype(np.float32)]
+
+
+def assert_legacy(robot, vrep, trans=None):
+    # The scan matches the points of the same packets transformed as hokuyo_read used to
+    points, contacts = legacy_hokuyo_read(robot, vrep, 0, trans)
+    scan = robot.hokuyo_read(vrep, 0, trans)
+    assert np.allclose(scan.points, points, atol=1e-4)
+    assert np.array_equal(scan.contacts, contacts)
+    return scan
+
+
+def test_points_of_the_room():
+    robot = synthetic_youbot()
+    scan = assert_legacy(robot, SyntheticHokuyo(robot))
+    points = scan.points[:, scan.contacts]
+    # Every contact is on a wall (x = 3 or y = 2) or on the pillar
+    on_wall = np.isclose(points[0], 3, atol=1e-4) | np.isclose(points[1], 2, atol=1e-4)
+    on_pillar = np.isclose(np.hypot(points[0] - 1.5, points[1] - .5), .3, atol=1e-4)
+    assert (on_wall | on_pillar).all()
+    assert on_pillar.any()
+    # The other beams stop at the range of the sensor
+    origins = scan.geometry.origins[:, ~scan.contacts]
+    assert np.allclose(np.linalg.norm(scan.points[:, ~scan.contacts] - origins, axis=0),
+                       hokuyo_range, atol=1e-4)
+
+
+def test_geometry_of_the_first_scan():
+    robot = synthetic_youbot()
+    assert_legacy(robot, SyntheticHokuyo(robot))
+    geometry = robot.hokuyo_geometry
+    assert geometry.widths == (684, 684)
+    assert np.allclose(np.linalg.norm(geometry.directions, axis=0), 1)
+    # The geometry of the first scan is kept for the scans of other rooms, in any frame
+    pose = transl([1, 2, 0]) @ trotx(0.01) @ troty(-0.02) @ trotz(0.5)
+    room = SyntheticHokuyo(robot, walls=(((1, 1), 2.5),), pillars=((-.5, 1, .4), (1, -1, .2)))
+    assert_legacy(robot, room)
+    assert_legacy(robot, room, pose)
+    assert robot.hokuyo_geometry is geometry
+
+
+def test_beams_without_return_in_the_first_scan():
+    robot = synthetic_youbot()
+    # First scan without any return (e.g. before the Hokuyo was turned on): the raw points
+    empty = np.zeros((684, 4), np.float32)
+    assert_legacy(robot, Hokuyo({1: empty, 2: empty}))
+    assert robot.hokuyo_geometry is None
+    assert_legacy(robot, SyntheticHokuyo(robot))
+    assert robot.hokuyo_geometry.complete
+
+
+def test_other_number_of_beams():
+    robot = synthetic_youbot()
+    assert_legacy(robot, SyntheticHokuyo(robot))
+    scan = assert_legacy(robot, SyntheticHokuyo(robot, widths=(10, 20)))
+    assert robot.hokuyo_geometry.widths == (10, 20)
+    assert scan.points.shape == (3, 30)
+
+
+@pytest.mark.parametrize('quantized', [False, True])
+def test_copies(quantized):
+    robot = synthetic_youbot()
+    scan = assert_legacy(robot, SyntheticHokuyo(robot))
+    points = np.array(scan.points)
+    copy = scan.quantized() if quantized else scan.copy()
+    assert np.allclose(copy.points, points, atol=1e-3)
+    assert np.array_equal(copy.contacts, scan.contacts)
+    assert copy.nbytes() == (len(scan) * 2 if quantized else scan.nbytes())
+
+
+def test_points_buffer():
+    robot = synthetic_youbot()
+    first = robot.hokuyo_read(SyntheticHokuyo(robot), 0)
+    points = np.array(first.points)
+    room = SyntheticHokuyo(robot, pillars=((1, 1, .5),))
+    second = robot.hokuyo_read(room, 0)
+    # The points of the scans of a geometry share a buffer
+    assert second.points is first.geometry.points_buffer(second)
+    assert not np.allclose(second.points, points)
+    # The first scan computes its points again
+    assert np.allclose(first.points, points)
+    assert np.allclose(second.points, legacy_hokuyo_read(robot, room, 0)[0], atol=1e-4)
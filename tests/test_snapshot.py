@@ -0,0 +1,39 @@
+import pytest
+from vrep.const import *
+from vrep.snapshot import PoseSnapshot
+
+
+@pytest.fixture
+def robot(server):
+    ref = server.add_object('ref', (1, 2, 0), (0, 0, .5), sim_object_dummy_type)
+    joint = server.add_object('joint', object_type=sim_object_joint_type)
+    server.joint_positions[joint] = .25
+    return ref, joint
+
+
+def test_streams_only_the_registered_types(vrep, robot):
+    ref, joint = robot
+    snapshot = PoseSnapshot([ref, joint])
+    snapshot.start(vrep)
+    # The shapes of the scene (youBot_center, ...) are not streamed
+    assert set(snapshot.streams) == {(sim_object_dummy_type, 9), (sim_object_joint_type, 9),
+                                     (sim_object_joint_type, 15)}
+    snapshot.fetch(vrep, simx_opmode_blocking)
+    assert snapshot[ref]['position'].tolist() == [1, 2, 0]
+    assert snapshot[ref]['orientation'][2] == pytest.approx(.5)
+    assert snapshot[joint]['joint_position'] == .25
+    snapshot.stop(vrep)
+
+
+def test_no_joint_state_without_joints(vrep, robot):
+    ref, _ = robot
+    snapshot = PoseSnapshot([ref])
+    snapshot.start(vrep)
+    assert snapshot.streams == ((sim_object_dummy_type, 9),)
+    snapshot.fetch(vrep, simx_opmode_blocking)
+    assert snapshot[ref]['position'].tolist() == [1, 2, 0]
+
+
+def test_unknown_handle(vrep, robot):
+    with pytest.raises(Exception, match='Unknown object handles'):
+        PoseSnapshot([robot[0], 99]).start(vrep)
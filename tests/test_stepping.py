@@ -0,0 +1,65 @@
+import pytest
+from vrep.const import *
+from vrep.stepping import Lockstep
+
+
+class Simulator:
+    # Client recording the calls of the engine, the simulation advancing by 50 ms per trigger
+    def __init__(self):
+        self.calls = []
+        self.time = 0
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.calls.append(name)
+        return call
+
+    def simxGetFloatingParameter(self, paramIdentifier, operationMode):
+        self.calls.append('simxGetFloatingParameter')
+        assert paramIdentifier == sim_floatparam_simulation_time_step
+        return .05
+
+    def simxSynchronousTrigger(self):
+        self.calls.append('simxSynchronousTrigger')
+        self.time += 50
+
+    def simxGetLastCmdTime(self):
+        return self.time
+
+
+def test_step():
+    vrep = Simulator()
+    engine = Lockstep(vrep, sense=lambda vrep: vrep.time).start()
+    assert vrep.calls == ['simxSynchronous', 'simxGetFloatingParameter', 'simxStartSimulation']
+    del vrep.calls[:]
+    # Each step triggers a simulation step, then waits for it with a round trip
+    assert engine.step() == 50
+    assert engine.step() == 100
+    assert vrep.calls == ['simxSynchronousTrigger', 'simxGetPingTime'] * 2
+    assert (engine.step_count, engine.sim_time_ms) == (2, 100)
+    assert engine.sim_time == .1
+
+
+def test_run_until_control_stops():
+    vrep = Simulator()
+    snapshots = []
+
+    def control(engine, snapshot):
+        snapshots.append(snapshot)
+        return engine.sim_time < .2
+
+    with Lockstep(vrep, sense=lambda vrep: vrep.time) as engine:
+        assert engine.run(control) == 4
+        assert engine.run(lambda engine, snapshot: None, steps=3) == 7
+    assert snapshots == [50, 100, 150, 200]
+    assert vrep.calls[-2:] == ['simxStopSimulation', 'simxSynchronous']
+    assert not engine.running
+
+
+def test_lockstep_with_the_loopback(vrep, server):
+    with Lockstep(vrep) as engine:
+        assert server.running
+        time_step = server.float_parameters[sim_floatparam_simulation_time_step]
+        assert engine.dt == pytest.approx(time_step)
+        assert engine.run(lambda engine, snapshot: snapshot is None, steps=5) == 5
+    assert not server.running
@@ -0,0 +1,40 @@
+import pytest
+from vrep.const import *
+from vrep.metrics import Metrics
+from vrep.streams import StreamRegistry
+
+
+def test_missing_then_latest(vrep, server):
+    handle = server.add_object('joint', object_type=sim_object_joint_type)
+    server.joint_positions[handle] = .5
+    streams = StreamRegistry(vrep)
+    streams.track(handle, 'joint_position')
+    # Not streamed yet: no value, rather than the default value of the getter
+    assert streams.latest(handle, 'joint_position') is None
+    streams.subscribe(handle, 'joint_position')
+    streams.wait(2.)
+    sample = streams.latest(handle, 'joint_position')
+    assert sample.value == .5
+    assert sample.age == 0
+    streams.unsubscribe(handle, 'joint_position')
+
+
+def test_wait_timeout(vrep, server):
+    handle = server.add_object('joint', object_type=sim_object_joint_type)
+    streams = StreamRegistry(vrep)
+    streams.track(handle, 'joint_position')
+    with pytest.raises(Exception, match='1 streams did not deliver'):
+        streams.wait(.05)
+
+
+def test_reads_through_the_instance_wrappers(vrep, server):
+    handle = server.add_object('joint', object_type=sim_object_joint_type)
+    metrics = Metrics(vrep)
+    streams = StreamRegistry(vrep)
+    streams.subscribe(handle, 'joint_position')
+    streams.wait(2.)
+    streams.refresh()
+    calls = metrics.calls
+    assert calls[('simxGetJointPosition', 'streaming')] == 1
+    assert calls[('simxGetJointPosition', 'buffer')] >= 2
+    metrics.uninstall()
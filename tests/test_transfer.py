@@ -0,0 +1,34 @@
+import numpy as np
+from vrep.const import *
+from vrep.metrics import Metrics
+from vrep.transfer import SplitTransfer, max_chunk_size, min_chunk_size
+
+
+def test_fetch(vrep, server):
+    handle = server.add_object('sensor', object_type=sim_object_visionsensor_type)
+    server.images[handle] = np.random.randint(0, 255, (64, 32, 3), np.uint8)
+    metrics = Metrics(vrep)
+    transfer = SplitTransfer(vrep)
+    for _ in range(2):
+        image = transfer.fetch('simxGetVisionSensorImage', handle, 0)
+        assert (image == server.images[handle]).all()
+    calls = metrics.calls
+    assert calls[('simxGetVisionSensorImage', 'streaming_split')] == 2
+    assert calls[('simxGetVisionSensorImage', 'discontinue')] == 2
+    # The stream is stopped, nothing is left in the input buffer
+    assert vrep.simxGetVisionSensorImage(handle, 0, simx_opmode_buffer) is None
+    assert len(transfer.throughputs[('simxGetVisionSensorImage', handle, 0)]) == 2
+    metrics.uninstall()
+
+
+def test_chunk_size(vrep):
+    transfer = SplitTransfer(vrep, deadline=.02)
+    key = ('simxGetVisionSensorImage', 1, 0)
+    # Not measured yet
+    assert transfer.chunk_size(key) == max_chunk_size
+    transfer.throughputs[key] = [1e6, 2e6, 5e5]
+    assert transfer.chunk_size(key) == 20000
+    transfer.throughputs[key] = [1e9]
+    assert transfer.chunk_size(key) == max_chunk_size
+    transfer.throughputs[key] = [1e3]
+    assert transfer.chunk_size(key) == min_chunk_size
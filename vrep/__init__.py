@@ -1,10 +1,11 @@
 import platform
 import struct
-import sys
 import os
+import inspect
 import ctypes as ct
 from vrep.const import *
 from vrep.vrchk import vrchk
+from vrep.batch import Batch
 from functools import wraps
 import numpy as np
 
@@ -20,187 +21,313 @@ elif platform.system() == 'Darwin':
 else:
     file_extension = '.so'
 libfullpath = os.path.join(os.path.dirname(__file__), 'remoteApi' + file_extension)
-libsimx = ct.CDLL(libfullpath)
-
-#ctypes wrapper prototypes
-c_GetJointPosition          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetJointPosition", libsimx))
-c_SetJointPosition          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32)(("simxSetJointPosition", libsimx))
-c_GetJointMatrix            = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetJointMatrix", libsimx))
-c_SetSphericalJointMatrix   = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxSetSphericalJointMatrix", libsimx))
-c_SetJointTargetVelocity    = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32)(("simxSetJointTargetVelocity", libsimx))
-c_SetJointTargetPosition    = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32)(("simxSetJointTargetPosition", libsimx))
-c_GetJointForce             = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetJointForce", libsimx))
-c_SetJointForce             = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32)(("simxSetJointForce", libsimx))
-c_ReadForceSensor           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.c_int32)(("simxReadForceSensor", libsimx))
-c_BreakForceSensor          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32)(("simxBreakForceSensor", libsimx))
-c_ReadVisionSensor          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.POINTER(ct.c_float)), ct.POINTER(ct.POINTER(ct.c_int32)), ct.c_int32)(("simxReadVisionSensor", libsimx))
-c_GetObjectHandle           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetObjectHandle", libsimx))
-c_GetVisionSensorImage      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_byte)), ct.c_ubyte, ct.c_int32)(("simxGetVisionSensorImage", libsimx))
-c_SetVisionSensorImage      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_byte), ct.c_int32, ct.c_ubyte, ct.c_int32)(("simxSetVisionSensorImage", libsimx))
-c_GetVisionSensorDepthBuffer= ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_float)), ct.c_int32)(("simxGetVisionSensorDepthBuffer", libsimx))
-c_GetObjectChild            = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetObjectChild", libsimx))
-c_GetObjectParent           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetObjectParent", libsimx))
-c_ReadProximitySensor       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.c_float), ct.POINTER(ct.c_int32), ct.POINTER(ct.c_float), ct.c_int32)(("simxReadProximitySensor", libsimx))
-c_LoadModel                 = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_ubyte, ct.POINTER(ct.c_int32), ct.c_int32)(("simxLoadModel", libsimx))
-c_LoadUI                    = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_ubyte, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.c_int32)(("simxLoadUI", libsimx))
-c_LoadScene                 = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_ubyte, ct.c_int32)(("simxLoadScene", libsimx))
-c_StartSimulation           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32)(("simxStartSimulation", libsimx))
-c_PauseSimulation           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32)(("simxPauseSimulation", libsimx))
-c_StopSimulation            = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32)(("simxStopSimulation", libsimx))
-c_GetUIHandle               = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetUIHandle", libsimx))
-c_GetUISlider               = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetUISlider", libsimx))
-c_SetUISlider               = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32)(("simxSetUISlider", libsimx))
-c_GetUIEventButton          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetUIEventButton", libsimx))
-c_GetUIButtonProperty       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetUIButtonProperty", libsimx))
-c_SetUIButtonProperty       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32)(("simxSetUIButtonProperty", libsimx))
-c_AddStatusbarMessage       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32)(("simxAddStatusbarMessage", libsimx))
-c_AuxiliaryConsoleOpen      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.c_int32), ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.POINTER(ct.c_int32), ct.c_int32)(("simxAuxiliaryConsoleOpen", libsimx))
-c_AuxiliaryConsoleClose     = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32)(("simxAuxiliaryConsoleClose", libsimx))
-c_AuxiliaryConsolePrint     = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32)(("simxAuxiliaryConsolePrint", libsimx))
-c_AuxiliaryConsoleShow      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_ubyte, ct.c_int32)(("simxAuxiliaryConsoleShow", libsimx))
-c_GetObjectOrientation      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetObjectOrientation", libsimx))
-c_GetObjectQuaternion       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetObjectQuaternion", libsimx))
-c_GetObjectPosition         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetObjectPosition", libsimx))
-c_SetObjectOrientation      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxSetObjectOrientation", libsimx))
-c_SetObjectQuaternion       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxSetObjectQuaternion", libsimx))
-c_SetObjectPosition         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxSetObjectPosition", libsimx))
-c_SetObjectParent           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_ubyte, ct.c_int32)(("simxSetObjectParent", libsimx))
-c_SetUIButtonLabel          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_char), ct.c_int32)(("simxSetUIButtonLabel", libsimx))
-c_GetLastErrors             = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32)(("simxGetLastErrors", libsimx))
-c_GetArrayParameter         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetArrayParameter", libsimx))
-c_SetArrayParameter         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxSetArrayParameter", libsimx))
-c_GetBooleanParameter       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.c_int32)(("simxGetBooleanParameter", libsimx))
-c_SetBooleanParameter       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_ubyte, ct.c_int32)(("simxSetBooleanParameter", libsimx))
-c_GetIntegerParameter       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetIntegerParameter", libsimx))
-c_SetIntegerParameter       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32)(("simxSetIntegerParameter", libsimx))
-c_GetFloatingParameter      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetFloatingParameter", libsimx))
-c_SetFloatingParameter      = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32)(("simxSetFloatingParameter", libsimx))
-c_GetStringParameter        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32)(("simxGetStringParameter", libsimx))
-c_GetCollisionHandle        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetCollisionHandle", libsimx))
-c_GetDistanceHandle         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetDistanceHandle", libsimx))
-c_GetCollectionHandle       = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetCollectionHandle", libsimx))
-c_ReadCollision             = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.c_int32)(("simxReadCollision", libsimx))
-c_ReadDistance              = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxReadDistance", libsimx))
-c_RemoveObject              = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32)(("simxRemoveObject", libsimx))
-c_RemoveModel               = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32)(("simxRemoveModel", libsimx))
-c_RemoveUI                  = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32)(("simxRemoveUI", libsimx))
-c_CloseScene                = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32)(("simxCloseScene", libsimx))
-c_GetObjects                = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.c_int32)(("simxGetObjects", libsimx))
-c_DisplayDialog             = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_char), ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.POINTER(ct.c_int32), ct.POINTER(ct.c_int32), ct.c_int32)(("simxDisplayDialog", libsimx))
-c_EndDialog                 = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32)(("simxEndDialog", libsimx))
-c_GetDialogInput            = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32)(("simxGetDialogInput", libsimx))
-c_GetDialogResult           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetDialogResult", libsimx))
-c_CopyPasteObjects          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32, ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.c_int32)(("simxCopyPasteObjects", libsimx))
-c_GetObjectSelection        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetObjectSelection", libsimx))
-c_SetObjectSelection        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32, ct.c_int32)(("simxSetObjectSelection", libsimx))
-c_ClearFloatSignal          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32)(("simxClearFloatSignal", libsimx))
-c_ClearIntegerSignal        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32)(("simxClearIntegerSignal", libsimx))
-c_ClearStringSignal         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32)(("simxClearStringSignal", libsimx))
-c_GetFloatSignal            = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_float), ct.c_int32)(("simxGetFloatSignal", libsimx))
-c_GetIntegerSignal          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetIntegerSignal", libsimx))
-c_GetStringSignal           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetStringSignal", libsimx))
-c_SetFloatSignal            = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_float, ct.c_int32)(("simxSetFloatSignal", libsimx))
-c_SetIntegerSignal          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32, ct.c_int32)(("simxSetIntegerSignal", libsimx))
-c_SetStringSignal           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.c_int32)(("simxSetStringSignal", libsimx))
-c_AppendStringSignal        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.c_int32)(("simxAppendStringSignal", libsimx))
-c_WriteStringStream         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.c_int32)(("simxWriteStringStream", libsimx))
-c_GetObjectFloatParameter   = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32)(("simxGetObjectFloatParameter", libsimx))
-c_SetObjectFloatParameter   = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32)(("simxSetObjectFloatParameter", libsimx))
-c_GetObjectIntParameter     = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetObjectIntParameter", libsimx))
-c_SetObjectIntParameter     = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32)(("simxSetObjectIntParameter", libsimx))
-c_GetModelProperty          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetModelProperty", libsimx))
-c_SetModelProperty          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32)(("simxSetModelProperty", libsimx))
-c_Start                     = ct.CFUNCTYPE(ct.c_int32,ct.POINTER(ct.c_char), ct.c_int32, ct.c_ubyte, ct.c_ubyte, ct.c_int32, ct.c_int32)(("simxStart", libsimx))
-c_Finish                    = ct.CFUNCTYPE(None, ct.c_int32)(("simxFinish", libsimx))
-c_GetPingTime               = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32))(("simxGetPingTime", libsimx))
-c_GetLastCmdTime            = ct.CFUNCTYPE(ct.c_int32,ct.c_int32)(("simxGetLastCmdTime", libsimx))
-c_SynchronousTrigger        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32)(("simxSynchronousTrigger", libsimx))
-c_Synchronous               = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_ubyte)(("simxSynchronous", libsimx))
-c_PauseCommunication        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_ubyte)(("simxPauseCommunication", libsimx))
-c_GetInMessageInfo          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32))(("simxGetInMessageInfo", libsimx))
-c_GetOutMessageInfo         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32))(("simxGetOutMessageInfo", libsimx))
-c_GetConnectionId           = ct.CFUNCTYPE(ct.c_int32,ct.c_int32)(("simxGetConnectionId", libsimx))
-c_CreateBuffer              = ct.CFUNCTYPE(ct.POINTER(ct.c_ubyte), ct.c_int32)(("simxCreateBuffer", libsimx))
-c_ReleaseBuffer             = ct.CFUNCTYPE(None, ct.c_void_p)(("simxReleaseBuffer", libsimx))
-c_TransferFile              = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_char), ct.c_int32, ct.c_int32)(("simxTransferFile", libsimx))
-c_EraseFile                 = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32)(("simxEraseFile", libsimx))
-c_GetAndClearStringSignal   = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32)(("simxGetAndClearStringSignal", libsimx))
-c_ReadStringStream          = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32)(("simxReadStringStream", libsimx))
-c_CreateDummy               = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_float, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.c_int32), ct.c_int32)(("simxCreateDummy", libsimx))
-c_Query                     = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32)(("simxQuery", libsimx))
-c_GetObjectGroupData        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_float)), ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32)(("simxGetObjectGroupData", libsimx))
-c_GetObjectVelocity         = ct.CFUNCTYPE(ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.c_int32)(("simxGetObjectVelocity", libsimx))
-c_CallScriptFunction        = ct.CFUNCTYPE(ct.c_int32,ct.c_int32,ct.POINTER(ct.c_char),ct.c_int32,ct.POINTER(ct.c_char),ct.c_int32,ct.POINTER(ct.c_int32),ct.c_int32,ct.POINTER(ct.c_float),ct.c_int32,ct.POINTER(ct.c_char),ct.c_int32,ct.POINTER(ct.c_ubyte),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_float)),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_char)),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_ubyte)),ct.c_int32)(("simxCallScriptFunction", libsimx))
+try:
+    libsimx = ct.CDLL(libfullpath)
+except OSError:
+    # No remote API library for this platform, the pure-python client is used instead (see the
+    # end of this file).
+    libsimx = None
+
+# ctypes prototypes of the remote API functions (return type, then argument types), by name
+# without the simx prefix. The ctypes function of simx<name> is only created on its first use and
+# bound to the module global c_<name> (see c_function): most scripts use a small part of the API.
+prototypes = {
+    'GetJointPosition':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetJointPosition':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32),
+    'GetJointMatrix':             (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetSphericalJointMatrix':    (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetJointTargetVelocity':     (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32),
+    'SetJointTargetPosition':     (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32),
+    'GetJointForce':              (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetJointForce':              (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32),
+    'ReadForceSensor':            (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.c_int32),
+    'BreakForceSensor':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32),
+    'ReadVisionSensor':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.POINTER(ct.c_float)), ct.POINTER(ct.POINTER(ct.c_int32)), ct.c_int32),
+    'GetObjectHandle':            (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetVisionSensorImage':       (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_byte)), ct.c_ubyte, ct.c_int32),
+    'SetVisionSensorImage':       (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_byte), ct.c_int32, ct.c_ubyte, ct.c_int32),
+    'GetVisionSensorDepthBuffer': (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_float)), ct.c_int32),
+    'GetObjectChild':             (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetObjectParent':            (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'ReadProximitySensor':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.c_float), ct.POINTER(ct.c_int32), ct.POINTER(ct.c_float), ct.c_int32),
+    'LoadModel':                  (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_ubyte, ct.POINTER(ct.c_int32), ct.c_int32),
+    'LoadUI':                     (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_ubyte, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.c_int32),
+    'LoadScene':                  (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_ubyte, ct.c_int32),
+    'StartSimulation':            (ct.c_int32,ct.c_int32, ct.c_int32),
+    'PauseSimulation':            (ct.c_int32,ct.c_int32, ct.c_int32),
+    'StopSimulation':             (ct.c_int32,ct.c_int32, ct.c_int32),
+    'GetUIHandle':                (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetUISlider':                (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'SetUISlider':                (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32),
+    'GetUIEventButton':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetUIButtonProperty':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'SetUIButtonProperty':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32),
+    'AddStatusbarMessage':        (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32),
+    'AuxiliaryConsoleOpen':       (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.c_int32), ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.POINTER(ct.c_int32), ct.c_int32),
+    'AuxiliaryConsoleClose':      (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32),
+    'AuxiliaryConsolePrint':      (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32),
+    'AuxiliaryConsoleShow':       (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_ubyte, ct.c_int32),
+    'GetObjectOrientation':       (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'GetObjectQuaternion':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'GetObjectPosition':          (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetObjectOrientation':       (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetObjectQuaternion':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetObjectPosition':          (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetObjectParent':            (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_ubyte, ct.c_int32),
+    'SetUIButtonLabel':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_char), ct.c_int32),
+    'GetLastErrors':              (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32),
+    'GetArrayParameter':          (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetArrayParameter':          (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'GetBooleanParameter':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.c_int32),
+    'SetBooleanParameter':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_ubyte, ct.c_int32),
+    'GetIntegerParameter':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'SetIntegerParameter':        (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32),
+    'GetFloatingParameter':       (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetFloatingParameter':       (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32),
+    'GetStringParameter':         (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32),
+    'GetCollisionHandle':         (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetDistanceHandle':          (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetCollectionHandle':        (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32),
+    'ReadCollision':              (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_ubyte), ct.c_int32),
+    'ReadDistance':               (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'RemoveObject':               (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32),
+    'RemoveModel':                (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32),
+    'RemoveUI':                   (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32),
+    'CloseScene':                 (ct.c_int32,ct.c_int32, ct.c_int32),
+    'GetObjects':                 (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.c_int32),
+    'DisplayDialog':              (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_char), ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.POINTER(ct.c_int32), ct.POINTER(ct.c_int32), ct.c_int32),
+    'EndDialog':                  (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32),
+    'GetDialogInput':             (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32),
+    'GetDialogResult':            (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'CopyPasteObjects':           (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32, ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetObjectSelection':         (ct.c_int32,ct.c_int32, ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.c_int32),
+    'SetObjectSelection':         (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32, ct.c_int32),
+    'ClearFloatSignal':           (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32),
+    'ClearIntegerSignal':         (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32),
+    'ClearStringSignal':          (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32),
+    'GetFloatSignal':             (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_float), ct.c_int32),
+    'GetIntegerSignal':           (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetStringSignal':            (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32),
+    'SetFloatSignal':             (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_float, ct.c_int32),
+    'SetIntegerSignal':           (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32, ct.c_int32),
+    'SetStringSignal':            (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.c_int32),
+    'AppendStringSignal':         (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.c_int32),
+    'WriteStringStream':          (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.c_int32),
+    'GetObjectFloatParameter':    (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.c_int32),
+    'SetObjectFloatParameter':    (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_float, ct.c_int32),
+    'GetObjectIntParameter':      (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'SetObjectIntParameter':      (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32),
+    'GetModelProperty':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.c_int32),
+    'SetModelProperty':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.c_int32),
+    'Start':                      (ct.c_int32,ct.POINTER(ct.c_char), ct.c_int32, ct.c_ubyte, ct.c_ubyte, ct.c_int32, ct.c_int32),
+    'Finish':                     (None, ct.c_int32),
+    'GetPingTime':                (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_int32)),
+    'GetLastCmdTime':             (ct.c_int32,ct.c_int32),
+    'SynchronousTrigger':         (ct.c_int32,ct.c_int32),
+    'Synchronous':                (ct.c_int32,ct.c_int32, ct.c_ubyte),
+    'PauseCommunication':         (ct.c_int32,ct.c_int32, ct.c_ubyte),
+    'GetInMessageInfo':           (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32)),
+    'GetOutMessageInfo':          (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32)),
+    'GetConnectionId':            (ct.c_int32,ct.c_int32),
+    'CreateBuffer':               (ct.POINTER(ct.c_ubyte), ct.c_int32),
+    'ReleaseBuffer':              (None, ct.c_void_p),
+    'TransferFile':               (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_char), ct.c_int32, ct.c_int32),
+    'EraseFile':                  (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.c_int32),
+    'GetAndClearStringSignal':    (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32),
+    'ReadStringStream':           (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32),
+    'CreateDummy':                (ct.c_int32,ct.c_int32, ct.c_float, ct.POINTER(ct.c_ubyte), ct.POINTER(ct.c_int32), ct.c_int32),
+    'Query':                      (ct.c_int32,ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.c_ubyte), ct.c_int32, ct.POINTER(ct.c_char), ct.POINTER(ct.POINTER(ct.c_ubyte)), ct.POINTER(ct.c_int32), ct.c_int32),
+    'GetObjectGroupData':         (ct.c_int32,ct.c_int32, ct.c_int32, ct.c_int32, ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)), ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_float)), ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_char)), ct.c_int32),
+    'GetObjectVelocity':          (ct.c_int32,ct.c_int32, ct.c_int32, ct.POINTER(ct.c_float), ct.POINTER(ct.c_float), ct.c_int32),
+    'CallScriptFunction':         (ct.c_int32,ct.c_int32,ct.POINTER(ct.c_char),ct.c_int32,ct.POINTER(ct.c_char),ct.c_int32,ct.POINTER(ct.c_int32),ct.c_int32,ct.POINTER(ct.c_float),ct.c_int32,ct.POINTER(ct.c_char),ct.c_int32,ct.POINTER(ct.c_ubyte),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_int32)),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_float)),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_char)),ct.POINTER(ct.c_int32), ct.POINTER(ct.POINTER(ct.c_ubyte)),ct.c_int32),
+}
+
+
+class LazyFunction:
+    # Placeholder of the global c_<name> until the ctypes function is created
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, *args):
+        return c_function(self.name)(*args)
+
+
+def c_function(name):
+    # The ctypes function of simx<name>, created from its prototype on the first call
+    function = globals()['c_' + name]
+    if type(function) is LazyFunction:
+        function = ct.CFUNCTYPE(*prototypes[name])(('simx' + name, libsimx))
+        globals()['c_' + name] = function
+    return function
+
+
+if libsimx is not None:
+    for name in prototypes:
+        globals()['c_' + name] = LazyFunction(name)
+    del name
 
 
 def simxPackInts(intList):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
+    # intList can be any sequence or numpy array, it is converted in one go.
+    return bytearray(np.asarray(intList, '<i4').tobytes())
 
-    if sys.version_info[0] == 3:
-        s=bytes()
-        for i in range(len(intList)):
-            s=s+struct.pack('<i',intList[i])
-        s=bytearray(s)
-    else:
-        s=''
-        for i in range(len(intList)):
-            s+=struct.pack('<i',intList[i])
-    return s
-
-def simxUnpackInts(intsPackedInString):
+def simxUnpackInts(intsPackedInString, asArray=False):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
-    b=[]
-    for i in range(int(len(intsPackedInString)/4)):
-        b.append(struct.unpack('<i',intsPackedInString[4*i:4*(i+1)])[0])
-    return b
+    # Returns a numpy array (a view of intsPackedInString) with asArray, a list otherwise.
+    b = np.frombuffer(intsPackedInString, '<i4',
+                      memoryview(intsPackedInString).nbytes // 4)
+    return b if asArray else b.tolist()
 
 def simxPackFloats(floatList):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
+    # floatList can be any sequence or numpy array, it is converted in one go.
+    return bytearray(np.asarray(floatList, '<f4').tobytes())
 
-    if sys.version_info[0] == 3:
-        s=bytes()
-        for i in range(len(floatList)):
-            s=s+struct.pack('<f',floatList[i])
-        s=bytearray(s)
-    else:
-        s=''
-        for i in range(len(floatList)):
-            s+=struct.pack('<f',floatList[i])
-    return s
-
-def simxUnpackFloats(floatsPackedInString):
+def simxUnpackFloats(floatsPackedInString, asArray=False):
     '''
     Please have a look at the function description/documentation in the V-REP user manual
     '''
-    b=[]
-    for i in range(int(len(floatsPackedInString)/4)):
-        b.append(struct.unpack('<f',floatsPackedInString[4*i:4*(i+1)])[0])
-    return b
+    # Returns a numpy array (a view of floatsPackedInString) with asArray, a list otherwise.
+    b = np.frombuffer(floatsPackedInString, '<f4',
+                      memoryview(floatsPackedInString).nbytes // 4)
+    return b if asArray else b.tolist()
+
+
+def c_array_copy(pointer, count):
+    """
+    Copies the count values of a C array into a numpy array of the same type (the pointer may be 
+    NULL when count is 0).
+    """
+    if count == 0:
+        return np.empty(0, pointer._type_)
+    return np.ctypeslib.as_array(pointer, (count,)).copy()
+
+
+def c_aux_packets(values, counts, asArray=False):
+    """
+    Splits the aux values of a vision sensor (C floats) into packets, counts being the number of
+    packets followed by the size of each one. With asArray, the packets are float32 numpy arrays,
+    views into a single copy of the values; lists of floats otherwise.
+    """
+    if asArray:
+        sizes = np.ctypeslib.as_array(counts, (counts[0] + 1,))[1:]
+        total = int(sizes.sum())
+        array = np.empty(total, np.float32)
+        if total > 0:
+            array[:] = np.ctypeslib.as_array(values, (total,))
+        return np.split(array, np.cumsum(sizes)[:-1]) if len(sizes) else []
+    packets = []
+    s = 0
+    for i in range(counts[0]):
+        packets.append(values[s:s + counts[i + 1]])
+        s += counts[i + 1]
+    return packets
+
+
+def c_buffer(data, ctype=ct.c_ubyte):
+    """
+    Pointer to the bytes of any object supporting the buffer protocol (bytes, bytearray, 
+    memoryview, numpy array, ...) and their size, without copying them. Strings are encoded in 
+    utf-8. The pointer keeps a reference to the data.
+    """
+    if type(data) is str:
+        data = data.encode('utf-8')
+    array = np.frombuffer(data, np.uint8)
+    return array.ctypes.data_as(ct.POINTER(ctype)), array.size
+
+
+def c_strings(pointer, count):
+    """
+    Decodes count consecutive null-terminated strings, one string_at (strlen) call per string.
+    """
+    strings = []
+    address = ct.cast(pointer, ct.c_void_p).value
+    for i in range(count):
+        a = ct.string_at(address)
+        address += len(a) + 1  # skip null
+        strings.append(str(a, 'utf-8'))
+    return strings
+
+
+def c_concat_strings(strings):
+    """
+    The strings (str, encoded in utf-8, or bytes) as consecutive null-terminated strings in a C
+    char array, the layout c_strings decodes.
+    """
+    concat = b''.join((s.encode('utf-8') if type(s) is str else s) + b'\0' for s in strings)
+    return (ct.c_char * len(concat)).from_buffer_copy(concat)
 
 
 def validate_output(func):
     """
-    Decorator that unpacks the output, checks the call result and returns the remaining outputs 
-    if any.
+    Decorator that checks the call result and returns the output if any. The decorated functions
+    return either the call result alone or a (result, output) pair, several outputs being packed 
+    in a tuple, so that the common success path is a single test.
+
+    With the returnCode=True keyword argument, the result is not checked and the (result, output)
+    pair is returned (output being None for the functions without one), e.g. to tell a stream 
+    without a value from a default value (see vrep/streams.py).
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
+        if kwargs and kwargs.pop('returnCode', False):
+            result = func(*args, **kwargs)
+            return result if type(result) is tuple else (result, None)
         result = func(*args, **kwargs)
-        if isinstance(result, tuple):
-            vrchk(result[0])
-            if len(result) == 2:
-                return result[1]
-            return tuple(result[1:])
-        vrchk(result)
+        if type(result) is tuple:
+            ret, output = result
+            if ret:
+                vrchk(ret)
+            return output
+        if result:
+            vrchk(result)
     return wrapper
 
 
+# Functions without an operation mode that wait for the server
+blocking_functions = {'simxGetPingTime', 'simxSynchronousTrigger', 'simxSynchronous', 'simxQuery',
+                      'simxTransferFile'}
+
+
+def operation_mode_getter(function):
+    """
+    Function returning the operationMode argument of a call to function given its args and 
+    kwargs, or None if function has no such argument.
+    """
+    try:
+        position = list(inspect.signature(function).parameters).index('operationMode')
+    except ValueError:
+        return lambda args, kwargs: None
+
+    def get(args, kwargs):
+        return args[position] if position < len(args) else kwargs.get('operationMode')
+    return get
+
+
+# Object and signal names encoded in utf-8, the same few names being used at every step.
+encoded_names = {}
+
+
+def encode_name(name):
+    if type(name) is not str:
+        return name
+    encoded = encoded_names.get(name)
+    if encoded is None:
+        encoded = name.encode('utf-8')
+        if len(encoded_names) < 4096:
+            encoded_names[name] = encoded
+    return encoded
+
+
 class VRep:
     def __init__(self, connectionAddress, connectionPort, waitUntilConnected,
                   doNotReconnectOnceDisconnected, timeOutInMs, commThreadCycleInMs):
@@ -209,7 +336,7 @@ class VRep:
         manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(connectionAddress) is str):
+        if type(connectionAddress) is str:
             connectionAddress = connectionAddress.encode('utf-8')
         self.clientID = c_Start(connectionAddress, connectionPort, waitUntilConnected,
                        doNotReconnectOnceDisconnected, timeOutInMs, commThreadCycleInMs)
@@ -217,6 +344,10 @@ class VRep:
         if self.clientID < 0:
             raise Exception("Connection to VREP failed with error status %d" % self.clientID)
 
+    def batch(self):
+        # Writes sent together in one message at the end of a block, see vrep/batch.py
+        return Batch(self)
+
     ## API functions
     # Note that for a few functions, the prototype does not match exactly that of the same 
     # function in other languages. Check 
@@ -349,7 +480,7 @@ class VRep:
         #    state=state.value
         # else:
         #    state=ord(state.value)
-        return ret, state.value, arr1, arr2
+        return ret, (state.value, arr1, arr2)
 
     @validate_output
     def simxBreakForceSensor(self, forceSensorHandle, operationMode):
@@ -359,10 +490,13 @@ class VRep:
         return c_BreakForceSensor(self.clientID, forceSensorHandle, operationMode)
 
     @validate_output
-    def simxReadVisionSensor(self, sensorHandle, operationMode):
+    def simxReadVisionSensor(self, sensorHandle, operationMode, asArray=False):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
+        # With asArray, each aux packet is returned as a float32 numpy array instead of a list. All
+        # packets are views into a single copy of the C buffer (made before it is released), which
+        # avoids building thousands of python floats for the Hokuyo and xyz sensors.
     
         detectionState = ct.c_ubyte()
         auxValues = ct.POINTER(ct.c_float)()
@@ -372,16 +506,13 @@ class VRep:
     
         auxValues2 = []
         if ret == 0:
-            s = 0
-            for i in range(auxValuesCount[0]):
-                auxValues2.append(auxValues[s:s + auxValuesCount[i + 1]])
-                s += auxValuesCount[i + 1]
+            auxValues2 = c_aux_packets(auxValues, auxValuesCount, asArray)
 
             # free C buffers
             c_ReleaseBuffer(auxValues)
             c_ReleaseBuffer(auxValuesCount)
     
-        return ret, bool(detectionState.value != 0), auxValues2
+        return ret, (bool(detectionState.value != 0), auxValues2)
 
     @validate_output
     def simxGetObjectHandle(self, objectName, operationMode):
@@ -389,13 +520,12 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
         handle = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(objectName) is str):
-            objectName = objectName.encode('utf-8')
+        objectName = encode_name(objectName)
         return c_GetObjectHandle(self.clientID, objectName, ct.byref(handle),
                                  operationMode), handle.value
 
     @validate_output
-    def simxGetVisionSensorImage(self, sensorHandle, options, operationMode):
+    def simxGetVisionSensorImage(self, sensorHandle, options, operationMode, out=None):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
@@ -403,19 +533,27 @@ class VRep:
         resolution = (ct.c_int * 2)()
         c_image = ct.POINTER(ct.c_byte)()
         bytesPerPixel = 3
-        if (options and 1) != 0:
+        if options & 1:
             bytesPerPixel = 1
         ret = c_GetVisionSensorImage(self.clientID, sensorHandle, resolution, ct.byref(c_image),
                                      options, operationMode)
     
         # Modified to return a numpy array read directly from memory with the correct shape and 
         # data type (uint8). No longer returns the resolution (use image.shape). Measured elapsed
-        # time for a 512x512x3 image from 60ms to 3ms with this version.  
-        image = None
+        # time for a 512x512x3 image from 60ms to 3ms with this version. The signed bytes of the 
+        # image are read as unsigned ones directly, without a conversion. A preallocated array can
+        # be given as out to be filled instead of allocating a new one for every frame (see 
+        # vrep/images.py). The pixels come row by row, resolution[0] being the width: the image 
+        # has resolution[1] rows of resolution[0] pixels.
+        image = out
 
         if ret == 0:
-            image = np.ctypeslib.as_array(c_image, (resolution[0], resolution[1], bytesPerPixel))
-            image = image.astype(np.uint8)
+            buffer = np.ctypeslib.as_array(ct.cast(c_image, ct.POINTER(ct.c_ubyte)),
+                                           (resolution[1], resolution[0], bytesPerPixel))
+            if out is None:
+                image = buffer.copy()
+            else:
+                np.copyto(out, buffer)
 
         return ret, image
 
@@ -424,13 +562,16 @@ class VRep:
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
-        size = len(image)
-        image_bytes = (ct.c_byte * size)(*image)
+        # Any object supporting the buffer protocol (e.g. a uint8 numpy image) is passed without 
+        # copying it; lists of pixel values are converted in one go.
+        if type(image) is list:
+            image = np.asarray(image).astype(np.uint8)
+        image_bytes, size = c_buffer(image, ct.c_byte)
         return c_SetVisionSensorImage(self.clientID, sensorHandle, image_bytes, size, options,
                                       operationMode)
 
     @validate_output
-    def simxGetVisionSensorDepthBuffer(self, sensorHandle, operationMode):
+    def simxGetVisionSensorDepthBuffer(self, sensorHandle, operationMode, out=None):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
@@ -438,15 +579,19 @@ class VRep:
         resolution = (ct.c_int * 2)()
         ret = c_GetVisionSensorDepthBuffer(self.clientID, sensorHandle, resolution,
                                            ct.byref(c_buffer), operationMode)
-        reso = []
-        buffer = []
-        if (ret == 0):
-            buffer = [None] * resolution[0] * resolution[1]
-            for i in range(resolution[0] * resolution[1]):
-                buffer[i] = c_buffer[i]
-            for i in range(2):
-                reso.append(resolution[i])
-        return ret, reso, buffer
+
+        # Modified, like simxGetVisionSensorImage, to return a float32 numpy array read directly 
+        # from memory with the shape of the image. No longer returns the resolution (use 
+        # depth.shape). A preallocated array can be given as out to be filled instead of 
+        # allocating a new one for every frame (resolution[1] rows of resolution[0] values).
+        depth = out
+        if ret == 0:
+            buffer = np.ctypeslib.as_array(c_buffer, (resolution[1], resolution[0]))
+            if out is None:
+                depth = buffer.copy()
+            else:
+                np.copyto(out, buffer)
+        return ret, depth
 
     @validate_output
     def simxGetObjectChild(self, parentObjectHandle, childIndex, operationMode):
@@ -486,7 +631,7 @@ class VRep:
         arr2 = []
         for i in range(3):
             arr2.append(detectedSurfaceNormalVector[i])
-        return ret, bool(detectionState.value != 0), arr1, detectedObjectHandle.value, arr2
+        return ret, (bool(detectionState.value != 0), arr1, detectedObjectHandle.value, arr2)
 
     @validate_output
     def simxLoadModel(self, modelPathAndName, options, operationMode):
@@ -494,7 +639,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
         baseHandle = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(modelPathAndName) is str):
+        if type(modelPathAndName) is str:
             modelPathAndName = modelPathAndName.encode('utf-8')
         return c_LoadModel(self.clientID, modelPathAndName, options, ct.byref(baseHandle),
                            operationMode), baseHandle.value
@@ -507,7 +652,7 @@ class VRep:
     
         count = ct.c_int()
         uiHandles = ct.POINTER(ct.c_int)()
-        if (sys.version_info[0] == 3) and (type(uiPathAndName) is str):
+        if type(uiPathAndName) is str:
             uiPathAndName = uiPathAndName.encode('utf-8')
         ret = c_LoadUI(self.clientID, uiPathAndName, options, ct.byref(count), ct.byref(uiHandles),
                        operationMode)
@@ -527,7 +672,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(scenePathAndName) is str):
+        if type(scenePathAndName) is str:
             scenePathAndName = scenePathAndName.encode('utf-8')
         return c_LoadScene(self.clientID, scenePathAndName, options, operationMode)
 
@@ -562,8 +707,7 @@ class VRep:
         '''
     
         handle = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(uiName) is str):
-            uiName = uiName.encode('utf-8')
+        uiName = encode_name(uiName)
         return c_GetUIHandle(self.clientID, uiName, ct.byref(handle), operationMode), handle.value
 
     @validate_output
@@ -597,7 +741,7 @@ class VRep:
         arr = []
         for i in range(2):
             arr.append(auxValues[i])
-        return ret, uiEventButtonID.value, arr
+        return ret, (uiEventButtonID.value, arr)
 
     @validate_output
     def simxGetUIButtonProperty(self, uiHandle, uiButtonID, operationMode):
@@ -623,7 +767,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(message) is str):
+        if type(message) is str:
             message = message.encode('utf-8')
         return c_AddStatusbarMessage(self.clientID, message, operationMode)
 
@@ -635,7 +779,7 @@ class VRep:
         '''
     
         consoleHandle = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(title) is str):
+        if type(title) is str:
             title = title.encode('utf-8')
         if position != None:
             c_position = (ct.c_int * 2)(*position)
@@ -671,7 +815,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(txt) is str):
+        if type(txt) is str:
             txt = txt.encode('utf-8')
         return c_AuxiliaryConsolePrint(self.clientID, consoleHandle, txt, operationMode)
 
@@ -770,11 +914,10 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if sys.version_info[0] == 3:
-            if type(upStateLabel) is str:
-                upStateLabel = upStateLabel.encode('utf-8')
-            if type(downStateLabel) is str:
-                downStateLabel = downStateLabel.encode('utf-8')
+        if type(upStateLabel) is str:
+            upStateLabel = upStateLabel.encode('utf-8')
+        if type(downStateLabel) is str:
+            downStateLabel = downStateLabel.encode('utf-8')
         return c_SetUIButtonLabel(self.clientID, uiHandle, uiButtonID, upStateLabel, downStateLabel,
                                   operationMode)
 
@@ -789,20 +932,7 @@ class VRep:
         ret = c_GetLastErrors(self.clientID, ct.byref(errorCnt), ct.byref(errorStrings),
                               operationMode)
         if ret == 0:
-            s = 0
-            for i in range(errorCnt.value):
-                a = bytearray()
-                while errorStrings[s] != b'\0':
-                    if sys.version_info[0] == 3:
-                        a.append(int.from_bytes(errorStrings[s], 'big'))
-                    else:
-                        a.append(errorStrings[s])
-                    s += 1
-                s += 1  # skip null
-                if sys.version_info[0] == 3:
-                    errors.append(str(a, 'utf-8'))
-                else:
-                    errors.append(str(a))
+            errors = c_strings(errorStrings, errorCnt.value)
     
         return ret, errors
 
@@ -890,19 +1020,9 @@ class VRep:
         ret = c_GetStringParameter(self.clientID, paramIdentifier, ct.byref(paramValue),
                                    operationMode)
     
-        a = bytearray()
+        a = ''
         if ret == 0:
-            i = 0
-            while paramValue[i] != b'\0':
-                if sys.version_info[0] == 3:
-                    a.append(int.from_bytes(paramValue[i], 'big'))
-                else:
-                    a.append(paramValue[i])
-                i = i + 1
-        if sys.version_info[0] == 3:
-            a = str(a, 'utf-8')
-        else:
-            a = str(a)
+            a = str(ct.string_at(paramValue), 'utf-8')
         return ret, a
 
     @validate_output
@@ -912,8 +1032,7 @@ class VRep:
         '''
     
         handle = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(collisionObjectName) is str):
-            collisionObjectName = collisionObjectName.encode('utf-8')
+        collisionObjectName = encode_name(collisionObjectName)
         return c_GetCollisionHandle(self.clientID, collisionObjectName, ct.byref(handle),
                                     operationMode), handle.value
 
@@ -924,8 +1043,7 @@ class VRep:
         '''
     
         handle = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(collectionName) is str):
-            collectionName = collectionName.encode('utf-8')
+        collectionName = encode_name(collectionName)
         return c_GetCollectionHandle(self.clientID, collectionName, ct.byref(handle),
                                      operationMode), handle.value
 
@@ -936,8 +1054,7 @@ class VRep:
         '''
     
         handle = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(distanceObjectName) is str):
-            distanceObjectName = distanceObjectName.encode('utf-8')
+        distanceObjectName = encode_name(distanceObjectName)
         return c_GetDistanceHandle(self.clientID, distanceObjectName, ct.byref(handle),
                                    operationMode), handle.value
 
@@ -1028,17 +1145,16 @@ class VRep:
     
         c_dialogHandle = ct.c_int()
         c_uiHandle = ct.c_int()
-        if sys.version_info[0] == 3:
-            if type(titleText) is str:
-                titleText = titleText.encode('utf-8')
-            if type(mainText) is str:
-                mainText = mainText.encode('utf-8')
-            if type(initialText) is str:
-                initialText = initialText.encode('utf-8')
+        if type(titleText) is str:
+            titleText = titleText.encode('utf-8')
+        if type(mainText) is str:
+            mainText = mainText.encode('utf-8')
+        if type(initialText) is str:
+            initialText = initialText.encode('utf-8')
         return c_DisplayDialog(self.clientID, titleText, mainText, dialogType, initialText,
                                c_titleColors, c_dialogColors, ct.byref(c_dialogHandle),
                                ct.byref(c_uiHandle),
-                               operationMode), c_dialogHandle.value, c_uiHandle.value
+                               operationMode), (c_dialogHandle.value, c_uiHandle.value)
 
     @validate_output
     def simxEndDialog(self, dialogHandle, operationMode):
@@ -1056,20 +1172,9 @@ class VRep:
         inputText = ct.POINTER(ct.c_char)()
         ret = c_GetDialogInput(self.clientID, dialogHandle, ct.byref(inputText), operationMode)
     
-        a = bytearray()
+        a = ''
         if ret == 0:
-            i = 0
-            while inputText[i] != b'\0':
-                if sys.version_info[0] == 3:
-                    a.append(int.from_bytes(inputText[i], 'big'))
-                else:
-                    a.append(inputText[i])
-                i = i + 1
-    
-        if sys.version_info[0] == 3:
-            a = str(a, 'utf-8')
-        else:
-            a = str(a)
+            a = str(ct.string_at(inputText), 'utf-8')
         return ret, a
 
 
@@ -1137,8 +1242,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         return c_ClearFloatSignal(self.clientID, signalName, operationMode)
 
     @validate_output
@@ -1147,8 +1251,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         return c_ClearIntegerSignal(self.clientID, signalName, operationMode)
 
     @validate_output
@@ -1157,8 +1260,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         return c_ClearStringSignal(self.clientID, signalName, operationMode)
 
     @validate_output
@@ -1168,8 +1270,7 @@ class VRep:
         '''
     
         signalValue = ct.c_float()
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         return c_GetFloatSignal(self.clientID, signalName, ct.byref(signalValue),
                                 operationMode), signalValue.value
 
@@ -1180,8 +1281,7 @@ class VRep:
         '''
     
         signalValue = ct.c_int()
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         return c_GetIntegerSignal(self.clientID, signalName, ct.byref(signalValue),
                                   operationMode), signalValue.value
 
@@ -1193,17 +1293,13 @@ class VRep:
     
         signalLength = ct.c_int();
         signalValue = ct.POINTER(ct.c_ubyte)()
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         ret = c_GetStringSignal(self.clientID, signalName, ct.byref(signalValue),
                                 ct.byref(signalLength), operationMode)
     
         a = bytearray()
         if ret == 0:
-            for i in range(signalLength.value):
-                a.append(signalValue[i])
-        if sys.version_info[0] != 3:
-            a = str(a)
+            a = bytearray(ct.string_at(signalValue, signalLength.value))
     
         return ret, a
 
@@ -1215,17 +1311,13 @@ class VRep:
     
         signalLength = ct.c_int();
         signalValue = ct.POINTER(ct.c_ubyte)()
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         ret = c_GetAndClearStringSignal(self.clientID, signalName, ct.byref(signalValue),
                                         ct.byref(signalLength), operationMode)
     
         a = bytearray()
         if ret == 0:
-            for i in range(signalLength.value):
-                a.append(signalValue[i])
-        if sys.version_info[0] != 3:
-            a = str(a)
+            a = bytearray(ct.string_at(signalValue, signalLength.value))
     
         return ret, a
 
@@ -1237,17 +1329,13 @@ class VRep:
     
         signalLength = ct.c_int();
         signalValue = ct.POINTER(ct.c_ubyte)()
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         ret = c_ReadStringStream(self.clientID, signalName, ct.byref(signalValue),
                                  ct.byref(signalLength), operationMode)
     
         a = bytearray()
         if ret == 0:
-            for i in range(signalLength.value):
-                a.append(signalValue[i])
-        if sys.version_info[0] != 3:
-            a = str(a)
+            a = bytearray(ct.string_at(signalValue, signalLength.value))
     
         return ret, a
 
@@ -1257,8 +1345,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         return c_SetFloatSignal(self.clientID, signalName, signalValue, operationMode)
 
     @validate_output
@@ -1267,8 +1354,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(signalName) is str):
-            signalName = signalName.encode('utf-8')
+        signalName = encode_name(signalName)
         return c_SetIntegerSignal(self.clientID, signalName, signalValue, operationMode)
 
     @validate_output
@@ -1276,73 +1362,27 @@ class VRep:
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
-    
-        sigV = signalValue
-        if sys.version_info[0] == 3:
-            if type(signalName) is str:
-                signalName = signalName.encode('utf-8')
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = signalValue.encode('utf-8')
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        else:
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = bytearray(signalValue)
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        sigV = ct.cast(sigV, ct.POINTER(ct.c_ubyte))  # IronPython needs this
-        return c_SetStringSignal(self.clientID, signalName, sigV, len(signalValue), operationMode)
+        sigV, size = c_buffer(signalValue)
+        signalName = encode_name(signalName)
+        return c_SetStringSignal(self.clientID, signalName, sigV, size, operationMode)
 
     @validate_output
     def simxAppendStringSignal(self, signalName, signalValue, operationMode):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
-    
-        sigV = signalValue
-        if sys.version_info[0] == 3:
-            if type(signalName) is str:
-                signalName = signalName.encode('utf-8')
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = signalValue.encode('utf-8')
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        else:
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = bytearray(signalValue)
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        sigV = ct.cast(sigV, ct.POINTER(ct.c_ubyte))  # IronPython needs this
-        return c_AppendStringSignal(self.clientID, signalName, sigV, len(signalValue),
-                                    operationMode)
+        sigV, size = c_buffer(signalValue)
+        signalName = encode_name(signalName)
+        return c_AppendStringSignal(self.clientID, signalName, sigV, size, operationMode)
 
     @validate_output
     def simxWriteStringStream(self, signalName, signalValue, operationMode):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
-    
-        sigV = signalValue
-        if sys.version_info[0] == 3:
-            if type(signalName) is str:
-                signalName = signalName.encode('utf-8')
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = signalValue.encode('utf-8')
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        else:
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = bytearray(signalValue)
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        sigV = ct.cast(sigV, ct.POINTER(ct.c_ubyte))  # IronPython needs this
-        return c_WriteStringStream(self.clientID, signalName, sigV, len(signalValue), operationMode)
+        sigV, size = c_buffer(signalValue)
+        signalName = encode_name(signalName)
+        return c_WriteStringStream(self.clientID, signalName, sigV, size, operationMode)
 
     @validate_output
     def simxGetObjectFloatParameter(self, objectHandle, parameterID, operationMode):
@@ -1409,12 +1449,12 @@ class VRep:
         pingTime = ct.c_int()
         return c_GetPingTime(self.clientID, ct.byref(pingTime)), pingTime.value
 
-    @validate_output
     def simxGetLastCmdTime(self):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
-    
+        # Not validated: the result is the simulation time (in ms) of the last fetched command, 
+        # not a status.
         return c_GetLastCmdTime(self.clientID)
 
     @validate_output
@@ -1471,7 +1511,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(filePathAndName) is str):
+        if type(filePathAndName) is str:
             filePathAndName = filePathAndName.encode('utf-8')
         return c_TransferFile(self.clientID, filePathAndName, fileName_serverSide, timeOut,
                               operationMode)
@@ -1482,7 +1522,7 @@ class VRep:
         Please have a look at the function description/documentation in the V-REP user manual
         '''
     
-        if (sys.version_info[0] == 3) and (type(fileName_serverSide) is str):
+        if type(fileName_serverSide) is str:
             fileName_serverSide = fileName_serverSide.encode('utf-8')
         return c_EraseFile(self.clientID, fileName_serverSide, operationMode)
 
@@ -1509,42 +1549,26 @@ class VRep:
         retSignalLength = ct.c_int();
         retSignalValue = ct.POINTER(ct.c_ubyte)()
     
-        sigV = signalValue
-        if sys.version_info[0] == 3:
-            if type(signalName) is str:
-                signalName = signalName.encode('utf-8')
-            if type(retSignalName) is str:
-                retSignalName = retSignalName.encode('utf-8')
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = signalValue.encode('utf-8')
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        else:
-            if type(signalValue) is bytearray:
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-            if type(signalValue) is str:
-                signalValue = bytearray(signalValue)
-                sigV = (ct.c_ubyte * len(signalValue))(*signalValue)
-        sigV = ct.cast(sigV, ct.POINTER(ct.c_ubyte))  # IronPython needs this
-    
-        ret = c_Query(self.clientID, signalName, sigV, len(signalValue), retSignalName,
+        sigV, size = c_buffer(signalValue)
+        signalName = encode_name(signalName)
+        retSignalName = encode_name(retSignalName)
+    
+        ret = c_Query(self.clientID, signalName, sigV, size, retSignalName,
                       ct.byref(retSignalValue), ct.byref(retSignalLength), timeOutInMs)
     
         a = bytearray()
         if ret == 0:
-            for i in range(retSignalLength.value):
-                a.append(retSignalValue[i])
-        if sys.version_info[0] != 3:
-            a = str(a)
+            a = bytearray(ct.string_at(retSignalValue, retSignalLength.value))
     
         return ret, a
 
     @validate_output
-    def simxGetObjectGroupData(self, objectType, dataType, operationMode):
+    def simxGetObjectGroupData(self, objectType, dataType, operationMode, asArray=False):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
+        # The handles, ints and floats are copied out of the C buffers in one go, as numpy arrays
+        # when asArray is set and as lists otherwise.
     
         handles = []
         intData = []
@@ -1564,69 +1588,39 @@ class VRep:
                                    ct.byref(stringDataC), ct.byref(stringDataP), operationMode)
     
         if ret == 0:
-            for i in range(handlesC.value):
-                handles.append(handlesP[i])
-            for i in range(intDataC.value):
-                intData.append(intDataP[i])
-            for i in range(floatDataC.value):
-                floatData.append(floatDataP[i])
-            s = 0
-            for i in range(stringDataC.value):
-                a = bytearray()
-                while stringDataP[s] != b'\0':
-                    if sys.version_info[0] == 3:
-                        a.append(int.from_bytes(stringDataP[s], 'big'))
-                    else:
-                        a.append(stringDataP[s])
-                    s += 1
-                s += 1  # skip null
-                if sys.version_info[0] == 3:
-                    a = str(a, 'utf-8')
-                else:
-                    a = str(a)
-                stringData.append(a)
-    
-        return ret, handles, intData, floatData, stringData
+            handles = c_array_copy(handlesP, handlesC.value)
+            intData = c_array_copy(intDataP, intDataC.value)
+            floatData = c_array_copy(floatDataP, floatDataC.value)
+            if not asArray:
+                handles, intData, floatData = handles.tolist(), intData.tolist(), floatData.tolist()
+            stringData = c_strings(stringDataP, stringDataC.value)
+    
+        return ret, (handles, intData, floatData, stringData)
 
     @validate_output
     def simxCallScriptFunction(self, scriptDescription, options, functionName, inputInts,
-                               inputFloats, inputStrings, inputBuffer, operationMode):
+                               inputFloats, inputStrings, inputBuffer, operationMode,
+                               asArray=False):
         '''
         Please have a look at the function description/documentation in the V-REP user manual
         '''
+        # The input ints and floats can be lists or numpy arrays and the input buffer any object
+        # supporting the buffer protocol (bytes, bytearray, memoryview, numpy array): they are
+        # passed to C without unpacking their elements. With asArray, the output ints and floats
+        # are returned as numpy arrays instead of lists.
     
-        inputBufferV = inputBuffer
-        if sys.version_info[0] == 3:
-            if type(scriptDescription) is str:
-                scriptDescription = scriptDescription.encode('utf-8')
-            if type(functionName) is str:
-                functionName = functionName.encode('utf-8')
-            if type(inputBuffer) is bytearray:
-                inputBufferV = (ct.c_ubyte * len(inputBuffer))(*inputBuffer)
-            if type(inputBuffer) is str:
-                inputBuffer = inputBuffer.encode('utf-8')
-                inputBufferV = (ct.c_ubyte * len(inputBuffer))(*inputBuffer)
-        else:
-            if type(inputBuffer) is bytearray:
-                inputBufferV = (ct.c_ubyte * len(inputBuffer))(*inputBuffer)
-            if type(inputBuffer) is str:
-                inputBuffer = bytearray(inputBuffer)
-                inputBufferV = (ct.c_ubyte * len(inputBuffer))(*inputBuffer)
-        inputBufferV = ct.cast(inputBufferV, ct.POINTER(ct.c_ubyte))  # IronPython needs this
-    
-        c_inInts = (ct.c_int * len(inputInts))(*inputInts)
-        c_inInts = ct.cast(c_inInts, ct.POINTER(ct.c_int))  # IronPython needs this
-        c_inFloats = (ct.c_float * len(inputFloats))(*inputFloats)
-        c_inFloats = ct.cast(c_inFloats, ct.POINTER(ct.c_float))  # IronPython needs this
-    
-        concatStr = ''.encode('utf-8')
-        for i in range(len(inputStrings)):
-            a = inputStrings[i]
-            a = a + '\0'
-            if type(a) is str:
-                a = a.encode('utf-8')
-            concatStr = concatStr + a
-        c_inStrings = (ct.c_char * len(concatStr))(*concatStr)
+        if type(scriptDescription) is str:
+            scriptDescription = scriptDescription.encode('utf-8')
+        if type(functionName) is str:
+            functionName = functionName.encode('utf-8')
+        inputBufferV, inputBufferSize = c_buffer(inputBuffer)
+    
+        inputInts = np.ascontiguousarray(inputInts, np.int32)
+        c_inInts = inputInts.ctypes.data_as(ct.POINTER(ct.c_int))
+        inputFloats = np.ascontiguousarray(inputFloats, np.float32)
+        c_inFloats = inputFloats.ctypes.data_as(ct.POINTER(ct.c_float))
+    
+        c_inStrings = c_concat_strings(inputStrings)
     
         intDataOut = []
         floatDataOut = []
@@ -1644,38 +1638,23 @@ class VRep:
     
         ret = c_CallScriptFunction(self.clientID, scriptDescription, options, functionName,
                                    len(inputInts), c_inInts, len(inputFloats), c_inFloats,
-                                   len(inputStrings), c_inStrings, len(inputBuffer), inputBufferV,
+                                   len(inputStrings), c_inStrings, inputBufferSize, inputBufferV,
                                    ct.byref(intDataC), ct.byref(intDataP), ct.byref(floatDataC),
                                    ct.byref(floatDataP), ct.byref(stringDataC),
                                    ct.byref(stringDataP), ct.byref(bufferS), ct.byref(bufferP),
                                    operationMode)
     
         if ret == 0:
-            for i in range(intDataC.value):
-                intDataOut.append(intDataP[i])
-            for i in range(floatDataC.value):
-                floatDataOut.append(floatDataP[i])
-            s = 0
-            for i in range(stringDataC.value):
-                a = bytearray()
-                while stringDataP[s] != b'\0':
-                    if sys.version_info[0] == 3:
-                        a.append(int.from_bytes(stringDataP[s], 'big'))
-                    else:
-                        a.append(stringDataP[s])
-                    s += 1
-                s += 1  # skip null
-                if sys.version_info[0] == 3:
-                    a = str(a, 'utf-8')
-                else:
-                    a = str(a)
-                stringDataOut.append(a)
-            for i in range(bufferS.value):
-                bufferOut.append(bufferP[i])
-        if sys.version_info[0] != 3:
-            bufferOut = str(bufferOut)
-    
-        return ret, intDataOut, floatDataOut, stringDataOut, bufferOut
+            intDataOut = c_array_copy(intDataP, intDataC.value)
+            floatDataOut = c_array_copy(floatDataP, floatDataC.value)
+            if not asArray:
+                intDataOut, floatDataOut = intDataOut.tolist(), floatDataOut.tolist()
+            # The C API does not give the total size of the strings, hence one strlen per string
+            stringDataOut = c_strings(stringDataP, stringDataC.value)
+            if bufferS.value > 0:
+                bufferOut = bytearray(ct.string_at(bufferP, bufferS.value))
+    
+        return ret, (intDataOut, floatDataOut, stringDataOut, bufferOut)
 
     @validate_output
     def simxGetObjectVelocity(self, objectHandle, operationMode):
@@ -1691,4 +1670,18 @@ class VRep:
         arr2 = []
         for i in range(3):
             arr2.append(angularVel[i])
-        return ret, arr1, arr2
+        return ret, (arr1, arr2)
+
+
+## Backend selection
+# VRep is the ctypes binding of the remoteApi library when it is available. Otherwise, or when the
+# VREP_BACKEND environment variable is set to 'python', it is the pure-python client of
+# vrep/remote.py, which has the same interface. Both remain available as CVRep and RemoteVRep.
+CVRep = VRep
+from vrep.remote import RemoteVRep
+
+backend = os.environ.get('VREP_BACKEND', 'ctypes' if libsimx is not None else 'python')
+if backend == 'python':
+    VRep = RemoteVRep
+elif libsimx is None:
+    raise ImportError('The remote API library %s could not be loaded' % libfullpath)
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from vrep.const import *
+from vrep import blocking_functions, operation_mode_getter
+
+
+class AsyncVRep:
+    """
+    asyncio facade of a client (VRep or RemoteVRep): every API function of the client is available
+    as a coroutine function with the same arguments and return value, e.g.
+
+        avrep = AsyncVRep(VRep('127.0.0.1', 19997, True, True, 2000, 5))
+        image = await avrep.simxGetVisionSensorImage(camera, 0, simx_opmode_blocking)
+
+    Calls that wait for the server (simx_opmode_blocking, i.e. simx_opmode_oneshot_wait, and the
+    functions of blocking_functions) run on a dedicated thread pool, so that the event loop goes
+    on with other calls (drive commands, Hokuyo reads...) during the round trip. The ctypes
+    functions release the GIL while they wait. The other calls (simx_opmode_oneshot, streaming,
+    buffer...) only touch the local buffers of the client: they run directly, without the cost
+    of a thread switch.
+    """
+
+    def __init__(self, vrep, max_workers=4):
+        self.vrep = vrep
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='vrep')
+
+    def __getattr__(self, name):
+        if not name.startswith('simx'):
+            raise AttributeError(name)
+        function = getattr(self.vrep, name)
+        blocking = name in blocking_functions
+        operation_mode = operation_mode_getter(function)
+
+        async def call(*args, **kwargs):
+            # Looked up at every call, the client may be instrumented (see vrep/metrics.py)
+            function = getattr(self.vrep, name)
+            if not blocking and operation_mode(args, kwargs) != simx_opmode_blocking:
+                return function(*args, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, partial(function, *args, **kwargs))
+
+        call.__name__ = name
+        call.__doc__ = function.__doc__
+        # Cached: __getattr__ is only called once per function
+        setattr(self, name, call)
+        return call
+
+    def close(self):
+        # Waits for the running calls and stops the thread pool (the client stays connected).
+        self.executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
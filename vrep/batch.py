@@ -0,0 +1,120 @@
+import threading
+from warnings import warn
+from vrep.const import *
+
+# Write functions that can be batched, with the number of leading arguments identifying what they
+# write to (a handle, a signal name, a parameter id...). Two writes with the same identification
+# in a batch are redundant: only the last one is sent.
+batched_functions = {
+    'simxSetJointPosition': 1,
+    'simxSetJointTargetVelocity': 1,
+    'simxSetJointTargetPosition': 1,
+    'simxSetJointForce': 1,
+    'simxSetSphericalJointMatrix': 1,
+    'simxSetObjectPosition': 2,
+    'simxSetObjectOrientation': 2,
+    'simxSetObjectQuaternion': 2,
+    'simxSetObjectFloatParameter': 2,
+    'simxSetObjectIntParameter': 2,
+    'simxSetModelProperty': 1,
+    'simxSetIntegerSignal': 1,
+    'simxSetFloatSignal': 1,
+    'simxSetStringSignal': 1,
+    'simxSetBooleanParameter': 1,
+    'simxSetIntegerParameter': 1,
+    'simxSetFloatingParameter': 1,
+    'simxSetArrayParameter': 1,
+    'simxSetUISlider': 2,
+    'simxSetUIButtonProperty': 2,
+}
+
+
+class Batch:
+    """
+    Collects the writes made with simx_opmode_oneshot through it, returned by the batch method of
+    the clients:
+
+        with vrep.batch() as batch:
+            batch.simxSetJointTargetVelocity(wheel, v, simx_opmode_oneshot)
+            ...
+        print(batch.coalesced)
+
+    The writes are sent at the end of the block, between simxPauseCommunication(True) and
+    simxPauseCommunication(False), so that they travel in one message. Redundant writes (same
+    function and same handle, signal or parameter) are coalesced, the last value wins. The other
+    calls made through the batch (reads, writes with another operation mode) go to the client
+    immediately, so a batch can be passed where a client is expected, e.g. youbot.drive(batch,
+    ...). batch() on a batch returns the batch itself: the writes of a nested block join those of
+    the outer one.
+
+    The client itself is left untouched: the calls made directly on it, e.g. by other threads, are
+    not batched. If the block raises an exception, the writes are not sent and a warning lists
+    them.
+    """
+
+    def __init__(self, vrep):
+        self.vrep = vrep
+        self.writes = {}
+        self.recorded = 0
+        self.sent = 0
+        self._lock = threading.Lock()
+        # Number of open blocks of the batch, the writes are sent when the outermost one ends
+        self._depth = 0
+
+    @property
+    def coalesced(self):
+        # Number of writes that were dropped because a later one superseded them
+        return self.recorded - self.sent
+
+    def batch(self):
+        return self
+
+    def __getattr__(self, name):
+        function = getattr(self.vrep, name)
+        key_size = batched_functions.get(name)
+        if key_size is None:
+            return function
+
+        def record(*args, **kwargs):
+            if kwargs or len(args) == 0 or args[-1] != simx_opmode_oneshot:
+                return getattr(self.vrep, name)(*args, **kwargs)
+            key = (name, args[:key_size])
+            with self._lock:
+                self.recorded += 1
+                # Move a superseded write to the end, so that writes are sent in the order of
+                # their last value
+                self.writes.pop(key, None)
+                self.writes[key] = args
+
+        record.__name__ = name
+        record.__doc__ = function.__doc__
+        # Cached: __getattr__ is only called once per function
+        setattr(self, name, record)
+        return record
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        with self._lock:
+            writes = list(self.writes.items())
+            self.writes.clear()
+        if not writes:
+            return
+        if exc_type is not None:
+            warn('%d batched writes were not sent because of %s: %s' %
+                 (len(writes), exc_type.__name__,
+                  ', '.join('%s%s' % (name, args) for (name, _), args in writes)))
+            return
+
+        self.vrep.simxPauseCommunication(True)
+        try:
+            for (name, _), args in writes:
+                getattr(self.vrep, name)(*args)
+                self.sent += 1
+        finally:
+            self.vrep.simxPauseCommunication(False)
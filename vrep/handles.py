@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import tempfile
+from vrep.const import *
+from vrep.snapshot import group_data_names, group_data_types
+
+# Directory of the files cached across runs (handles, maps...), PYTRS_CACHE if set
+default_cache_dir = os.environ.get('PYTRS_CACHE',
+                                   os.path.join(os.path.expanduser('~'), '.cache', 'pytrs'))
+
+
+def scene_fingerprint(vrep):
+    # Digest of the path of the open scene and of the handles and types of its objects.
+    path = vrep.simxGetStringParameter(sim_stringparam_scene_path_and_name, simx_opmode_blocking)
+    handles, types, _, _ = vrep.simxGetObjectGroupData(sim_handle_all, group_data_types,
+                                                       simx_opmode_blocking)
+    objects = sorted(zip(map(int, handles), map(int, types)))
+    return hashlib.sha1(json.dumps([path, objects]).encode('utf-8')).hexdigest()
+
+
+class HandleResolver:
+    """
+    Object handles by name, resolved in bulk.
+
+    Instead of one simxGetObjectHandle round trip per object, the names and handles of all the
+    objects of the scene are fetched with a single simxGetObjectGroupData call.
+
+        handles = HandleResolver(vrep)
+        ref = handles.get('youBot_center')
+
+    With a cache_dir (e.g. default_cache_dir), the mapping is also cached on disk, keyed by a
+    fingerprint of the scene: its path (sim_stringparam_scene_path_and_name) and the handles and
+    types of its objects. On the next connection, the fingerprint of the scene is computed (two
+    round trips, whatever the number of objects) and a cached mapping is used only if it was saved
+    with the same fingerprint; otherwise the names are fetched again. Renaming objects does not
+    change the fingerprint: refresh(use_cache=False) fetches the names whatever the cache.
+    """
+
+    def __init__(self, vrep, cache_dir=None):
+        self.vrep = vrep
+        self.cache_dir = cache_dir
+        self.handles = {}
+        # Scene ID of the message header, which changes with the instance of the simulator
+        self.scene_id = None
+        self.fingerprint = None
+        self.from_cache = False
+        self.refresh()
+
+    def get(self, name):
+        # Handle of an object. Objects that are not in the mapping (e.g. added after it was
+        # fetched) are resolved with simxGetObjectHandle, which raises if there is no such object.
+        handle = self.handles.get(name)
+        if handle is None:
+            handle = self.vrep.simxGetObjectHandle(name, simx_opmode_blocking)
+            self.handles[name] = handle
+        return handle
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def __contains__(self, name):
+        return name in self.handles
+
+    def refresh(self, use_cache=True):
+        # Uses the cached mapping of the current scene if there is a valid one, fetches the mapping
+        # otherwise.
+        self.fingerprint = None
+        if use_cache and self.cache_dir is not None:
+            self.fingerprint = self.scene_fingerprint()
+            cached = self._load()
+            if cached is not None:
+                self.handles = cached
+                self.from_cache = True
+                return
+        self.fetch()
+
+    def fetch(self):
+        # Fetches the names and handles of all the objects, and caches them.
+        handles, _, _, names = self.vrep.simxGetObjectGroupData(sim_handle_all, group_data_names,
+                                                                simx_opmode_blocking)
+        self.scene_id = self.vrep.simxGetInMessageInfo(simx_headeroffset_scene_id)
+        self.handles = dict(zip(names, handles))
+        self.from_cache = False
+        if self.cache_dir is not None:
+            if self.fingerprint is None:
+                self.fingerprint = self.scene_fingerprint()
+            self._save()
+
+    def scene_fingerprint(self):
+        fingerprint = scene_fingerprint(self.vrep)
+        self.scene_id = self.vrep.simxGetInMessageInfo(simx_headeroffset_scene_id)
+        return fingerprint
+
+    def _path(self):
+        return os.path.join(self.cache_dir, 'handles_%s.json' % self.fingerprint[:16])
+
+    def _load(self):
+        try:
+            with open(self._path()) as f:
+                cached = json.load(f)
+            if cached['fingerprint'] != self.fingerprint:
+                return None
+            return {name: int(handle) for name, handle in cached['handles'].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def _save(self):
+        # Written to a temporary file first: several clients may share the cache
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint,
+                       'handles': {name: int(handle) for name, handle in self.handles.items()}}, f)
+        os.replace(path, self._path())
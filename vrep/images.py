@@ -0,0 +1,80 @@
+from collections import namedtuple
+import numpy as np
+from vrep.const import *
+from vrep.vrchk import vrchk
+
+# A frame of an ImageRing: the image (a view of the ring, valid until the ring wraps around), its
+# sequence number (from 1) and the simulation time (in ms) of the reply it comes from.
+Frame = namedtuple('Frame', 'image sequence time')
+
+
+class ImageRing:
+    """
+    Streams the images of a vision sensor into a ring of preallocated frames.
+
+    simxGetVisionSensorImage allocates a new array for every image; at the rate of a camera
+    stream, that is a steady flood of allocations. The ring writes each new image into the next
+    frame of an array owned by the caller, e.g. for 4 frames of 512x512 RGB images:
+
+        ring = ImageRing(vrep, youbot.rgb_sensor, np.empty((4, 512, 512, 3), np.uint8))
+        ring.start()
+        ...
+        frame = ring.read()  # None if no new image arrived since the previous read
+        if frame is not None:
+            process(frame.image)
+
+    An image is new when its reply is more recent (simxGetLastCmdTime) than the previous one. The
+    next image is always written into a free frame, so the last len(frames) - 1 images stay
+    available, by sequence number (see __getitem__). The frames must have the resolution of the
+    sensor, with 1 channel for the grey-scale images (options=1) or 3 otherwise.
+    """
+
+    def __init__(self, vrep, sensorHandle, frames, options=0):
+        if len(frames) < 2:
+            raise Exception('An image ring needs at least 2 frames')
+        self.vrep = vrep
+        self.sensorHandle = sensorHandle
+        self.frames = frames
+        self.options = options
+        # Simulation times of the frames, and number of images written so far
+        self.times = np.full(len(frames), -1, np.int64)
+        self.sequence = 0
+
+    def start(self):
+        self.vrep.simxGetVisionSensorImage(self.sensorHandle, self.options, simx_opmode_streaming)
+
+    def stop(self):
+        self.vrep.simxGetVisionSensorImage(self.sensorHandle, self.options,
+                                           simx_opmode_discontinue)
+
+    def read(self):
+        # Writes the latest image of the stream into the next frame and returns the frame, or
+        # returns None if there is no new image.
+        slot = self.sequence % len(self.frames)
+        # returnCode: the return code tells a new image from a missing one
+        ret, _ = self.vrep.simxGetVisionSensorImage(self.sensorHandle, self.options,
+                                                    simx_opmode_buffer, out=self.frames[slot],
+                                                    returnCode=True)
+        if ret == simx_return_novalue_flag:
+            return None
+        vrchk(ret)
+        time = self.vrep.simxGetLastCmdTime()
+        if self.sequence and time <= self.times[(self.sequence - 1) % len(self.frames)]:
+            # The same image again, written into the free frame
+            return None
+        self.times[slot] = time
+        self.sequence += 1
+        return Frame(self.frames[slot], self.sequence, time)
+
+    def latest(self):
+        # The most recent frame, None if there is none yet.
+        return self[self.sequence] if self.sequence else None
+
+    def __getitem__(self, sequence):
+        if not max(self.sequence - len(self.frames) + 1, 0) < sequence <= self.sequence:
+            raise IndexError('Frame %d is not in the ring' % sequence)
+        slot = (sequence - 1) % len(self.frames)
+        return Frame(self.frames[slot], sequence, int(self.times[slot]))
+
+    def __len__(self):
+        return min(self.sequence, len(self.frames) - 1)
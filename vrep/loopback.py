@@ -0,0 +1,336 @@
+import socket
+import struct
+import threading
+from time import perf_counter as timer
+from vrep.const import *
+from vrep.protocol import *
+import numpy as np
+
+# Minimal remote API server speaking the wire protocol of vrep/protocol.py.
+#
+# It simulates nothing: it holds a small in-memory scene (object handles and poses, joint
+# positions, signals, parameters, vision sensor data and python script functions) that the
+# commands read and write. It is meant to exercise and benchmark the remote API clients without
+# V-REP, e.g.:
+#
+#   server = LoopbackServer(objects=['youBot_center'])
+#   server.start()
+#   vrep = RemoteVRep('127.0.0.1', server.port, True, True, 2000, 5)
+#
+# The replies of the split operation modes are sent in chunks of the requested size, one chunk
+# per message, a streaming split command being executed again once its whole reply was sent.
+
+
+class LoopbackServer:
+    def __init__(self, port=0, objects=(), scene_id=1, scene_path=''):
+        self.scene_id = scene_id
+        self.running = False
+        self.handles = {}
+        self.object_types = {}
+        self.positions = {}
+        self.orientations = {}
+        self.joint_positions = {}
+        self.joint_targets = {}
+        self.integer_signals = {}
+        self.float_signals = {}
+        self.string_signals = {}
+        # Integer, floating, boolean and string parameters (their identifiers overlap)
+        self.int_parameters = {sim_intparam_program_version: 30600}
+        self.float_parameters = {sim_floatparam_simulation_time_step: 0.05}
+        self.bool_parameters = {}
+        self.string_parameters = {sim_stringparam_scene_path_and_name: scene_path}
+        # Vision sensors: list of aux packets (read_vision_sensor), image (uint8 array of shape
+        # (resolution y, resolution x, 3)) and depth buffer (float32 array of shape
+        # (resolution y, resolution x))
+        self.aux_packets = {}
+        self.images = {}
+        self.depth_buffers = {}
+        # Python callables standing for script functions, by name. They take and return the ints,
+        # floats, strings and buffer.
+        self.script_functions = {}
+        for name in objects:
+            self.add_object(name)
+
+        self._start_time = timer()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('127.0.0.1', port))
+        self._socket.listen()
+        self.port = self._socket.getsockname()[1]
+        self._connections = []
+        self._lock = threading.Lock()
+        self._handlers = {
+            simx_cmd_synchronous_enable: lambda ident, data: b'',
+            simx_cmd_synchronous_disable: lambda ident, data: b'',
+            simx_cmd_synchronous_next: lambda ident, data: b'',
+            simx_cmd_set_simulation_state: self._set_simulation_state,
+            simx_cmd_load_scene: lambda ident, data: b'',
+            simx_cmd_add_statusbar_message: lambda ident, data: b'',
+            simx_cmd_get_object_handle: self._get_object_handle,
+            simx_cmd_get_objects: self._get_objects,
+            simx_cmd_get_joint_position: self._get_joint_position,
+            simx_cmd_set_joint_position: self._set_joint_position,
+            simx_cmd_set_joint_target_position: self._set_joint_target,
+            simx_cmd_set_joint_target_velocity: self._set_joint_target,
+            simx_cmd_get_object_position: self._getter(self.positions),
+            simx_cmd_get_object_orientation: self._getter(self.orientations),
+            simx_cmd_set_object_position: self._setter(self.positions),
+            simx_cmd_set_object_orientation: self._setter(self.orientations),
+            simx_cmd_read_vision_sensor: self._read_vision_sensor,
+            simx_cmd_get_vision_sensor_image_rgb: self._get_vision_sensor_image,
+            simx_cmd_get_vision_sensor_image_bw: lambda ident, data:
+                self._get_vision_sensor_image(ident, data, True),
+            simx_cmd_get_vision_sensor_depth_buffer: self._get_vision_sensor_depth_buffer,
+            simx_cmd_get_integer_signal: lambda ident, data:
+                INT.pack(self.integer_signals[bytes(ident)]),
+            simx_cmd_set_integer_signal: self._set_signal(self.integer_signals, INT),
+            simx_cmd_clear_integer_signal: self._clear_signal(self.integer_signals),
+            simx_cmd_get_float_signal: lambda ident, data:
+                FLOAT.pack(self.float_signals[bytes(ident)]),
+            simx_cmd_set_float_signal: self._set_signal(self.float_signals, FLOAT),
+            simx_cmd_clear_float_signal: self._clear_signal(self.float_signals),
+            simx_cmd_get_string_signal: lambda ident, data: self.string_signals[bytes(ident)],
+            simx_cmd_set_string_signal: self._set_string_signal,
+            simx_cmd_clear_string_signal: self._clear_signal(self.string_signals),
+            simx_cmd_get_integer_parameter: lambda ident, data:
+                INT.pack(self.int_parameters[INT.unpack(ident)[0]]),
+            simx_cmd_set_integer_parameter: self._set_parameter(self.int_parameters, INT),
+            simx_cmd_get_floating_parameter: lambda ident, data:
+                FLOAT.pack(self.float_parameters[INT.unpack(ident)[0]]),
+            simx_cmd_set_floating_parameter: self._set_parameter(self.float_parameters, FLOAT),
+            simx_cmd_get_boolean_parameter: lambda ident, data:
+                INT.pack(self.bool_parameters[INT.unpack(ident)[0]]),
+            simx_cmd_set_boolean_parameter: self._set_parameter(self.bool_parameters, INT),
+            simx_cmd_get_string_parameter: lambda ident, data:
+                self.string_parameters[INT.unpack(ident)[0]].encode('utf-8') + b'\0',
+            simx_cmd_get_object_group_data: self._get_object_group_data,
+            simx_cmd_call_script_function: self._call_script_function,
+        }
+
+    def add_object(self, name, position=(0, 0, 0), orientation=(0, 0, 0),
+                   object_type=sim_object_shape_type):
+        handle = len(self.handles) + 1
+        self.handles[pack_string(name)] = handle
+        self.object_types[handle] = object_type
+        self.positions[handle] = tuple(position)
+        self.orientations[handle] = tuple(orientation)
+        self.joint_positions[handle] = 0.
+        return handle
+
+    @property
+    def sim_time(self):
+        # Simulation time in ms
+        return int((timer() - self._start_time) * 1000) if self.running else 0
+
+    ## Connection handling
+
+    def start(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        # A socket closed while a thread waits in accept() still accepts connections, shutdown()
+        # wakes the thread up
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._connections.append(connection)
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        # Streaming commands of this client, executed for every message, and chunks of the replies
+        # of split commands still to send, one per message
+        streaming = {}
+        chunks = {}
+        while True:
+            try:
+                header, commands = unpack_message(recv_message(connection))
+            except (OSError, ConnectionError):
+                return
+            replies = []
+            for command in commands:
+                mode = command.cmd & simx_opmodemask
+                key = (command.cmd & simx_cmdmask, bytes(command.ident))
+                if mode == simx_opmode_discontinue:
+                    streaming.pop(key, None)
+                    chunks.pop(key, None)
+                elif mode in (simx_opmode_streaming, simx_opmode_streaming_split):
+                    streaming[key] = command
+                elif mode == simx_opmode_oneshot_split:
+                    chunks[key] = split_command(self.execute(command), command.delay)
+                else:
+                    replies.append(self.execute(command))
+            for key, command in streaming.items():
+                if command.cmd & simx_opmodemask == simx_opmode_streaming:
+                    replies.append(self.execute(command))
+                elif not chunks.get(key):
+                    # The command is executed again once all the chunks of its reply were sent
+                    chunks[key] = split_command(self.execute(command), command.delay)
+            for key in list(chunks):
+                replies.append(chunks[key].pop(0))
+                if not chunks[key]:
+                    del chunks[key]
+            reply = pack_message(header.message_id, header.client_time, replies,
+                                 int((timer() - self._start_time) * 1000), self.scene_id,
+                                 int(self.running))
+            try:
+                send_message(connection, reply)
+            except OSError:
+                return
+
+    def execute(self, command):
+        # Runs a command and builds its reply. Unknown commands and failures (e.g. an unknown
+        # handle or signal) set the error bit of the status.
+        status = 0
+        try:
+            data = self._handlers[command.cmd & simx_cmdmask](command.ident, command.data)
+        except (KeyError, IndexError, struct.error):
+            data = b''
+            status = 1
+        return Command(command.cmd, command.delay, bytes(command.ident), data, self.sim_time,
+                       status)
+
+    ## Command handlers
+
+    def _set_simulation_state(self, ident, data):
+        state = INT.unpack(ident)[0]
+        if state == simx_simulation_start:
+            if not self.running:
+                self._start_time = timer()
+            self.running = True
+        elif state in (simx_simulation_pause, simx_simulation_stop):
+            self.running = False
+        else:
+            raise KeyError(state)
+        return b''
+
+    def _get_object_handle(self, ident, data):
+        return INT.pack(self.handles[bytes(ident)])
+
+    def _get_objects(self, ident, data):
+        handles = list(self.handles.values())
+        return INT.pack(len(handles)) + np.asarray(handles, '<i4').tobytes()
+
+    def _get_joint_position(self, ident, data):
+        return FLOAT.pack(self.joint_positions[INT.unpack(ident)[0]])
+
+    def _set_joint_position(self, ident, data):
+        self.joint_positions[INT.unpack(ident)[0]] = FLOAT.unpack(data)[0]
+        return b''
+
+    def _set_joint_target(self, ident, data):
+        handle = INT.unpack(ident)[0]
+        if handle not in self.joint_positions:
+            raise KeyError(handle)
+        self.joint_targets[handle] = FLOAT.unpack(data)[0]
+        return b''
+
+    def _getter(self, values):
+        return lambda ident, data: FLOAT3.pack(*values[INT2.unpack(ident)[0]])
+
+    def _setter(self, values):
+        # Identified by the handle, the data is the handle of the reference frame then the value
+        def set_value(ident, data):
+            handle = INT.unpack(ident)[0]
+            if handle not in values:
+                raise KeyError(handle)
+            values[handle] = FLOAT3.unpack_from(data, INT.size)
+            return b''
+        return set_value
+
+    def _read_vision_sensor(self, ident, data):
+        packets = [np.asarray(p, '<f4') for p in self.aux_packets[INT.unpack(ident)[0]]]
+        return b''.join([UBYTE.pack(0), INT.pack(len(packets)),
+                         np.asarray([len(p) for p in packets], '<i4').tobytes()] +
+                        [p.tobytes() for p in packets])
+
+    def _get_vision_sensor_image(self, ident, data, grayscale=False):
+        image = self.images[INT.unpack(ident)[0]]
+        if grayscale:
+            image = image[:, :, :1]
+        return INT2.pack(image.shape[1], image.shape[0]) + np.ascontiguousarray(image).tobytes()
+
+    def _get_vision_sensor_depth_buffer(self, ident, data):
+        depth = self.depth_buffers[INT.unpack(ident)[0]]
+        return INT2.pack(depth.shape[1], depth.shape[0]) + np.asarray(depth, '<f4').tobytes()
+
+    def _set_signal(self, signals, value):
+        def set_signal(ident, data):
+            signals[bytes(ident)] = value.unpack(data)[0]
+            return b''
+        return set_signal
+
+    def _set_string_signal(self, ident, data):
+        self.string_signals[bytes(ident)] = bytes(data)
+        return b''
+
+    def _clear_signal(self, signals):
+        def clear_signal(ident, data):
+            signals.pop(bytes(ident), None)
+            return b''
+        return clear_signal
+
+    def _set_parameter(self, parameters, value):
+        def set_parameter(ident, data):
+            parameters[INT.unpack(ident)[0]] = value.unpack(data)[0]
+            return b''
+        return set_parameter
+
+    def _get_object_group_data(self, ident, data):
+        # Served data types: object names (0), object types (1), absolute positions (3), absolute
+        # orientations (5), both (9) and joint states (15, the force is always 0).
+        objectType, dataType = INT2.unpack(ident)
+        handles = [handle for handle in self.handles.values()
+                   if objectType == sim_handle_all or self.object_types[handle] == objectType]
+        ints = []
+        floats = []
+        strings = []
+        if dataType == 0:
+            strings = [name for name, handle in self.handles.items() if handle in handles]
+        elif dataType == 1:
+            ints = [self.object_types[handle] for handle in handles]
+        elif dataType == 3:
+            floats = [self.positions[handle] for handle in handles]
+        elif dataType == 5:
+            floats = [self.orientations[handle] for handle in handles]
+        elif dataType == 9:
+            floats = [self.positions[handle] + self.orientations[handle] for handle in handles]
+        elif dataType == 15:
+            floats = [(self.joint_positions[handle], 0) for handle in handles]
+        else:
+            raise KeyError(dataType)
+        floats = np.asarray(floats, '<f4').reshape(-1)
+        return b''.join([struct.pack('<4i', len(handles), len(ints), len(floats), len(strings)),
+                         np.asarray(handles, '<i4').tobytes(), np.asarray(ints, '<i4').tobytes(),
+                         floats.tobytes()] + strings)
+
+    def _call_script_function(self, ident, data):
+        functionName = bytes(ident[INT.size:]).split(b'\0')[1]
+        intC, floatC, stringC, bufferS = struct.unpack_from('<4i', data)
+        offset = 16
+        ints = np.frombuffer(data, '<i4', intC, offset).tolist()
+        offset += 4 * intC
+        floats = np.frombuffer(data, '<f4', floatC, offset).tolist()
+        offset += 4 * floatC
+        strings = unpack_strings(data[offset:len(data) - bufferS], stringC)
+        buffer = bytes(data[len(data) - bufferS:])
+
+        ints, floats, strings, buffer = \
+            self.script_functions[str(functionName, 'utf-8')](ints, floats, strings, buffer)
+        return b''.join([struct.pack('<4i', len(ints), len(floats), len(strings), len(buffer)),
+                         np.asarray(ints, '<i4').tobytes(), np.asarray(floats, '<f4').tobytes()] +
+                        [pack_string(s) for s in strings] + [bytes(buffer)])
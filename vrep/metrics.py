@@ -0,0 +1,176 @@
+import json
+import threading
+from functools import wraps
+from time import perf_counter as timer
+import numpy as np
+from vrep.const import *
+from vrep.protocol import simx_opmodemask
+from vrep import blocking_functions, operation_mode_getter
+
+# Names of the operation modes, for the labels of the metrics
+operation_mode_names = {
+    simx_opmode_oneshot: 'oneshot',
+    simx_opmode_blocking: 'blocking',
+    simx_opmode_streaming: 'streaming',
+    simx_opmode_oneshot_split: 'oneshot_split',
+    simx_opmode_streaming_split: 'streaming_split',
+    simx_opmode_discontinue: 'discontinue',
+    simx_opmode_buffer: 'buffer',
+    simx_opmode_remove: 'remove',
+}
+
+# Upper bounds (in ms) of the buckets of the latency histograms, the last bucket is unbounded
+latency_buckets = (0.1, 0.25, 0.5, 1., 2.5, 5., 10., 25., 50., 100., 250., 500., 1000.)
+
+
+class Metrics:
+    """
+    Traffic and latency metrics of a client.
+
+    Once installed on a client, every API function of the client is counted by operation mode,
+    and the latency of the calls that wait for the server (simx_opmode_blocking calls and the
+    functions of vrep.blocking_functions) is recorded in a histogram per function:
+
+        metrics = Metrics(vrep)
+        ...
+        print(metrics.prometheus())
+        metrics.uninstall()
+
+    The sizes of the messages are sampled from the message_sizes of the pure-python client
+    (RemoteVRep). The remoteApi library (VRep) neither exposes the sizes nor the buffers of its
+    messages, nor any header field they could be derived from: with it, the message sizes are
+    reported as not available (None in snapshot(), vrep_message_bytes_available 0 in
+    prometheus()).
+    """
+
+    def __init__(self, vrep=None):
+        self.vrep = None
+        self._lock = threading.Lock()
+        self._functions = {}
+        self.reset()
+        if vrep is not None:
+            self.install(vrep)
+
+    def reset(self):
+        with self._lock:
+            # Number of calls, by (function, operation mode name)
+            self.calls = {}
+            # Latency histograms, by function: counts per bucket (the last one is unbounded),
+            # total time (in ms) and number of calls
+            self.latencies = {}
+
+    ## Instrumentation
+
+    def install(self, vrep):
+        if self.vrep is not None:
+            raise Exception('The metrics are already installed on a client')
+        self.vrep = vrep
+        for name in dir(type(vrep)):
+            if not name.startswith('simx') or name == 'simxFinish':
+                continue
+            # The instance attribute, if any, is the wrapper of another tool, put back by uninstall
+            self._functions[name] = vrep.__dict__.get(name)
+            setattr(vrep, name, self._instrument(name, getattr(vrep, name)))
+        return self
+
+    def uninstall(self):
+        for name, attribute in self._functions.items():
+            if attribute is None:
+                del self.vrep.__dict__[name]
+            else:
+                setattr(self.vrep, name, attribute)
+        self._functions = {}
+        self.vrep = None
+
+    def _instrument(self, name, function):
+        operation_mode = operation_mode_getter(function)
+        always_blocking = name in blocking_functions
+        lock = self._lock
+
+        @wraps(function)
+        def call(*args, **kwargs):
+            mode = operation_mode(args, kwargs)
+            if mode is not None:
+                mode &= simx_opmodemask
+            if not (always_blocking or mode == simx_opmode_blocking):
+                key = (name, operation_mode_names.get(mode, 'none'))
+                with lock:
+                    self.calls[key] = self.calls.get(key, 0) + 1
+                return function(*args, **kwargs)
+
+            start = timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._record(name, 'blocking' if mode is not None else 'none',
+                             (timer() - start) * 1000)
+        return call
+
+    def _record(self, name, mode, latency):
+        with self._lock:
+            key = (name, mode)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            histogram = self.latencies.get(name)
+            if histogram is None:
+                histogram = self.latencies[name] = [[0] * (len(latency_buckets) + 1), 0., 0]
+            histogram[0][np.searchsorted(latency_buckets, latency)] += 1
+            histogram[1] += latency
+            histogram[2] += 1
+
+    ## Export
+
+    def snapshot(self):
+        # All the metrics in a dict (of builtin types only)
+        with self._lock:
+            snapshot = {
+                'calls': [{'function': name, 'opmode': mode, 'count': count}
+                          for (name, mode), count in sorted(self.calls.items())],
+                'latency_ms': {name: {'buckets': list(latency_buckets) + ['+Inf'],
+                                      'counts': list(counts), 'sum': total, 'count': count}
+                               for name, (counts, total, count) in self.latencies.items()},
+            }
+        # None if the client does not expose the sizes of its messages, {} before the first one
+        snapshot['message_bytes'] = None
+        sizes = getattr(self.vrep, 'message_sizes', None)
+        if sizes is not None:
+            # list() copies the deque atomically, the communication thread appends to it
+            sizes = np.array(list(sizes), np.float64).reshape(-1, 2)
+            snapshot['message_bytes'] = {} if not len(sizes) else {
+                direction: {'samples': len(sizes), 'mean': float(sizes[:, i].mean()),
+                            'p50': float(np.percentile(sizes[:, i], 50)),
+                            'p99': float(np.percentile(sizes[:, i], 99)),
+                            'max': float(sizes[:, i].max())}
+                for i, direction in enumerate(('out', 'in'))}
+        return snapshot
+
+    def json(self):
+        return json.dumps(self.snapshot())
+
+    def prometheus(self):
+        # The metrics in the Prometheus text exposition format
+        snapshot = self.snapshot()
+        lines = ['# TYPE vrep_calls_total counter']
+        for call in snapshot['calls']:
+            lines.append('vrep_calls_total{function="%s",opmode="%s"} %d' %
+                         (call['function'], call['opmode'], call['count']))
+
+        lines.append('# TYPE vrep_blocking_latency_ms histogram')
+        for name, histogram in sorted(snapshot['latency_ms'].items()):
+            cumulated = np.cumsum(histogram['counts'])
+            for bound, count in zip(histogram['buckets'], cumulated):
+                lines.append('vrep_blocking_latency_ms_bucket{function="%s",le="%s"} %d' %
+                             (name, bound, count))
+            lines.append('vrep_blocking_latency_ms_sum{function="%s"} %g' %
+                         (name, histogram['sum']))
+            lines.append('vrep_blocking_latency_ms_count{function="%s"} %d' %
+                         (name, histogram['count']))
+
+        lines.append('# TYPE vrep_message_bytes_available gauge')
+        lines.append('vrep_message_bytes_available %d' % (snapshot['message_bytes'] is not None))
+        if snapshot['message_bytes']:
+            lines.append('# TYPE vrep_message_bytes gauge')
+            for direction, stats in snapshot['message_bytes'].items():
+                for stat in ('mean', 'p50', 'p99', 'max'):
+                    lines.append('vrep_message_bytes{direction="%s",stat="%s"} %g' %
+                                 (direction, stat, stats[stat]))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,149 @@
+import multiprocessing
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.util import Finalize
+import vrep as _vrep
+
+# Connections to several simulators, one remote API server port each (e.g. V-REP instances
+# started with -gREMOTEAPISERVERSERVICE_<port>_FALSE_TRUE).
+#
+# - ConnectionPool opens one client per port in the current process and hands them out to threads
+#   (e.g. one YouBot per client);
+# - EpisodePool runs episodes in a process pool, each worker process owning the client to one of
+#   the simulators for its whole life.
+#
+# Clients are closed with simxFinish(clientID), never with simxFinish(-1) which would close the
+# other clients of the process.
+
+
+class ConnectionPool:
+    def __init__(self, ports, address='127.0.0.1', timeOutInMs=2000, commThreadCycleInMs=5,
+                 client_class=None):
+        client_class = client_class or _vrep.VRep
+        self.clients = []
+        try:
+            for port in ports:
+                self.clients.append(client_class(address, port, True, True, timeOutInMs,
+                                                 commThreadCycleInMs))
+        except Exception:
+            self.close()
+            raise
+        self._free = queue.Queue()
+        for client in self.clients:
+            self._free.put(client)
+
+    def __len__(self):
+        return len(self.clients)
+
+    @contextmanager
+    def client(self, timeout=None):
+        # Takes a free client for the duration of the block, waiting for one if needed:
+        #   with pool.client() as vrep:
+        #       youbot = YouBot(vrep)
+        client = self._free.get(timeout=timeout)
+        try:
+            yield client
+        finally:
+            self._free.put(client)
+
+    def map(self, episode, episodes):
+        # Runs episode(vrep, *args) for each args of episodes, one thread per client, and returns
+        # the results in order.
+        def run(args):
+            with self.client() as client:
+                return episode(client, *args)
+
+        with ThreadPoolExecutor(len(self.clients)) as executor:
+            return list(executor.map(run, episodes))
+
+    def close(self):
+        for client in self.clients:
+            type(client).simxFinish(client.clientID)
+        self.clients = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Client of a worker process of an EpisodePool, or the exception raised by its connection
+_worker_client = None
+_worker_error = None
+
+
+def _init_worker(ports, address, timeOutInMs, commThreadCycleInMs):
+    # The port goes back to the queue when the worker exits, for the worker that replaces it.
+    global _worker_client, _worker_error
+    port = ports.get()
+    try:
+        _worker_client = _vrep.VRep(address, port, True, True, timeOutInMs, commThreadCycleInMs)
+    except Exception as e:
+        # Raised by the episodes: an exception of the initializer would only make the pool start
+        # another worker, again and again
+        _worker_error = e
+        ports.put(port)
+        return
+    Finalize(None, _release_worker, args=(_worker_client, port, ports), exitpriority=10)
+
+
+def _release_worker(client, port, ports):
+    try:
+        type(client).simxFinish(client.clientID)
+    finally:
+        ports.put(port)
+
+
+def _run_episode(episode, args):
+    if _worker_client is None:
+        raise Exception('The worker could not connect: %s' % _worker_error)
+    return episode(_worker_client, *args)
+
+
+class EpisodePool:
+    """
+    Runs episodes in parallel on several simulators, one worker process per simulator:
+
+        def episode(vrep, seed):
+            youbot = YouBot(vrep)
+            ...
+            return score
+
+        with EpisodePool([19997, 19998, 19999]) as pool:
+            scores = pool.map(episode, [(seed,) for seed in range(30)])
+
+    The episode function and its arguments are sent to the workers, they must be picklable (a
+    function defined at the top level of a module). Each worker connects once, when it starts, to
+    the port it takes from the list, and keeps its client for all its episodes. With
+    maxtasksperchild, a worker is replaced after that many episodes (e.g. to bound the memory of
+    the episodes), the new worker connecting to the port of the one it replaces.
+    """
+
+    def __init__(self, ports, address='127.0.0.1', timeOutInMs=2000, commThreadCycleInMs=5,
+                 maxtasksperchild=None):
+        ports_queue = multiprocessing.Queue()
+        for port in ports:
+            ports_queue.put(port)
+        self._pool = multiprocessing.Pool(len(ports), _init_worker,
+                                          (ports_queue, address, timeOutInMs, commThreadCycleInMs),
+                                          maxtasksperchild)
+
+    def map(self, episode, episodes):
+        # Results in order; an episode is sent to the first free worker.
+        return self._pool.starmap(_run_episode, [(episode, tuple(args)) for args in episodes],
+                                  chunksize=1)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.terminate()
@@ -0,0 +1,110 @@
+from collections import deque, namedtuple
+import numpy as np
+import vrep as _vrep
+from vrep.remote import long_command_timeout
+
+# Round-trip times (in ms) of a connection, over the samples of the window
+Profile = namedtuple('Profile', 'samples p50 p90 p99 max')
+
+# Communication settings recommended for a connection
+Timing = namedtuple('Timing', 'commThreadCycleInMs timeOutInMs')
+
+
+class ConnectionProfiler:
+    """
+    Measures the round-trip time of a connection (simxGetPingTime) and tunes its communication
+    settings, instead of the fixed 5 ms cycle and 2 s timeout of the demos:
+
+    - the communication thread sends a message per cycle and the reply comes a round trip later,
+      so a cycle much shorter than the median round trip only polls the server more often; the
+      recommended cycle is the median round trip (between 1 and 50 ms);
+    - a blocking call waits for a round trip (and for the simulator to process the command); the
+      recommended timeout is 20 times the 99th percentile of the round trip, and at least 500 ms.
+      It does not apply to the commands that can take long, e.g. loading a scene, which keep a
+      timeout of their own (see vrep/remote.py).
+
+    The pure-python client (RemoteVRep) can apply new settings to an open connection; the
+    remoteApi library only takes them in simxStart (see connect()). Once applied, update() goes on
+    sampling (e.g. once per iteration of a control loop) and tunes the connection again when the
+    median round trip shifts by more than the given fraction.
+    """
+
+    def __init__(self, vrep, window=50, shift=.5):
+        self.vrep = vrep
+        self.shift = shift
+        self.pings = deque(maxlen=window)
+        # Settings applied last, and the median round trip they were computed from
+        self.applied = None
+        self._applied_p50 = None
+
+    def sample(self, count=1):
+        for _ in range(count):
+            self.pings.append(self.vrep.simxGetPingTime())
+
+    def warm_up(self):
+        # Fills the window.
+        self.sample(self.pings.maxlen)
+        return self.profile()
+
+    def profile(self):
+        pings = np.asarray(self.pings, np.float64)
+        p50, p90, p99 = np.percentile(pings, (50, 90, 99))
+        return Profile(len(pings), float(p50), float(p90), float(p99), float(pings.max()))
+
+    def recommend(self):
+        profile = self.profile()
+        return Timing(int(np.clip(np.ceil(profile.p50), 1, 50)),
+                      int(max(np.ceil(20 * profile.p99), 500)))
+
+    def apply(self, timing=None):
+        if not hasattr(type(self.vrep), 'set_timing'):
+            raise Exception('The communication settings of the remoteApi library client are set '
+                            'when connecting, see vrep.profiler.connect')
+        timing = timing or self.recommend()
+        self.vrep.set_timing(*timing)
+        self.applied = timing
+        self._applied_p50 = self.profile().p50
+        return timing
+
+    def update(self):
+        # Takes one more sample and tunes the connection again if the latency shifted. Returns the
+        # new settings, or None if they did not change.
+        self.sample()
+        if self.applied is None:
+            return None
+        p50 = self.profile().p50
+        if abs(p50 - self._applied_p50) <= self.shift * max(self._applied_p50, 1):
+            return None
+        timing = self.recommend()
+        if timing == self.applied:
+            self._applied_p50 = p50
+            return None
+        return self.apply(timing)
+
+
+def connect(connectionAddress, connectionPort, client_class=None, window=20):
+    """
+    Connects with settings tuned to the connection: the round trip is profiled over the window,
+    then the recommended settings are applied (the ctypes client reconnects with them). Returns
+    the client and its profiler, which can go on tuning the pure-python client (update()); the
+    profiler of the ctypes client only goes on measuring.
+
+    The remoteApi library has a single timeout for all the blocking calls, long ones included: the
+    ctypes client keeps a timeout of at least long_command_timeout, only its cycle is tuned.
+    """
+    client_class = client_class or _vrep.VRep
+    vrep = client_class(connectionAddress, connectionPort, True, True, 2000, 5)
+    profiler = ConnectionProfiler(vrep, window)
+    profiler.warm_up()
+    if hasattr(client_class, 'set_timing'):
+        profiler.apply()
+        return vrep, profiler
+
+    # A negative timeout is the timeout of the blocking calls (a positive one, of the connection)
+    timing = profiler.recommend()
+    timing = timing._replace(timeOutInMs=max(timing.timeOutInMs, long_command_timeout * 1000))
+    client_class.simxFinish(vrep.clientID)
+    vrep = client_class(connectionAddress, connectionPort, True, True, -timing.timeOutInMs,
+                        timing.commThreadCycleInMs)
+    profiler.vrep = vrep
+    return vrep, profiler
@@ -0,0 +1,315 @@
+import struct
+import socket
+from collections import namedtuple
+from vrep.const import *
+import numpy as np
+
+# Remote API wire protocol, as implemented by the remoteApi library shipped in vrep/.
+#
+# A message is a SIMX_HEADER_SIZE header followed by any number of commands. Each command is a
+# SIMX_SUBHEADER_SIZE sub-header followed by its pure data. The first pdata_offset0 bytes of the
+# pure data identify the command (e.g. the object handle of simxGetJointPosition or the signal
+# name of simxGetIntegerSignal): a reply from the server has the same command id and the same
+# identification as the request it answers. See the simx_headeroffset_* and
+# simx_cmdheaderoffset_* constants in vrep/const.py for the layout.
+#
+# The library writes SIMX_PROTOCOL_VERSION in the version field and 0 in the CRC field, and
+# checks neither of them in the replies.
+#
+# A command of a split operation mode carries its pure data in chunks, one per message: the
+# full_mem_size field is the size of the whole command and pdata_offset1 the offset of the chunk
+# in the pure data (after the identification).
+#
+# Messages are sent over TCP in packets of at most SOCKET_MAX_PACKET_SIZE bytes (header included),
+# each one prefixed by three simxUShort: 1 (to detect the endianness), the size of the packet data
+# and the number of packets still to come.
+#
+# All values are little-endian. Everything is encoded and decoded with precompiled struct.Struct
+# instances working directly on bytearray/memoryview buffers, so the only copies are the one into
+# the outgoing buffer and the one out of the socket.
+
+HEADER = struct.Struct('<HBiiiHB')
+SUBHEADER = struct.Struct('<iiHiiHiBB')
+PACKET_HEADER = struct.Struct('<HHH')
+SOCKET_MAX_PACKET_SIZE = 1300
+SOCKET_MAX_PACKET_DATA_SIZE = SOCKET_MAX_PACKET_SIZE - PACKET_HEADER.size
+SIMX_PROTOCOL_VERSION = 11
+
+assert HEADER.size == SIMX_HEADER_SIZE
+assert SUBHEADER.size == SIMX_SUBHEADER_SIZE
+
+# The command field of the sub-header combines the command id (lower 16 bits) and the operation
+# mode (upper bits). The lower 16 bits of an operation mode are the delay of a streaming command
+# or the chunk size of a split command, they are sent in the delay_or_split field.
+simx_cmdmask = 0x00ffff
+simx_opmodemask = 0xff0000
+
+# Bit of the status field written by the client: the command must not replace a command with the
+# same id and identification that was not sent yet. Bit 0 of the status of a reply is the error
+# flag.
+simx_cmdoption_no_overwrite = 1
+
+# Command ids, grouped by the kind of data identifying the command.
+# Commands without identification data
+simx_cmdnull_start = 0x0000
+simx_cmd_synchronous_enable = simx_cmdnull_start + 1
+simx_cmd_synchronous_disable = simx_cmdnull_start + 2
+simx_cmd_synchronous_next = simx_cmdnull_start + 3
+simx_cmd_get_last_errors = simx_cmdnull_start + 4
+simx_cmd_close_scene = simx_cmdnull_start + 5
+simx_cmd_get_object_selection = simx_cmdnull_start + 6
+
+# Commands identified by one simxInt
+simx_cmd4bytes_start = 0x1000
+simx_cmd_get_joint_position = simx_cmd4bytes_start + 1
+simx_cmd_set_joint_position = simx_cmd4bytes_start + 2
+# The grayscale image has its own command (options bit 0 of simxGetVisionSensorImage)
+simx_cmd_get_vision_sensor_image_bw = simx_cmd4bytes_start + 3
+simx_cmd_get_vision_sensor_image_rgb = simx_cmd4bytes_start + 4
+# Identified by 0 (start), 1 (pause) or 2 (stop)
+simx_cmd_set_simulation_state = simx_cmd4bytes_start + 7
+simx_cmd_set_joint_target_velocity = simx_cmd4bytes_start + 8
+simx_cmd_set_joint_target_position = simx_cmd4bytes_start + 12
+simx_cmd_read_vision_sensor = simx_cmd4bytes_start + 17
+simx_cmd_get_vision_sensor_depth_buffer = simx_cmd4bytes_start + 23
+simx_cmd_set_object_orientation = simx_cmd4bytes_start + 26
+simx_cmd_set_object_position = simx_cmd4bytes_start + 27
+simx_cmd_get_boolean_parameter = simx_cmd4bytes_start + 31
+simx_cmd_set_boolean_parameter = simx_cmd4bytes_start + 32
+simx_cmd_get_integer_parameter = simx_cmd4bytes_start + 33
+simx_cmd_set_integer_parameter = simx_cmd4bytes_start + 34
+simx_cmd_get_floating_parameter = simx_cmd4bytes_start + 35
+simx_cmd_set_floating_parameter = simx_cmd4bytes_start + 36
+simx_cmd_get_string_parameter = simx_cmd4bytes_start + 37
+simx_cmd_get_objects = simx_cmd4bytes_start + 42
+
+# Commands identified by two simxInt
+simx_cmd8bytes_start = 0x2000
+simx_cmd_get_object_group_data = simx_cmd8bytes_start + 12
+simx_cmd_get_object_orientation = simx_cmd8bytes_start + 13
+simx_cmd_get_object_position = simx_cmd8bytes_start + 14
+
+# Commands identified by one string
+simx_cmd1string_start = 0x3000
+simx_cmd_get_object_handle = simx_cmd1string_start + 1
+simx_cmd_load_scene = simx_cmd1string_start + 2
+simx_cmd_add_statusbar_message = simx_cmd1string_start + 8
+simx_cmd_clear_float_signal = simx_cmd1string_start + 13
+simx_cmd_clear_integer_signal = simx_cmd1string_start + 14
+simx_cmd_clear_string_signal = simx_cmd1string_start + 15
+simx_cmd_get_float_signal = simx_cmd1string_start + 16
+simx_cmd_get_integer_signal = simx_cmd1string_start + 17
+simx_cmd_get_string_signal = simx_cmd1string_start + 18
+simx_cmd_set_float_signal = simx_cmd1string_start + 19
+simx_cmd_set_integer_signal = simx_cmd1string_start + 20
+simx_cmd_set_string_signal = simx_cmd1string_start + 21
+
+# Commands identified by one simxInt and two strings
+simx_cmd4bytes2strings_start = 0x3400
+simx_cmd_call_script_function = simx_cmd4bytes2strings_start + 1
+
+# Simulation states identifying simx_cmd_set_simulation_state
+simx_simulation_start = 0
+simx_simulation_pause = 1
+simx_simulation_stop = 2
+
+# Parameter read by simxGetPingTime
+simx_ping_parameter = sim_intparam_program_version
+
+Header = namedtuple('Header', 'crc version message_id client_time server_time scene_id '
+                              'server_state')
+
+# One command of a message. ident and data are the identification and the rest of the pure data,
+# as bytes-like objects (memoryviews into the received message when decoded). The status is the
+# options of a request, or the error flag of a reply. A chunk of a split command holds the data
+# from data_offset on, out of data_size bytes.
+Command = namedtuple('Command', 'cmd delay ident data sim_time status data_size data_offset')
+Command.__new__.__defaults__ = (0, 0, None, 0)
+
+
+def pack_message(message_id, client_time, commands, server_time=0, scene_id=0, server_state=0):
+    # Encode a message in a single preallocated buffer.
+    size = SIMX_HEADER_SIZE
+    for command in commands:
+        size += SIMX_SUBHEADER_SIZE + len(command.ident) + len(command.data)
+    message = bytearray(size)
+
+    offset = SIMX_HEADER_SIZE
+    for command in commands:
+        ident_size = len(command.ident)
+        mem_size = SIMX_SUBHEADER_SIZE + ident_size + len(command.data)
+        full_mem_size = mem_size if command.data_size is None else \
+            SIMX_SUBHEADER_SIZE + ident_size + command.data_size
+        SUBHEADER.pack_into(message, offset, mem_size, full_mem_size, ident_size,
+                            command.data_offset, command.cmd, command.delay, command.sim_time,
+                            command.status, 0)
+        start = offset + SIMX_SUBHEADER_SIZE
+        message[start:start + ident_size] = command.ident
+        message[start + ident_size:offset + mem_size] = command.data
+        offset += mem_size
+
+    HEADER.pack_into(message, 0, 0, SIMX_PROTOCOL_VERSION, message_id, client_time, server_time,
+                     scene_id, server_state)
+    return message
+
+
+def unpack_message(message):
+    # Decode a message. The identification and data of the commands are memoryviews into the
+    # message, nothing is copied.
+    view = memoryview(message)
+    if len(view) < SIMX_HEADER_SIZE:
+        raise Exception('Remote API message is too short (%d bytes)' % len(view))
+    header = Header._make(HEADER.unpack_from(view))
+
+    commands = []
+    offset = SIMX_HEADER_SIZE
+    while offset < len(view):
+        mem_size, full_mem_size, ident_size, data_offset, cmd, delay, sim_time, status, _ = \
+            SUBHEADER.unpack_from(view, offset)
+        if mem_size < SIMX_SUBHEADER_SIZE + ident_size or offset + mem_size > len(view):
+            raise Exception('Malformed remote API command at offset %d' % offset)
+        start = offset + SIMX_SUBHEADER_SIZE
+        commands.append(Command(cmd, delay, view[start:start + ident_size],
+                                view[start + ident_size:offset + mem_size], sim_time, status,
+                                full_mem_size - SIMX_SUBHEADER_SIZE - ident_size, data_offset))
+        offset += mem_size
+    return header, commands
+
+
+def split_command(command, chunk_size):
+    # Chunks of a command, of at most chunk_size bytes of data each (split operation modes).
+    data = memoryview(command.data)
+    chunk_size = max(chunk_size, 1)
+    return [command._replace(data=data[offset:offset + chunk_size], data_size=len(data),
+                             data_offset=offset)
+            for offset in range(0, max(len(data), 1), chunk_size)]
+
+
+def is_chunk(command):
+    return command.data_size is not None and (command.data_offset != 0 or
+                                              len(command.data) != command.data_size)
+
+
+def header_field(header: Header, offset):
+    # Value of a header field given its simx_headeroffset_* constant (as simxGetInMessageInfo and
+    # simxGetOutMessageInfo take).
+    return header[[simx_headeroffset_crc, simx_headeroffset_version, simx_headeroffset_message_id,
+                   simx_headeroffset_client_time, simx_headeroffset_server_time,
+                   simx_headeroffset_scene_id, simx_headeroffset_server_state].index(offset)]
+
+
+def send_message(sock: socket.socket, message):
+    view = memoryview(message)
+    count = max(1, -(-len(view) // SOCKET_MAX_PACKET_DATA_SIZE))
+    parts = []
+    for i in range(count):
+        packet = view[i * SOCKET_MAX_PACKET_DATA_SIZE:(i + 1) * SOCKET_MAX_PACKET_DATA_SIZE]
+        parts.append(PACKET_HEADER.pack(1, len(packet), count - i - 1))
+        parts.append(packet)
+    sock.sendall(b''.join(parts))
+
+
+def _recv_into(sock: socket.socket, view):
+    while len(view):
+        n = sock.recv_into(view)
+        if n == 0:
+            raise ConnectionError('Remote API connection closed')
+        view = view[n:]
+
+
+def recv_message(sock: socket.socket):
+    header = bytearray(PACKET_HEADER.size)
+    parts = []
+    while True:
+        _recv_into(sock, memoryview(header))
+        one, size, left = PACKET_HEADER.unpack(header)
+        if one != 1:
+            raise Exception('Malformed remote API packet')
+        packet = bytearray(size)
+        _recv_into(sock, memoryview(packet))
+        parts.append(packet)
+        if left == 0:
+            break
+    return parts[0] if len(parts) == 1 else b''.join(parts)
+
+
+class MessageReader:
+    """
+    Reads messages from a socket with a timeout. Unlike recv_message, the bytes received before a
+    timeout are kept, so that the message can still be read once it has arrived completely.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = bytearray()
+        self.parts = []
+
+    def read(self):
+        # Raises socket.timeout if the socket timeout expires before the end of the message.
+        while True:
+            message = self._parse()
+            if message is not None:
+                return message
+            received = self.sock.recv(65536)
+            if not received:
+                raise ConnectionError('Remote API connection closed')
+            self.buffer += received
+
+    def _parse(self):
+        while len(self.buffer) >= PACKET_HEADER.size:
+            one, size, left = PACKET_HEADER.unpack_from(self.buffer)
+            if one != 1:
+                raise Exception('Malformed remote API packet')
+            if len(self.buffer) < PACKET_HEADER.size + size:
+                return None
+            self.parts.append(self.buffer[PACKET_HEADER.size:PACKET_HEADER.size + size])
+            del self.buffer[:PACKET_HEADER.size + size]
+            if left == 0:
+                parts, self.parts = self.parts, []
+                return parts[0] if len(parts) == 1 else b''.join(parts)
+        return None
+
+
+## Helpers for the pure data of the commands
+
+INT = struct.Struct('<i')
+INT2 = struct.Struct('<ii')
+FLOAT = struct.Struct('<f')
+FLOAT3 = struct.Struct('<fff')
+UBYTE = struct.Struct('<B')
+
+
+def pack_bytes(data) -> bytes:
+    # Strings in utf-8, and the bytes of any object supporting the buffer protocol (copied in one
+    # go, the command may wait in the outbox)
+    if type(data) is str:
+        return data.encode('utf-8')
+    return memoryview(data).tobytes()
+
+
+def pack_string(s) -> bytes:
+    # Strings are null-terminated
+    if type(s) is str:
+        s = s.encode('utf-8')
+    return bytes(s) + b'\0'
+
+
+# Object and signal names identifying commands, packed once: the same few names are used at every
+# step of a control loop.
+packed_names = {}
+
+
+def pack_name(name) -> bytes:
+    packed = packed_names.get(name) if type(name) is str else None
+    if packed is None:
+        packed = pack_string(name)
+        if type(name) is str and len(packed_names) < 4096:
+            packed_names[name] = packed
+    return packed
+
+
+def unpack_strings(buffer, count):
+    # Splits count null-terminated strings
+    if count == 0:
+        return []
+    return [str(s, 'utf-8') for s in bytes(buffer).split(b'\0')[:count]]
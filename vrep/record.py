@@ -0,0 +1,255 @@
+import inspect
+import json
+import reprlib
+import struct
+import threading
+from functools import lru_cache, wraps
+from time import perf_counter as timer, sleep
+import numpy as np
+from vrep import CVRep, validate_output
+from vrep.batch import Batch
+
+# Recording of the calls of a client, and replay of the recorded results without a simulator:
+#
+#     with Recorder(vrep, 'session.rec') as recorder:
+#         ...  # e.g. run the demo state machine with recorder as the client
+#
+#     vrep = ReplayVRep('session.rec')
+#     ...    # the same code, served from the file at full speed
+#
+# The calls are recorded below the validate_output decorator, with the return code along with the
+# decoded output, so that the calls with returnCode=True (e.g. by StreamRegistry and
+# SplitTransfer) are recorded and replayed as well.
+#
+# The file holds data only (no pickle, nothing is executed when it is read). It starts with
+# record_magic, followed by a record per call:
+# - the size in bytes of the JSON document of the call (uint32, little-endian);
+# - the JSON document: [time in s since the start of the recording, function name, args, kwargs,
+#   result]. Tuples, dicts, arrays and byte strings are objects with a single key (tuple, dict,
+#   ndarray, bytes or bytearray), an array being described by its dtype and shape;
+# - the contents of the arrays and byte strings of the document, in order.
+
+record_magic = b'PYTRSREC\x02'
+
+_size = struct.Struct('<I')
+
+
+@lru_cache(None)
+def _api_functions(cls):
+    # The API functions of a client class, without the static ones (simxFinish)
+    return frozenset(name for name in dir(cls) if name.startswith('simx') and
+                     not isinstance(inspect.getattr_static(cls, name), staticmethod))
+
+
+def _encode(value, buffers):
+    # JSON form of a value, the contents of its arrays and byte strings being added to buffers.
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise Exception('Arrays of objects cannot be recorded')
+        buffers.append(value.tobytes())
+        return {'ndarray': [value.dtype.str, list(value.shape)]}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        buffers.append(bytes(value))
+        return {'bytearray' if isinstance(value, bytearray) else 'bytes': len(buffers[-1])}
+    if isinstance(value, tuple):
+        return {'tuple': [_encode(v, buffers) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v, buffers) for v in value]
+    if isinstance(value, dict):
+        return {'dict': {str(key): _encode(v, buffers) for key, v in value.items()}}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise Exception('Values of type %s cannot be recorded' % type(value).__name__)
+
+
+def _decode(value, read):
+    # Value of a JSON form, read(size) returning the contents of its arrays and byte strings.
+    if isinstance(value, list):
+        return [_decode(v, read) for v in value]
+    if not isinstance(value, dict):
+        return value
+    (kind, content), = value.items()
+    if kind == 'ndarray':
+        dtype, shape = np.dtype(content[0]), tuple(content[1])
+        return np.frombuffer(bytearray(read(dtype.itemsize * int(np.prod(shape)))),
+                             dtype).reshape(shape)
+    if kind == 'bytes':
+        return read(content)
+    if kind == 'bytearray':
+        return bytearray(read(content))
+    if kind == 'tuple':
+        return tuple(_decode(v, read) for v in content)
+    if kind == 'dict':
+        return {key: _decode(v, read) for key, v in content.items()}
+    raise Exception('Unknown recorded value %s' % kind)
+
+
+def _equal(a, b):
+    # Equality of arguments, sequences and arrays being compared element-wise whatever their type
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[key], b[key]) for key in a)
+    return a == b or (a != a and b != b)
+
+
+def _arguments(kwargs):
+    # The keyword arguments of a call that are compared on replay: out is filled by the call
+    return {key: value for key, value in kwargs.items() if key != 'out'}
+
+
+def _call_repr(name, args, kwargs):
+    return '%s%s' % (name, reprlib.repr(tuple(args) + tuple(kwargs.items())))
+
+
+class Recorder:
+    """
+    Records the calls made through it to a file, until closed. The calls go to the client (VRep or
+    RemoteVRep), which is left untouched: the recorder is passed where the client is expected.
+
+        with Recorder(vrep, 'session.rec') as recorder:
+            youbot = YouBot(recorder)
+            ...
+
+    The functions of the client that are not API functions (e.g. clientID) are those of the
+    client, except batch(), whose writes are recorded.
+    """
+
+    def __init__(self, vrep, path):
+        self.vrep = vrep
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb')
+        self._file.write(record_magic)
+        self._start_time = timer()
+
+    def __getattr__(self, name):
+        function = getattr(self.vrep, name)
+        cls = type(self.vrep)
+        if name not in _api_functions(cls):
+            return function
+
+        if hasattr(getattr(cls, name), '__wrapped__'):
+            @validate_output
+            def record(*args, **kwargs):
+                result = getattr(self.vrep, name)(*args, returnCode=True, **kwargs)
+                self.write(name, args, kwargs, result)
+                return result
+        else:
+            def record(*args, **kwargs):
+                result = getattr(self.vrep, name)(*args, **kwargs)
+                self.write(name, args, kwargs, result)
+                return result
+
+        record.__name__ = name
+        record.__doc__ = function.__doc__
+        # Cached: __getattr__ is only called once per function
+        setattr(self, name, record)
+        return record
+
+    def batch(self):
+        # Writes sent together in one message at the end of a block, see vrep/batch.py
+        return Batch(self)
+
+    def write(self, name, args, kwargs, result):
+        buffers = []
+        document = json.dumps([timer() - self._start_time, name, _encode(args, buffers),
+                               _encode(_arguments(kwargs), buffers),
+                               _encode(result, buffers)]).encode('utf-8')
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(_size.pack(len(document)))
+            self._file.write(document)
+            for buffer in buffers:
+                self._file.write(buffer)
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_records(path):
+    # The records of a file, in order: (time, name, args, kwargs, result)
+    with open(path, 'rb') as f:
+        if f.read(len(record_magic)) != record_magic:
+            raise Exception('%s is not a recording' % path)
+        while True:
+            size = f.read(_size.size)
+            if not size:
+                return
+            yield tuple(_decode(json.loads(f.read(_size.unpack(size)[0]).decode('utf-8')),
+                                f.read))
+
+
+def _replayed(name, function):
+    raw = getattr(function, '__wrapped__', None)
+
+    @wraps(raw if raw is not None else function)
+    def replay(self, *args, **kwargs):
+        return self._next(name, args, kwargs)
+    return validate_output(replay) if raw is not None else replay
+
+
+class ReplayVRep:
+    """
+    Client serving the results of a recording (see Recorder), with the interface of VRep. The
+    calls must come in the recorded order, with the recorded arguments: another call raises an
+    exception telling where the replay diverged. With realtime=True, the calls are paced as
+    recorded instead of being served at full speed.
+    """
+
+    clientID = 0
+
+    def __init__(self, path, realtime=False):
+        self.path = path
+        self.realtime = realtime
+        self.count = 0
+        self._records = read_records(path)
+        self._start_time = timer()
+
+    def _next(self, name, args, kwargs):
+        record = next(self._records, None)
+        if record is None:
+            raise Exception('Replay of %s: no more calls recorded (call %d to %s)' %
+                            (self.path, self.count, name))
+        time, recorded_name, recorded_args, recorded_kwargs, result = record
+        if recorded_name != name or not _equal(recorded_args, args) or \
+                not _equal(recorded_kwargs, _arguments(kwargs)):
+            raise Exception('Replay of %s diverged at call %d: %s was recorded, not %s' %
+                            (self.path, self.count,
+                             _call_repr(recorded_name, recorded_args, recorded_kwargs),
+                             _call_repr(name, args, _arguments(kwargs))))
+        self.count += 1
+        if self.realtime:
+            sleep(max(time - (timer() - self._start_time), 0))
+        out = kwargs.get('out')
+        if out is not None and result[1] is not None:
+            # Getters filling a given array (simxGetVisionSensorDepthBuffer)
+            out[...] = result[1]
+            result = result[0], out
+        return result
+
+    @staticmethod
+    def simxFinish(clientID):
+        pass
+
+    def batch(self):
+        # Writes sent together in one message at the end of a block, see vrep/batch.py
+        return Batch(self)
+
+
+for _name in _api_functions(CVRep):
+    setattr(ReplayVRep, _name, _replayed(_name, getattr(CVRep, _name)))
+del _name
@@ -0,0 +1,727 @@
+import itertools
+import socket
+import threading
+from collections import OrderedDict, deque
+from time import perf_counter as timer
+from vrep.const import *
+from vrep.protocol import *
+from vrep import validate_output
+from vrep.batch import Batch
+import numpy as np
+
+# Commands whose execution on the server can take long, and their timeout in s
+long_commands = {simx_cmd_load_scene, simx_cmd_close_scene, simx_cmd_call_script_function}
+long_command_timeout = 5
+
+# Pure-python implementation of the remote API client.
+#
+# RemoteVRep speaks the wire protocol of vrep/protocol.py over a TCP socket instead of going
+# through the remoteApi shared library, which is not shipped for every platform. It exposes the
+# same methods, with the same arguments and return values, as the ctypes VRep class for the part
+# of the API used by the YouBot and the demos.
+#
+# Like the C client, commands are not sent one by one: they are queued in an outbox and a
+# communication thread sends the whole outbox in a single message every commThreadCycleInMs.
+# Replies (including the ones of streaming commands, which are stored on the server and executed
+# for every message) are kept in an inbox, where simx_opmode_buffer reads them. Blocking commands
+# flush the outbox immediately from the calling thread, so any queued command travels in the same
+# message (pipelining).
+#
+# As with the C client, failures are reported by the return codes: a blocking command whose reply
+# does not come in time returns simx_return_timeout_flag, and its reply is still merged into the
+# inbox when it arrives. The connection is only closed by simxFinish or by the server.
+#
+# The blocking commands that can take long on the server (long_commands, e.g. loading a scene)
+# wait for their reply for long_command_timeout (or the timeout of the blocking commands if
+# longer), so that the timeout of the other ones can be tuned to the round trip (see
+# vrep/profiler.py).
+
+
+class RemoteVRep:
+    # Open connections, by client id (simxFinish(-1) closes all of them).
+    _connections = {}
+    _next_client_id = 0
+
+    def __init__(self, connectionAddress, connectionPort, waitUntilConnected,
+                 doNotReconnectOnceDisconnected, timeOutInMs, commThreadCycleInMs):
+        '''
+        Please have a look at the simxStart function description/documentation in the V-REP user
+        manual
+        '''
+        # As in the remoteApi library, a positive timeout is the connection timeout (blocking 
+        # commands then use 5 s) and a negative one the timeout of the blocking commands (the 
+        # connection then uses 5 s).
+        if timeOutInMs < 0:
+            connect_timeout = 5
+            self._timeout = -timeOutInMs / 1000
+        else:
+            connect_timeout = timeOutInMs / 1000
+            self._timeout = 5
+        self._cycle = max(commThreadCycleInMs, 1) / 1000
+
+        if type(connectionAddress) is bytes:
+            connectionAddress = connectionAddress.decode('utf-8')
+        try:
+            self._socket = socket.create_connection((connectionAddress, connectionPort),
+                                                    connect_timeout if waitUntilConnected else 0.1)
+        except OSError:
+            raise Exception("Connection to VREP failed with error status %d" % -1)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.settimeout(self._timeout)
+        self._reader = MessageReader(self._socket)
+
+        self.clientID = RemoteVRep._next_client_id
+        RemoteVRep._next_client_id += 1
+        RemoteVRep._connections[self.clientID] = self
+
+        # The outbox is keyed by command and identification: a newer command replaces an older one
+        # that was not sent yet. The inbox holds the latest reply for each key.
+        self._outbox = OrderedDict()
+        self._inbox = {}
+        self._streaming = set()
+        # Reply chunks of split commands being reassembled
+        self._chunks = {}
+        self._sequence = itertools.count()
+        # Messages sent whose reply was not read yet (see _exchange)
+        self._unanswered = 0
+        self._sent_size = 0
+        # Error flag of a failure of the communication thread, returned by the next command
+        self._error = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._paused = False
+        self._connected = True
+        self._message_id = 0
+        self._start_time = timer()
+        self._in_header = Header(0, SIMX_PROTOCOL_VERSION, 0, 0, 0, 0, 0)
+        self._out_header = self._in_header
+        self._last_cmd_time = 0
+        # Sizes (in bytes) of the latest messages sent and of their replies
+        self.message_sizes = deque(maxlen=1000)
+
+        self._thread = threading.Thread(target=self._communication_thread, daemon=True)
+        self._thread.start()
+
+    ## Communication
+
+    def _communication_thread(self):
+        while self._connected:
+            self._wakeup.wait(self._cycle)
+            self._wakeup.clear()
+            if self._paused or not self._connected:
+                continue
+            try:
+                self._exchange()
+            except socket.timeout:
+                # The reply is read with the next message
+                pass
+            except ConnectionError:
+                self._close()
+            except Exception:
+                # As in the remoteApi library, the error is reported by the return code of the
+                # next command, and the connection stays open.
+                self._error = simx_return_local_error_flag
+
+    def _exchange(self, timeout=None):
+        # Send the outbox in one message and merge the reply into the inbox. If the reply does not
+        # come within the timeout (by default, that of the blocking commands), socket.timeout is
+        # raised and the reply is read (and merged) at the beginning of the next exchange.
+        with self._io_lock:
+            if timeout is not None:
+                self._socket.settimeout(timeout)
+            try:
+                while self._unanswered:
+                    self._receive()
+                with self._lock:
+                    commands = list(self._outbox.values())
+                    self._outbox.clear()
+                self._message_id += 1
+                message = pack_message(self._message_id,
+                                       int((timer() - self._start_time) * 1000), commands)
+                send_message(self._socket, message)
+                self._out_header = Header._make(HEADER.unpack_from(message))
+                self._unanswered += 1
+                self._sent_size = len(message)
+                self._receive()
+            finally:
+                if timeout is not None:
+                    self._socket.settimeout(self._timeout)
+
+    def _receive(self):
+        received = self._reader.read()
+        self._unanswered -= 1
+        self.message_sizes.append((self._sent_size, len(received)))
+        header, replies = unpack_message(received)
+        with self._lock:
+            self._in_header = header
+            inbox = self._inbox
+            for reply in replies:
+                key = (reply.cmd & simx_cmdmask, bytes(reply.ident))
+                if is_chunk(reply):
+                    reply = self._reassemble(key, reply)
+                    if reply is None:
+                        continue
+                inbox[key] = reply
+
+    def _reassemble(self, key, chunk):
+        # Chunks of the reply of a split command. The reply is only available once all its
+        # chunks have arrived: until then, the inbox keeps the previous one.
+        if chunk.data_offset == 0:
+            self._chunks[key] = bytearray(chunk.data_size)
+        data = self._chunks.get(key)
+        if data is None or len(data) != chunk.data_size:
+            return None
+        data[chunk.data_offset:chunk.data_offset + len(chunk.data)] = chunk.data
+        if chunk.data_offset + len(chunk.data) < chunk.data_size:
+            return None
+        del self._chunks[key]
+        return chunk._replace(ident=bytes(chunk.ident), data=memoryview(data), data_offset=0)
+
+    def _close(self):
+        self._connected = False
+        self._wakeup.set()
+        try:
+            self._socket.close()
+        except OSError:
+            pass
+        RemoteVRep._connections.pop(self.clientID, None)
+
+    def _call(self, cmd, operationMode, ident=b'', data=b'', options=0):
+        # Run a command according to the operation mode. Returns the return code and the pure data
+        # of the reply (after the identification) or None if there is no reply.
+        if not self._connected:
+            return simx_return_initialize_error_flag, None
+        mode = operationMode & simx_opmodemask
+        key = (cmd, bytes(ident))
+        # A command that must not be overwritten is queued under a key of its own
+        outbox_key = key if not options & simx_cmdoption_no_overwrite else \
+            key + (next(self._sequence),)
+        error, self._error = self._error, 0
+
+        if mode == simx_opmode_buffer:
+            pass
+        elif mode == simx_opmode_remove:
+            with self._lock:
+                self._inbox.pop(key, None)
+            return simx_return_novalue_flag | error, None
+        elif mode == simx_opmode_discontinue:
+            with self._lock:
+                self._streaming.discard(key)
+                self._inbox.pop(key, None)
+                self._chunks.pop(key, None)
+                self._outbox[outbox_key] = Command(cmd | mode, 0, key[1], data, 0, options)
+            return simx_return_novalue_flag | error, None
+        elif mode in (simx_opmode_streaming, simx_opmode_streaming_split):
+            # Streaming commands are only sent once, the server keeps executing them
+            if key not in self._streaming:
+                with self._lock:
+                    self._streaming.add(key)
+                    self._outbox[outbox_key] = Command(cmd | mode, operationMode & simx_cmdmask,
+                                                       key[1], data, 0, options)
+        elif mode == simx_opmode_blocking:
+            with self._lock:
+                self._inbox.pop(key, None)
+                self._outbox[outbox_key] = Command(cmd | mode, 0, key[1], data, 0, options)
+            try:
+                self._exchange(max(self._timeout, long_command_timeout)
+                               if cmd in long_commands else None)
+            except socket.timeout:
+                return simx_return_timeout_flag | error, None
+            except ConnectionError:
+                self._close()
+                return simx_return_initialize_error_flag, None
+            except Exception:
+                return simx_return_local_error_flag | error, None
+            if key not in self._inbox:
+                return simx_return_timeout_flag | error, None
+        else:
+            # simx_opmode_oneshot and simx_opmode_oneshot_split
+            with self._lock:
+                self._outbox[outbox_key] = Command(cmd | mode, operationMode & simx_cmdmask,
+                                                   key[1], data, 0, options)
+
+        reply = self._inbox.get(key)
+        if reply is None:
+            return simx_return_novalue_flag | error, None
+        self._last_cmd_time = reply.sim_time
+        if reply.status & 1:
+            return simx_return_remote_error_flag | error, None
+        return simx_return_ok | error, reply.data
+
+    def _signal(self, cmd, signalName, operationMode, data=b''):
+        return self._call(cmd, operationMode, pack_name(signalName), data)
+
+    def batch(self):
+        # Writes sent together in one message at the end of a block, see vrep/batch.py
+        return Batch(self)
+
+    def set_timing(self, commThreadCycleInMs, timeOutInMs):
+        # Changes the cycle of the communication thread and the timeout of the blocking commands
+        # (but long_commands) of an open connection (the remoteApi library only sets them in
+        # simxStart), see vrep/profiler.py.
+        self._cycle = max(commThreadCycleInMs, 1) / 1000
+        self._timeout = timeOutInMs / 1000
+        self._socket.settimeout(self._timeout)
+
+    ## API functions
+    # Only a subset of the API is implemented (the other functions are not defined), see the VRep
+    # class for the documentation.
+
+    @staticmethod
+    def simxFinish(clientID):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        if clientID == -1:
+            for connection in list(RemoteVRep._connections.values()):
+                connection._close()
+        elif clientID in RemoteVRep._connections:
+            RemoteVRep._connections[clientID]._close()
+
+    def simxGetConnectionId(self):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self.clientID if self._connected else -1
+
+    @validate_output
+    def simxGetJointPosition(self, jointHandle, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._call(simx_cmd_get_joint_position, operationMode, INT.pack(jointHandle))
+        return ret, FLOAT.unpack_from(data)[0] if data is not None else 0.0
+
+    @validate_output
+    def simxSetJointPosition(self, jointHandle, position, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_joint_position, operationMode, INT.pack(jointHandle),
+                          FLOAT.pack(position))[0]
+
+    @validate_output
+    def simxSetJointTargetVelocity(self, jointHandle, targetVelocity, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_joint_target_velocity, operationMode,
+                          INT.pack(jointHandle), FLOAT.pack(targetVelocity))[0]
+
+    @validate_output
+    def simxSetJointTargetPosition(self, jointHandle, targetPosition, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_joint_target_position, operationMode,
+                          INT.pack(jointHandle), FLOAT.pack(targetPosition))[0]
+
+    @validate_output
+    def simxReadVisionSensor(self, sensorHandle, operationMode, asArray=False):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        # Reply: detection state (byte), packet count, size of each packet, then the packets.
+        ret, data = self._call(simx_cmd_read_vision_sensor, operationMode, INT.pack(sensorHandle))
+        detectionState = False
+        auxValues = []
+        if data is not None:
+            detectionState = data[0] != 0
+            count = INT.unpack_from(data, 1)[0]
+            sizes = np.frombuffer(data, '<i4', count, 5)
+            values = np.frombuffer(data, '<f4', offset=5 + 4 * count).astype(np.float32)
+            auxValues = np.split(values, np.cumsum(sizes)[:-1]) if count else []
+            if not asArray:
+                auxValues = [packet.tolist() for packet in auxValues]
+        return ret, (detectionState, auxValues)
+
+    @validate_output
+    def simxGetObjectHandle(self, objectName, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._call(simx_cmd_get_object_handle, operationMode, pack_name(objectName))
+        return ret, INT.unpack_from(data)[0] if data is not None else 0
+
+    @validate_output
+    def simxGetVisionSensorImage(self, sensorHandle, options, operationMode, out=None):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        # Reply: resolution (2 simxInt, the width first) then the pixels, row by row.
+        cmd = simx_cmd_get_vision_sensor_image_bw if options & 1 else \
+            simx_cmd_get_vision_sensor_image_rgb
+        ret, data = self._call(cmd, operationMode, INT.pack(sensorHandle))
+        image = None
+        if data is not None:
+            resolution = INT2.unpack_from(data)
+            bytesPerPixel = 1 if options & 1 else 3
+            buffer = np.frombuffer(data, np.uint8, offset=INT2.size).reshape(
+                (resolution[1], resolution[0], bytesPerPixel))
+            # Like the ctypes client, a writable image of its own (the reply bytes are read-only)
+            if out is None:
+                image = buffer.copy()
+            else:
+                np.copyto(out, buffer)
+                image = out
+        return ret, image
+
+    @validate_output
+    def simxGetVisionSensorDepthBuffer(self, sensorHandle, operationMode, out=None):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        # Reply: resolution (2 simxInt, the width first) then the depth values, row by row.
+        ret, data = self._call(simx_cmd_get_vision_sensor_depth_buffer, operationMode,
+                               INT.pack(sensorHandle))
+        depth = out
+        if data is not None:
+            width, height = INT2.unpack_from(data)
+            buffer = np.frombuffer(data, '<f4', offset=INT2.size).reshape((height, width))
+            if out is None:
+                depth = buffer.astype(np.float32)
+            else:
+                np.copyto(out, buffer)
+        return ret, depth
+
+    @validate_output
+    def simxLoadScene(self, scenePathAndName, options, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        if options & 1:
+            # The scene file of the client would have to be sent first (simxTransferFile), which
+            # is not implemented
+            return simx_return_local_error_flag
+        return self._call(simx_cmd_load_scene, operationMode, pack_string(scenePathAndName))[0]
+
+    @validate_output
+    def simxStartSimulation(self, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_simulation_state, operationMode,
+                          INT.pack(simx_simulation_start))[0]
+
+    @validate_output
+    def simxPauseSimulation(self, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_simulation_state, operationMode,
+                          INT.pack(simx_simulation_pause))[0]
+
+    @validate_output
+    def simxStopSimulation(self, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_simulation_state, operationMode,
+                          INT.pack(simx_simulation_stop))[0]
+
+    @validate_output
+    def simxAddStatusbarMessage(self, message, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_add_statusbar_message, operationMode, pack_string(message),
+                          options=simx_cmdoption_no_overwrite)[0]
+
+    def _get_vector(self, cmd, objectHandle, relativeToObjectHandle, operationMode):
+        ret, data = self._call(cmd, operationMode, INT2.pack(objectHandle, relativeToObjectHandle))
+        return ret, list(FLOAT3.unpack_from(data)) if data is not None else [0.0, 0.0, 0.0]
+
+    @validate_output
+    def simxGetObjectOrientation(self, objectHandle, relativeToObjectHandle, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._get_vector(simx_cmd_get_object_orientation, objectHandle,
+                                relativeToObjectHandle, operationMode)
+
+    @validate_output
+    def simxGetObjectPosition(self, objectHandle, relativeToObjectHandle, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._get_vector(simx_cmd_get_object_position, objectHandle,
+                                relativeToObjectHandle, operationMode)
+
+    @validate_output
+    def simxSetObjectOrientation(self, objectHandle, relativeToObjectHandle, eulerAngles,
+                                 operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_object_orientation, operationMode, INT.pack(objectHandle),
+                          INT.pack(relativeToObjectHandle) + FLOAT3.pack(*eulerAngles))[0]
+
+    @validate_output
+    def simxSetObjectPosition(self, objectHandle, relativeToObjectHandle, position, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_object_position, operationMode, INT.pack(objectHandle),
+                          INT.pack(relativeToObjectHandle) + FLOAT3.pack(*position))[0]
+
+    @validate_output
+    def simxGetBooleanParameter(self, paramIdentifier, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._call(simx_cmd_get_boolean_parameter, operationMode,
+                               INT.pack(paramIdentifier))
+        return ret, data is not None and INT.unpack_from(data)[0] != 0
+
+    @validate_output
+    def simxSetBooleanParameter(self, paramIdentifier, paramValue, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_boolean_parameter, operationMode,
+                          INT.pack(paramIdentifier), INT.pack(bool(paramValue)))[0]
+
+    @validate_output
+    def simxGetIntegerParameter(self, paramIdentifier, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._call(simx_cmd_get_integer_parameter, operationMode,
+                               INT.pack(paramIdentifier))
+        return ret, INT.unpack_from(data)[0] if data is not None else 0
+
+    @validate_output
+    def simxSetIntegerParameter(self, paramIdentifier, paramValue, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_integer_parameter, operationMode,
+                          INT.pack(paramIdentifier), INT.pack(paramValue))[0]
+
+    @validate_output
+    def simxGetFloatingParameter(self, paramIdentifier, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._call(simx_cmd_get_floating_parameter, operationMode,
+                               INT.pack(paramIdentifier))
+        return ret, FLOAT.unpack_from(data)[0] if data is not None else 0.0
+
+    @validate_output
+    def simxSetFloatingParameter(self, paramIdentifier, paramValue, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_set_floating_parameter, operationMode,
+                          INT.pack(paramIdentifier), FLOAT.pack(paramValue))[0]
+
+    @validate_output
+    def simxGetStringParameter(self, paramIdentifier, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._call(simx_cmd_get_string_parameter, operationMode,
+                               INT.pack(paramIdentifier))
+        return ret, bytes(data).split(b'\0')[0].decode('utf-8') if data is not None else ''
+
+    @validate_output
+    def simxGetObjects(self, objectType, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._call(simx_cmd_get_objects, operationMode, INT.pack(objectType))
+        handles = []
+        if data is not None:
+            handles = np.frombuffer(data, '<i4', INT.unpack_from(data)[0], 4).tolist()
+        return ret, handles
+
+    @validate_output
+    def simxClearFloatSignal(self, signalName, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._signal(simx_cmd_clear_float_signal, signalName, operationMode)[0]
+
+    @validate_output
+    def simxClearIntegerSignal(self, signalName, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._signal(simx_cmd_clear_integer_signal, signalName, operationMode)[0]
+
+    @validate_output
+    def simxClearStringSignal(self, signalName, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._signal(simx_cmd_clear_string_signal, signalName, operationMode)[0]
+
+    @validate_output
+    def simxGetFloatSignal(self, signalName, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._signal(simx_cmd_get_float_signal, signalName, operationMode)
+        return ret, FLOAT.unpack_from(data)[0] if data is not None else 0.0
+
+    @validate_output
+    def simxGetIntegerSignal(self, signalName, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._signal(simx_cmd_get_integer_signal, signalName, operationMode)
+        return ret, INT.unpack_from(data)[0] if data is not None else 0
+
+    @validate_output
+    def simxGetStringSignal(self, signalName, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        ret, data = self._signal(simx_cmd_get_string_signal, signalName, operationMode)
+        return ret, bytearray(data) if data is not None else bytearray()
+
+    @validate_output
+    def simxSetFloatSignal(self, signalName, signalValue, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._signal(simx_cmd_set_float_signal, signalName, operationMode,
+                            FLOAT.pack(signalValue))[0]
+
+    @validate_output
+    def simxSetIntegerSignal(self, signalName, signalValue, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._signal(simx_cmd_set_integer_signal, signalName, operationMode,
+                            INT.pack(signalValue))[0]
+
+    @validate_output
+    def simxSetStringSignal(self, signalName, signalValue, operationMode):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._signal(simx_cmd_set_string_signal, signalName, operationMode,
+                            pack_bytes(signalValue))[0]
+
+    @validate_output
+    def simxGetPingTime(self):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        # One full round trip with the server (which also flushes the outbox), reading the
+        # program version as the remoteApi library does.
+        start = timer()
+        ret = self._call(simx_cmd_get_integer_parameter, simx_opmode_blocking,
+                         INT.pack(simx_ping_parameter))[0]
+        return ret, int((timer() - start) * 1000)
+
+    def simxGetLastCmdTime(self):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._last_cmd_time
+
+    @validate_output
+    def simxSynchronousTrigger(self):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return self._call(simx_cmd_synchronous_next, simx_opmode_blocking)[0]
+
+    @validate_output
+    def simxSynchronous(self, enable):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        cmd = simx_cmd_synchronous_enable if enable else simx_cmd_synchronous_disable
+        return self._call(cmd, simx_opmode_blocking)[0]
+
+    @validate_output
+    def simxPauseCommunication(self, enable):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        self._paused = bool(enable)
+        if not enable:
+            self._wakeup.set()
+        return simx_return_ok
+
+    @validate_output
+    def simxGetInMessageInfo(self, infoType):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return simx_return_ok, header_field(self._in_header, infoType)
+
+    @validate_output
+    def simxGetOutMessageInfo(self, infoType):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        return simx_return_ok, header_field(self._out_header, infoType)
+
+    @validate_output
+    def simxGetObjectGroupData(self, objectType, dataType, operationMode, asArray=False):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        # Reply: handle, int, float and string counts, then the handles, ints, floats and strings.
+        ret, data = self._call(simx_cmd_get_object_group_data, operationMode,
+                               INT2.pack(objectType, dataType))
+        handles = []
+        intData = []
+        floatData = []
+        stringData = []
+        if data is not None:
+            handlesC, intDataC, floatDataC, stringDataC = struct.unpack_from('<4i', data)
+            offset = 16
+            handles = np.frombuffer(data, '<i4', handlesC, offset)
+            offset += 4 * handlesC
+            intData = np.frombuffer(data, '<i4', intDataC, offset)
+            offset += 4 * intDataC
+            floatData = np.frombuffer(data, '<f4', floatDataC, offset)
+            offset += 4 * floatDataC
+            stringData = unpack_strings(data[offset:], stringDataC)
+            if not asArray:
+                handles, intData, floatData = handles.tolist(), intData.tolist(), floatData.tolist()
+        return ret, (handles, intData, floatData, stringData)
+
+    @validate_output
+    def simxCallScriptFunction(self, scriptDescription, options, functionName, inputInts,
+                               inputFloats, inputStrings, inputBuffer, operationMode,
+                               asArray=False):
+        '''
+        Please have a look at the function description/documentation in the V-REP user manual
+        '''
+        # Data (both ways): int, float, string and buffer sizes, then the ints, floats, strings
+        # and buffer.
+        if type(inputBuffer) is str:
+            inputBuffer = inputBuffer.encode('utf-8')
+        inputBuffer = np.frombuffer(inputBuffer, np.uint8).tobytes()
+        strings = b''.join(pack_string(s) for s in inputStrings)
+        data = b''.join((struct.pack('<4i', len(inputInts), len(inputFloats), len(inputStrings),
+                                     len(inputBuffer)),
+                         np.asarray(inputInts, '<i4').tobytes(),
+                         np.asarray(inputFloats, '<f4').tobytes(), strings, inputBuffer))
+        ret, data = self._call(simx_cmd_call_script_function, operationMode,
+                               INT.pack(options) + pack_string(scriptDescription) +
+                               pack_string(functionName), data, simx_cmdoption_no_overwrite)
+        intDataOut = []
+        floatDataOut = []
+        stringDataOut = []
+        bufferOut = bytearray()
+        if data is not None:
+            intDataC, floatDataC, stringDataC, bufferS = struct.unpack_from('<4i', data)
+            offset = 16
+            intDataOut = np.frombuffer(data, '<i4', intDataC, offset)
+            offset += 4 * intDataC
+            floatDataOut = np.frombuffer(data, '<f4', floatDataC, offset)
+            offset += 4 * floatDataC
+            if not asArray:
+                intDataOut, floatDataOut = intDataOut.tolist(), floatDataOut.tolist()
+            strings = data[offset:len(data) - bufferS]
+            stringDataOut = unpack_strings(strings, stringDataC)
+            bufferOut = bytearray(data[len(data) - bufferS:])
+        return ret, (intDataOut, floatDataOut, stringDataOut, bufferOut)
@@ -0,0 +1,91 @@
+from vrep.const import *
+import numpy as np
+
+# simxGetObjectGroupData data types
+group_data_names = 0
+group_data_types = 1
+group_data_absolute_pose = 9    # x, y, z, alpha, beta, gamma for each object
+group_data_joint_state = 15     # position and force (or torque) for each joint
+
+
+class PoseSnapshot:
+    """
+    Absolute poses and joint states of a registered set of objects.
+
+    Instead of one simxGetObjectPosition/simxGetObjectOrientation/simxGetJointPosition call per
+    object, the poses and joint states are fetched with a few simxGetObjectGroupData calls, which
+    travel in the same message when streamed. simxGetObjectGroupData selects the objects by type,
+    so start() streams the poses of the types of the registered objects only (e.g. the dummies and
+    the joints of a robot rather than every shape of the scene), and the joint states only if
+    joints are registered. The values are
+    stored in a structured array (data) with one row per registered handle, in registration order,
+    and a row can be accessed with its handle: snapshot[handle]['position'].
+    """
+
+    dtype = np.dtype([('handle', np.int32), ('position', np.float32, (3,)),
+                      ('orientation', np.float32, (3,)), ('joint_position', np.float32),
+                      ('joint_force', np.float32)])
+
+    def __init__(self, handles):
+        self.data = np.zeros(len(handles), self.dtype)
+        self.data['handle'] = handles
+        # Objects that are not joints have no joint state
+        self.data['joint_position'] = np.nan
+        self.data['joint_force'] = np.nan
+        self._rows = {handle: row for row, handle in enumerate(handles)}
+        # The (objectType, dataType) of the simxGetObjectGroupData calls, see start
+        self.streams = ()
+
+    def __getitem__(self, handle):
+        return self.data[self._rows[handle]]
+
+    def __len__(self):
+        return len(self.data)
+
+    def start(self, vrep):
+        # Stream the data: afterwards, fetch (with simx_opmode_buffer) costs no round trip. The
+        # types of the registered objects are read first, in one blocking call.
+        handles, types, _, _ = vrep.simxGetObjectGroupData(sim_handle_all, group_data_types,
+                                                           simx_opmode_blocking, asArray=True)
+        rows, columns = self._match(handles)
+        if len(rows) < len(self):
+            raise Exception('Unknown object handles %s' %
+                            np.setdiff1d(self.data['handle'], self.data['handle'][rows]).tolist())
+        types = sorted(set(np.asarray(types)[columns].tolist()))
+        # The (objectType, dataType) of the simxGetObjectGroupData calls
+        self.streams = tuple((objectType, group_data_absolute_pose) for objectType in types)
+        if sim_object_joint_type in types:
+            self.streams += ((sim_object_joint_type, group_data_joint_state),)
+        for objectType, dataType in self.streams:
+            vrep.simxGetObjectGroupData(objectType, dataType, simx_opmode_streaming)
+
+    def stop(self, vrep):
+        for objectType, dataType in self.streams:
+            vrep.simxGetObjectGroupData(objectType, dataType, simx_opmode_discontinue)
+
+    def fetch(self, vrep, operationMode=simx_opmode_buffer):
+        # Updates the snapshot (rows without data keep their previous values) and returns it.
+        for objectType, dataType in self.streams:
+            handles, _, floats, _ = vrep.simxGetObjectGroupData(objectType, dataType,
+                                                                operationMode, asArray=True)
+            rows, columns = self._match(handles)
+            if dataType == group_data_absolute_pose:
+                poses = np.asarray(floats, np.float32).reshape(-1, 6)
+                self.data['position'][rows] = poses[columns, :3]
+                self.data['orientation'][rows] = poses[columns, 3:]
+            else:
+                states = np.asarray(floats, np.float32).reshape(-1, 2)
+                self.data['joint_position'][rows] = states[columns, 0]
+                self.data['joint_force'][rows] = states[columns, 1]
+        return self
+
+    def _match(self, handles):
+        # Rows of the registered handles found in handles, and their positions in handles.
+        handles = np.asarray(handles, np.int32)
+        if handles.size == 0:
+            return np.empty(0, np.intp), np.empty(0, np.intp)
+        order = np.argsort(handles)
+        positions = np.searchsorted(handles[order], self.data['handle'])
+        positions[positions == len(handles)] = 0
+        found = handles[order[positions]] == self.data['handle']
+        return np.flatnonzero(found), order[positions[found]]
@@ -0,0 +1,89 @@
+from itertools import count
+from vrep.const import *
+
+
+class Lockstep:
+    """
+    Runs the simulation in lockstep with a control loop, in synchronous mode.
+
+    In the default (asynchronous) mode, the simulator runs in real time and the control loop paces
+    itself with the wall clock (e.g. one iteration per 50 ms in demo_youbot.py): the number of
+    simulation steps between two iterations depends on the load of both processes. In synchronous
+    mode, the simulator only runs a step when the client triggers it. Each step of the engine
+    triggers one simulation step, waits until it is done, and hands the control function the
+    sensor values of that step:
+
+        def control(engine, snapshot):
+            ...  # engine.step_count, engine.sim_time, engine.dt
+            return engine.sim_time < 60   # False stops the loop
+
+        with Lockstep(vrep, youbot.snapshot) as engine:
+            engine.run(control)
+
+    Episodes then run as fast as the simulator can compute them and are deterministic. The remote
+    API server must allow the synchronous mode (e.g. the continuous service on port 19997, or
+    -gREMOTEAPISERVERSERVICE_<port>_FALSE_TRUE).
+
+    sense(vrep) is called after each step to read the sensor values (e.g. youbot.snapshot, or a
+    StreamRegistry refresh), its result is the snapshot passed to the control function.
+    """
+
+    def __init__(self, vrep, sense=None):
+        self.vrep = vrep
+        self.sense = sense
+        # Simulation time step in s, read from the simulator when starting
+        self.dt = None
+        self.step_count = 0
+        # Simulation time (in ms) of the reply of the last step, as reported by the server
+        self.sim_time_ms = 0
+        self.running = False
+
+    @property
+    def sim_time(self):
+        # Simulation time in s after the last step
+        return self.step_count * self.dt if self.dt is not None else 0.
+
+    def start(self, start_simulation=True):
+        # Enables the synchronous mode and reads the time step. With start_simulation=False, the
+        # simulation must be started by the caller (after this call, otherwise its first steps run
+        # freely).
+        self.vrep.simxSynchronous(True)
+        self.dt = self.vrep.simxGetFloatingParameter(sim_floatparam_simulation_time_step,
+                                                     simx_opmode_blocking)
+        if start_simulation:
+            self.vrep.simxStartSimulation(simx_opmode_blocking)
+        self.step_count = 0
+        self.running = True
+        return self
+
+    def step(self):
+        # Runs one simulation step and returns the sensor snapshot of its end. The commands sent
+        # since the previous step (e.g. the wheel velocities) apply to this step.
+        self.vrep.simxSynchronousTrigger()
+        # The server only replies once the triggered step is done: after the round trip, the
+        # input buffer holds the streamed values of this step.
+        self.vrep.simxGetPingTime()
+        self.step_count += 1
+        self.sim_time_ms = self.vrep.simxGetLastCmdTime()
+        return self.sense(self.vrep) if self.sense is not None else None
+
+    def run(self, control, steps=None):
+        # Steps until control(engine, snapshot) returns False, or for the given number of steps.
+        if not self.running:
+            self.start()
+        for _ in count() if steps is None else range(steps):
+            if control(self, self.step()) is False:
+                break
+        return self.step_count
+
+    def stop(self, stop_simulation=True):
+        if stop_simulation:
+            self.vrep.simxStopSimulation(simx_opmode_blocking)
+        self.vrep.simxSynchronous(False)
+        self.running = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,128 @@
+from collections import namedtuple
+from time import perf_counter as timer, sleep
+from vrep.const import *
+from vrep.vrchk import vrchk
+
+# Getter functions that can be streamed, by kind of stream. The arguments of a stream are those of
+# the function before the operation mode, the first one being the handle (or the signal name, or
+# the object type for group data).
+stream_kinds = {
+    'joint_position': 'simxGetJointPosition',       # (jointHandle)
+    'joint_force': 'simxGetJointForce',             # (jointHandle)
+    'position': 'simxGetObjectPosition',            # (objectHandle, relativeToObjectHandle)
+    'orientation': 'simxGetObjectOrientation',      # (objectHandle, relativeToObjectHandle)
+    'quaternion': 'simxGetObjectQuaternion',        # (objectHandle, relativeToObjectHandle)
+    'velocity': 'simxGetObjectVelocity',            # (objectHandle)
+    'vision_sensor': 'simxReadVisionSensor',        # (sensorHandle)
+    'image': 'simxGetVisionSensorImage',            # (sensorHandle, options)
+    'depth_buffer': 'simxGetVisionSensorDepthBuffer',   # (sensorHandle)
+    'proximity_sensor': 'simxReadProximitySensor',  # (sensorHandle)
+    'force_sensor': 'simxReadForceSensor',          # (forceSensorHandle)
+    'integer_signal': 'simxGetIntegerSignal',       # (signalName)
+    'float_signal': 'simxGetFloatSignal',           # (signalName)
+    'string_signal': 'simxGetStringSignal',         # (signalName)
+    'group_data': 'simxGetObjectGroupData',         # (objectType, dataType)
+}
+
+# Latest value of a stream, with the simulation time (in ms) of the reply it comes from and its
+# age (in ms of simulation time) with respect to the most recent reply of the registry.
+Sample = namedtuple('Sample', 'value time age')
+
+
+class Stream:
+    def __init__(self, function, args, kwargs):
+        # Name of the getter, called through the client so that the wrappers installed on it
+        # (e.g. vrep/metrics.py) see the calls
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.value = None
+        self.time = None
+
+
+class StreamRegistry:
+    """
+    Tracks the streams of a client and the freshness of their values.
+
+    With simx_opmode_buffer, a getter returns its default value (e.g. 0 or an empty list) both
+    when the stream has not delivered anything yet and when it has: vrchk does not report
+    simx_return_novalue_flag. The registry reads the streams itself and keeps, for each one, its
+    latest value and the simulation time of the reply it comes from (simxGetLastCmdTime), so that
+    missing and stale values can be told apart:
+
+        streams = StreamRegistry(vrep)
+        streams.subscribe(ref, 'position', -1)
+        streams.wait()  # instead of sleeping until the first values arrive
+        sample = streams.latest(ref, 'position', -1)  # sample.value, sample.time, sample.age
+
+    The age of a sample is measured against the most recent reply the registry has read, so a
+    stream that stopped being updated while the others go on ages, but the registry cannot tell
+    that the whole connection is stale.
+    """
+
+    def __init__(self, vrep):
+        self.vrep = vrep
+        self.streams = {}
+        # Simulation time (in ms) of the most recent reply read
+        self.sim_time = 0
+
+    def subscribe(self, handle, kind, *args, **kwargs):
+        # Starts streaming and tracks the stream. kwargs are passed to the getter (e.g. asArray).
+        stream = self.track(handle, kind, *args, **kwargs)
+        getattr(self.vrep, stream.function)(handle, *args, simx_opmode_streaming, **kwargs)
+        return stream
+
+    def track(self, handle, kind, *args, **kwargs):
+        # Tracks a stream started elsewhere (e.g. by a PoseSnapshot).
+        key = (handle, kind) + args
+        if key not in self.streams:
+            self.streams[key] = Stream(stream_kinds[kind], (handle,) + args, kwargs)
+        return self.streams[key]
+
+    def unsubscribe(self, handle, kind, *args):
+        stream = self.streams.pop((handle, kind) + args)
+        getattr(self.vrep, stream.function)(*stream.args, simx_opmode_discontinue, **stream.kwargs)
+
+    def latest(self, handle, kind, *args):
+        # Latest sample of a stream, None if it has not delivered any value yet.
+        stream = self.streams[(handle, kind) + args]
+        self._read(stream)
+        if stream.time is None:
+            return None
+        return Sample(stream.value, stream.time, self.sim_time - stream.time)
+
+    def refresh(self):
+        # Reads all the streams, returns the number of streams without a value yet.
+        missing = 0
+        for stream in self.streams.values():
+            if not self._read(stream):
+                missing += 1
+        return missing
+
+    def wait(self, timeout=5., keys=None):
+        # Waits until the streams (all of them, or the ones whose keys are given) have delivered a
+        # value, polling the input buffer.
+        streams = [self.streams[key] for key in keys] if keys is not None else \
+            list(self.streams.values())
+        deadline = timer() + timeout
+        while True:
+            streams = [stream for stream in streams if not self._read(stream)]
+            if not streams:
+                return
+            if timer() > deadline:
+                raise Exception('%d streams did not deliver any value within %g s' %
+                                (len(streams), timeout))
+            sleep(.001)
+
+    def _read(self, stream):
+        # Reads a stream from the input buffer, returns whether it has a value.
+        # returnCode: the return code tells a value from the default value of a missing one
+        ret, value = getattr(self.vrep, stream.function)(*stream.args, simx_opmode_buffer,
+                                                         returnCode=True, **stream.kwargs)
+        if ret == simx_return_novalue_flag:
+            return stream.time is not None
+        vrchk(ret)
+        stream.value = value
+        stream.time = self.vrep.simxGetLastCmdTime()
+        self.sim_time = max(self.sim_time, stream.time)
+        return True
@@ -0,0 +1,86 @@
+import statistics
+from collections import deque
+from time import perf_counter as timer, sleep
+import numpy as np
+from vrep.const import *
+from vrep.vrchk import vrchk
+
+# Bounds of the chunk size of the split operation modes (added to simx_opmode_streaming_split)
+min_chunk_size = 100
+max_chunk_size = 65535
+
+
+def payload_size(value):
+    # Size in bytes of the value returned by a getter (arrays, lists of floats or ints, tuples of
+    # them), as it travels in the replies.
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(payload_size(v) for v in value)
+    return 4
+
+
+class SplitTransfer:
+    """
+    Large sensor payloads (images, depth buffers, point clouds) in several chunks.
+
+    With simx_opmode_oneshot_wait, the whole payload comes in one reply: the communication thread
+    is busy with it, and the small control messages queued behind it (e.g. the wheel velocities)
+    wait for the whole transfer. With simx_opmode_streaming_split, the server sends one chunk of
+    the payload per message, and the control messages go on in between; the client library puts
+    the chunks back together and the getter returns the whole payload (e.g. a single image array):
+
+        transfer = SplitTransfer(vrep)
+        image = transfer.fetch('simxGetVisionSensorImage', youbot.rgb_sensor, 0)
+
+    fetch() starts the stream, reads the first whole payload from the input buffer, then stops
+    the stream.
+
+    Each message carries one chunk: the larger the chunks, the fewer the round trips and the
+    higher the throughput, but the longer each message holds the control messages back. The
+    chunk size is the number of bytes that the measured throughput of the payload (median of its
+    latest transfers, in bytes per s) carries within the deadline (in s): a message carrying a
+    chunk takes about the deadline. With a link of bandwidth b, the chunk size settles around
+    b * (deadline - ping time), so the deadline must be longer than the ping time. The first
+    transfer of a payload uses max_chunk_size.
+    """
+
+    def __init__(self, vrep, deadline=.02, samples=5):
+        self.vrep = vrep
+        self.deadline = deadline
+        # Throughputs in bytes per s of the latest transfers, by (function name, args)
+        self.throughputs = {}
+        self.samples = samples
+
+    def chunk_size(self, key):
+        # Bytes carried within the deadline at the measured throughput of the payload.
+        throughputs = self.throughputs.get(key)
+        if not throughputs:
+            return max_chunk_size
+        size = statistics.median(throughputs) * self.deadline
+        return int(min(max(size, min_chunk_size), max_chunk_size))
+
+    def fetch(self, name, *args, timeout=5., **kwargs):
+        # Calls the getter name with the given arguments (before the operation mode) in split mode
+        # and waits for the whole payload. kwargs are passed to the getter (e.g. asArray).
+        function = getattr(self.vrep, name)
+        key = (name,) + args
+        # A reply of the previous transfer may still be in the input buffer
+        function(*args, simx_opmode_remove, returnCode=True, **kwargs)
+        start = timer()
+        vrchk(function(*args, simx_opmode_streaming_split + self.chunk_size(key),
+                       returnCode=True, **kwargs)[0])
+        try:
+            while True:
+                ret, value = function(*args, simx_opmode_buffer, returnCode=True, **kwargs)
+                if ret != simx_return_novalue_flag:
+                    break
+                if timer() > start + timeout:
+                    raise Exception('%s did not complete within %g s' % (name, timeout))
+                sleep(.001)
+        finally:
+            function(*args, simx_opmode_discontinue, returnCode=True, **kwargs)
+        vrchk(ret)
+        self.throughputs.setdefault(key, deque(maxlen=self.samples)).append(
+            payload_size(value) / max(timer() - start, 1e-6))
+        return value
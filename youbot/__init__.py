@@ -1,7 +1,10 @@
 from vrep import VRep
 from vrep.const import *
-from robopy.base.transforms import transl, trotz, troty, trotx
-from youbot.transforms import homtrans
+from vrep.snapshot import PoseSnapshot
+from vrep.streams import StreamRegistry
+from vrep.handles import HandleResolver
+from youbot.transforms import transl, trotx, troty, trotz
+from youbot.scan import BeamGeometry, Scan
 import numpy as np
 
 # Initialize youBot
@@ -14,8 +17,14 @@ class YouBot:
     # Contains all handles, stream arm and wheel joints, the robot's pose, the Hokuyo, 
     # and the arm tip pose.
     
-    def __init__(self, vrep: VRep):
-        get_handle = lambda name: vrep.simxGetObjectHandle(name, simx_opmode_oneshot_wait)
+    def __init__(self, vrep: VRep, handles: HandleResolver = None):
+        # The client this robot is bound to (several robots can be driven in parallel, each in 
+        # its own simulator, see vrep/pool.py)
+        self.vrep = vrep
+        # All the handles are resolved in one call (cached on disk if handles is given a cache_dir),
+        # see vrep/handles.py
+        self.handles = handles if handles is not None else HandleResolver(vrep)
+        get_handle = self.handles.get
         
         # Wheel handles (front left, rear left, rear right, front right).
         self.wheel_joints = [get_handle('rollingJoint_' + s) for s in ['fl', 'rl', 'rr', 'fr']]
@@ -31,6 +40,8 @@ class YouBot:
         # cover 120 degrees, hence the two handles
         self.hokuyo1 = get_handle('fastHokuyo_sensor1')
         self.hokuyo2 = get_handle('fastHokuyo_sensor2')
+        # Origins and directions of the beams of the Hokuyo, computed from a scan (see hokuyo_read)
+        self.hokuyo_geometry = None
         
         self.xyz_sensor = get_handle('xyzSensor')
         self.rgb_sensor = get_handle('rgbSensor')
@@ -76,22 +87,37 @@ class YouBot:
         ## Examples: getting information from the simulator (and testing the connection). Stream 
         # wheel angles, Hokuyo data, and robot pose (see usage below). Wheel angles are not used 
         # in this example, but they may be necessary in your project.
-        for wheel_joint in self.wheel_joints:
-            vrep.simxGetJointPosition(wheel_joint, simx_opmode_streaming)
-        vrep.simxGetObjectPosition(self.ref, -1, simx_opmode_streaming)
-        vrep.simxGetObjectOrientation(self.ref, -1, simx_opmode_streaming)
-        vrep.simxReadVisionSensor(self.hokuyo1, simx_opmode_streaming)
-        vrep.simxReadVisionSensor(self.hokuyo2, simx_opmode_streaming)
+        # The robot pose and the wheel and arm joint angles are streamed together, see snapshot.
+        # All the streams are tracked by a registry, see vrep/streams.py.
+        self.streams = StreamRegistry(vrep)
+        self.snapshot_init(vrep)
+        for objectType, dataType in self.pose_snapshot.streams:
+            self.streams.track(objectType, 'group_data', dataType)
+        self.streams.subscribe(self.hokuyo1, 'vision_sensor')
+        self.streams.subscribe(self.hokuyo2, 'vision_sensor')
     
-        # Stream the arm joint angles and the tip position/orientation
-        vrep.simxGetObjectPosition(self.ptip, self.arm_ref, simx_opmode_streaming)
-        vrep.simxGetObjectOrientation(self.otip, self.r22, simx_opmode_streaming)
-        for arm_joint in self.arm_joints:
-            vrep.simxGetJointPosition(arm_joint, simx_opmode_streaming)
+        # Stream the tip position/orientation
+        self.streams.subscribe(self.ptip, 'position', self.arm_ref)
+        self.streams.subscribe(self.otip, 'orientation', self.r22)
     
         # Make sure that all streaming data has reached the client at least once
-        vrep.simxGetPingTime()
+        self.streams.wait()
         
+    def snapshot_init(self, vrep: VRep):
+        # Registers the robot reference, the arm tip and the arm and wheel joints in a pose 
+        # snapshot and streams it. The absolute positions and orientations and the joint states of
+        # all of them are then refreshed with one simxGetObjectGroupData call per object type 
+        # instead of one call per object.
+        self.pose_snapshot = PoseSnapshot([self.ref, self.ptip, self.otip] + self.arm_joints + 
+                                          self.wheel_joints)
+        self.pose_snapshot.start(vrep)
+
+    def snapshot(self, vrep, opmode=simx_opmode_buffer):
+        # Refreshes and returns the pose snapshot, indexed by handle, e.g. 
+        # youbot.snapshot(vrep)[youbot.ref]['position'] or 
+        # youbot.snapshot(vrep)[youbot.arm_joints[0]]['joint_position'].
+        return self.pose_snapshot.fetch(vrep, opmode)
+
     def hokuyo_init(self, vrep: VRep):
         # Initialize Hokuyo sensor in VREP
         # This function starts the Hokuyo sensor, and it computes the transformations
@@ -131,46 +157,56 @@ class YouBot:
         
         # Compute the transformations between the two Hokuyo subsensors and the youBot
         # ref frame h.ref
-        self.hokuyo1_trans = np.asarray(transl(self.hokuyo1_pos) * trotx(self.hokuyo1_euler[0]) * \
-                             troty(self.hokuyo1_euler[1]) * trotz(self.hokuyo1_euler[2]))
-        self.hokuyo2_trans = np.asarray(transl(self.hokuyo2_pos) * trotx(self.hokuyo2_euler[0]) * \
-                             troty(self.hokuyo2_euler[1]) * trotz(self.hokuyo2_euler[2]))
-
-    def hokuyo_read(self, vrep, opmode, trans=None):
-        # Reads from Hokuyo sensor.
-        t1 = self.hokuyo1_trans
-        t2 = self.hokuyo2_trans
-        if trans is not None:
-            t1 = np.dot(trans, self.hokuyo1_trans)
-            t2 = np.dot(trans, self.hokuyo2_trans)
-    
-        # The Hokuyo data comes in a funny format. Use the code below to move it
-        # to a Matlab matrix
-        _, aux_data = vrep.simxReadVisionSensor(self.hokuyo1, opmode)
-        pts1 = np.reshape(aux_data[1][2:], (-1, 4)).T
-        
-        # Each column of pts1 has [xyzdistancetosensor]
-        # The Hokuyo sensor has a range of 5m. If there are no obstacles, a point
-        # is returned at the 5m limit. As we do not want these points, we throw
-        # away all points that are 5m far from the sensor.
-        obst1 = pts1[3, :] < 4.9999
-        pts1 = pts1[:3, :]
+        self.hokuyo1_trans = transl(self.hokuyo1_pos) @ trotx(self.hokuyo1_euler[0]) @ \
+                             troty(self.hokuyo1_euler[1]) @ trotz(self.hokuyo1_euler[2])
+        self.hokuyo2_trans = transl(self.hokuyo2_pos) @ trotx(self.hokuyo2_euler[0]) @ \
+                             troty(self.hokuyo2_euler[1]) @ trotz(self.hokuyo2_euler[2])
+        # The directions of the beams depend on these transformations: they are computed again 
+        # from the next scan (see hokuyo_read)
+        self.hokuyo_geometry = None
 
-        # Process the other 120 degrees      
-        _, aux_data = vrep.simxReadVisionSensor(self.hokuyo2, opmode)
-        pts2 = np.reshape(aux_data[1][2:], (-1, 4)).T
-        obst2 = pts2[3, :] < 4.9999
-        pts2 = pts2[:3, :]
+    def hokuyo_transforms(self):
+        # Rotations (3x3) and translations (3x1) of the two Hokuyo subsensors to the youBot ref 
+        # frame h.ref
+        return [(t[:3, :3], t[:3, 3:]) for t in (self.hokuyo1_trans, self.hokuyo2_trans)]
 
-        scanned_points = np.hstack((homtrans(t1, pts1), homtrans(t2, pts2)))
-        contacts = np.hstack((obst1, obst2))
+    def hokuyo_read(self, vrep, opmode, trans=None):
+        # Reads from Hokuyo sensor. Returns a Scan (see youbot/scan.py): the distance of each 
+        # beam, the points (3xN, in the youBot ref frame or in the frame of trans) and contacts 
+        # being computed when asked for. A scan unpacks as the points and the contacts.
+        #
+        # The Hokuyo data comes in a funny format: each aux packet holds the width and height of 
+        # the sensor, then [xyzdistancetosensor] for each point (viewed as a Nx4 array, without a 
+        # copy). The direction of each beam is computed from the points of the first scan and 
+        # kept (hokuyo_geometry, computed again if the subsensors send another number of beams), 
+        # only the distances are kept afterwards. Until a scan has a point for every beam (e.g. 
+        # before the Hokuyo is turned on), each scan gets the geometry of its own points: its 
+        # points are the raw points transformed to the ref frame.
+        _, aux_data = vrep.simxReadVisionSensor(self.hokuyo1, opmode, asArray=True)
+        pts1 = aux_data[1][2:].reshape((-1, 4))
+        # Process the other 120 degrees
+        _, aux_data = vrep.simxReadVisionSensor(self.hokuyo2, opmode, asArray=True)
+        pts2 = aux_data[1][2:].reshape((-1, 4))
 
-        return scanned_points, contacts
+        n1 = len(pts1)
+        geometry = self.hokuyo_geometry
+        if geometry is None or geometry.widths != (n1, len(pts2)):
+            geometry = BeamGeometry.from_points(self.hokuyo_transforms(), (pts1, pts2))
+            if geometry.complete:
+                self.hokuyo_geometry = geometry
+        ranges = np.empty(n1 + len(pts2), np.float32)
+        ranges[:n1] = pts1[:, 3]
+        ranges[n1:] = pts2[:, 3]
+        return Scan(ranges, geometry, None if trans is None else np.array(trans))
 
-    def xyz_read(self, vrep, opmode):
-        # Read from xyz sensor.
-        det, aux_data = vrep.simxReadVisionSensor(self.xyz_sensor, opmode)
-        pts = np.reshape(aux_data[1][2:], (-1, 4)).T
+    def xyz_read(self, vrep, opmode, transfer=None):
+        # Read from xyz sensor. With a SplitTransfer (see vrep/transfer.py), the point cloud is 
+        # fetched in chunks instead (opmode is then ignored).
+        if transfer is not None:
+            det, aux_data = transfer.fetch('simxReadVisionSensor', self.xyz_sensor, asArray=True)
+        else:
+            det, aux_data = vrep.simxReadVisionSensor(self.xyz_sensor, opmode, asArray=True)
+        pts = aux_data[1][2:].reshape((-1, 4)).T
         
         # Each column of pts has [xyzdistancetosensor]
         pts = pts[:, pts[3, :] < 4.9999]
@@ -229,13 +265,12 @@ class YouBot:
         self.previous_rot_vel = rot_vel
     
         # Communicate the new wheel velocities to the simulator.
-        vrep.simxPauseCommunication(True)
-        vrep.simxSetJointTargetVelocity(self.wheel_joints[0], -forw_back_vel - left_right_vel + 
-                                        rot_vel, simx_opmode_oneshot)
-        vrep.simxSetJointTargetVelocity(self.wheel_joints[1], -forw_back_vel + left_right_vel + 
-                                        rot_vel, simx_opmode_oneshot)
-        vrep.simxSetJointTargetVelocity(self.wheel_joints[2], -forw_back_vel - left_right_vel - 
-                                        rot_vel, simx_opmode_oneshot)
-        vrep.simxSetJointTargetVelocity(self.wheel_joints[3], -forw_back_vel + left_right_vel - 
-                                        rot_vel, simx_opmode_oneshot)
-        vrep.simxPauseCommunication(False)
+        with vrep.batch() as batch:
+            batch.simxSetJointTargetVelocity(self.wheel_joints[0], -forw_back_vel - left_right_vel
+                                             + rot_vel, simx_opmode_oneshot)
+            batch.simxSetJointTargetVelocity(self.wheel_joints[1], -forw_back_vel + left_right_vel
+                                             + rot_vel, simx_opmode_oneshot)
+            batch.simxSetJointTargetVelocity(self.wheel_joints[2], -forw_back_vel - left_right_vel
+                                             - rot_vel, simx_opmode_oneshot)
+            batch.simxSetJointTargetVelocity(self.wheel_joints[3], -forw_back_vel + left_right_vel
+                                             - rot_vel, simx_opmode_oneshot)
@@ -0,0 +1,203 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import numpy as np
+from vrep.const import *
+from vrep.handles import default_cache_dir, scene_fingerprint
+from youbot.mapping import TiledOccupancyGrid
+
+# Occupancy grids kept in memory-mapped files, one per scene, so that a run starts from the map
+# of the previous ones. The file of a scene is keyed by the path of the scene file or, for a scene
+# that was never saved, by the fingerprint of its objects (see vrep/handles.py).
+#
+# A map file is made of:
+# - a header (one page): magic, version, geometry of the grid and size of the pool of tiles;
+# - the tile of each block of the grid (int32, see TiledOccupancyGrid), padded to a page;
+# - the pool of tiles, a record per tile: its log-odds, then its occupied and free bits.
+# All the numbers are little-endian.
+
+map_magic = b'PYTRSMAP'
+map_version = 1
+
+header_dtype = np.dtype([('magic', 'S8'), ('version', '<u4'), ('tile_size', '<u4'),
+                         ('rows', '<u4'), ('cols', '<u4'), ('resolution', '<f8'),
+                         ('origin', '<f8', 2), ('capacity', '<u4'), ('tile_count', '<u4')])
+
+page_size = mmap.ALLOCATIONGRANULARITY
+
+
+def tile_dtype(tile_size):
+    return np.dtype([('log_odds', '<f4', (tile_size, tile_size)),
+                     ('occupied', 'u1', (tile_size, tile_size // 8)),
+                     ('free', 'u1', (tile_size, tile_size // 8))])
+
+
+def scene_key(vrep):
+    # Key of the map of the open scene: the path of its file, or the fingerprint of its objects.
+    path = vrep.simxGetStringParameter(sim_stringparam_scene_path_and_name, simx_opmode_blocking)
+    return path or scene_fingerprint(vrep)
+
+
+def map_path(key, cache_dir=default_cache_dir):
+    # Map file of a scene, given its key (see scene_key)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, 'map_%s.bin' % digest[:16])
+
+
+class MappedOccupancyGrid(TiledOccupancyGrid):
+    """
+    Tiled occupancy grid (see youbot/mapping.py) whose tiles live in a memory-mapped file: opening
+    a map only maps the file (whatever its size, nothing is parsed or copied), and the tiles are
+    read from the file as they are accessed.
+
+        world_map = MappedOccupancyGrid.for_scene(vrep)
+        world_map.integrate(youbot.hokuyo_read(vrep, simx_opmode_buffer, world_trans))
+        ...
+        world_map.flush()
+
+    If the file exists, the geometry of the grid (origin, resolution, shape and size of the tiles)
+    is that of its header, and the given one is ignored; otherwise, the file is created. The
+    mapping is shared: the updates are seen at once by the other processes that map the file, e.g.
+    a planner or a viewer opened with readonly=True. flush() writes to the disk only the tiles
+    updated since the previous flush. There must be a single writer.
+
+    The pool grows by extending the file; a reader maps the new tiles with refresh().
+    """
+
+    def __init__(self, path, origin=(-7.5, -7.5), size=(15., 15.), resolution=.05,
+                 l_occupied=.85, l_free=-.4, l_min=-2., l_max=3.5, tile_size=64, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        # Tiles updated since the last flush
+        self.dirty = set()
+        super().__init__(origin, size, resolution, l_occupied, l_free, l_min, l_max, tile_size)
+
+    @classmethod
+    def for_scene(cls, vrep, cache_dir=default_cache_dir, **kwargs):
+        # Map of the scene open in the simulator of a client
+        return cls(map_path(scene_key(vrep), cache_dir), **kwargs)
+
+    def _allocate(self, capacity=16):
+        if not os.path.exists(self.path):
+            if self.readonly:
+                raise Exception('There is no map %s' % self.path)
+            self._create(capacity)
+        self._map()
+
+    def _layout(self, tile_size, shape):
+        # Blocks of the grid, and offset of the pool of tiles
+        blocks = (-(-shape[0] // tile_size), -(-shape[1] // tile_size))
+        table_size = blocks[0] * blocks[1] * 4
+        return blocks, page_size + -(-table_size // page_size) * page_size
+
+    def _create(self, capacity):
+        header = np.zeros((), header_dtype)
+        header['magic'] = map_magic
+        header['version'] = map_version
+        header['tile_size'] = self.tile_size
+        header['rows'], header['cols'] = self.shape
+        header['resolution'] = self.resolution
+        header['origin'] = self.origin
+        header['capacity'] = capacity
+        # The first tile is the tile of the blocks that were not reached yet
+        header['tile_count'] = 1
+        _, offset = self._layout(self.tile_size, self.shape)
+
+        # Written to a temporary file first: another process may be opening the map
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                    suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header.tobytes())
+            # The rest of the file reads as zeros: empty table and tiles
+            f.truncate(offset + capacity * tile_dtype(self.tile_size).itemsize)
+        os.replace(path, self.path)
+
+    def _map(self):
+        with open(self.path, 'rb' if self.readonly else 'r+b') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0,
+                                   access=mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE)
+        # The arrays are made with np.frombuffer, which holds the buffer of the mapping: the mapping
+        # cannot be closed while they are in use (np.ndarray(buffer=...) would not prevent it)
+        self.header = np.frombuffer(self._mmap, header_dtype, 1).reshape(())
+        if self.header['magic'] != map_magic or self.header['version'] != map_version:
+            raise Exception('%s is not a map of version %d' % (self.path, map_version))
+        self.tile_size = int(self.header['tile_size'])
+        self.shape = (int(self.header['rows']), int(self.header['cols']))
+        self.resolution = float(self.header['resolution'])
+        self.origin = self.header['origin'].astype(np.float32)
+
+        blocks, self._pool_offset = self._layout(self.tile_size, self.shape)
+        self.tile_ids = np.frombuffer(self._mmap, np.int32, blocks[0] * blocks[1],
+                                      page_size).reshape(blocks)
+        pool = np.frombuffer(self._mmap, tile_dtype(self.tile_size), int(self.header['capacity']),
+                             self._pool_offset)
+        self.tiles = pool['log_odds']
+        self.occupied_bits = pool['occupied']
+        self.free_bits = pool['free']
+
+    @property
+    def tile_count(self):
+        return int(self.header['tile_count'])
+
+    @tile_count.setter
+    def tile_count(self, tile_count):
+        self.header['tile_count'] = tile_count
+
+    def _grow(self):
+        # Doubles the pool: the file is extended, then mapped again.
+        capacity = 2 * len(self.tiles)
+        os.truncate(self.path, self._pool_offset + capacity * tile_dtype(self.tile_size).itemsize)
+        self.header['capacity'] = capacity
+        self._remap()
+
+    def refresh(self):
+        # Maps the tiles allocated by the writer since the file was mapped (readers).
+        if self.header['capacity'] != len(self.tiles):
+            self._remap()
+
+    def _release(self):
+        # Drops the arrays of the mapping, then closes it. Raises BufferError if arrays of the
+        # mapping are still used elsewhere (e.g. a tile kept by the caller).
+        del self.header, self.tile_ids, self.tiles, self.occupied_bits, self.free_bits
+        self._mmap.close()
+
+    def _remap(self):
+        # Maps the file again, closing the old mapping.
+        try:
+            self._release()
+        except BufferError:
+            # Arrays of the caller still use the old mapping, which is unmapped when they are
+            # freed; the grid itself goes on with the new one
+            pass
+        self._map()
+
+    def _update_tile(self, tile, window, marks):
+        super()._update_tile(tile, window, marks)
+        self.dirty.add(tile)
+
+    def flush(self):
+        # Writes the tiles updated since the last flush, then the header and the table of the
+        # tiles, to the disk. Returns the number of tiles written.
+        size = tile_dtype(self.tile_size).itemsize
+        ranges = [(self._pool_offset + tile * size, size) for tile in sorted(self.dirty)]
+        for offset, length in ranges + [(0, self._pool_offset)]:
+            # The ranges to flush must start on a page
+            start = offset - offset % page_size
+            self._mmap.flush(start, offset + length - start)
+        self.dirty.clear()
+        return len(ranges)
+
+    def close(self):
+        # Flushes and unmaps the file. Raises BufferError if arrays of the mapping are still in use
+        # (e.g. tiles kept by the caller): they must be dropped first.
+        if not self.readonly:
+            self.flush()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,238 @@
+import numpy as np
+
+# Occupancy-grid mapping from the Hokuyo scans.
+
+
+class OccupancyGrid:
+    """
+    Occupancy grid in log-odds: each cell holds log(p / (1 - p)), p being the probability that the
+    cell is occupied (0 for unknown cells). The grid covers a rectangle of the world (x, y, in m)
+    from origin, and cell [row, col] covers
+    [origin[0] + col * resolution, origin[0] + (col + 1) * resolution) along x and likewise along
+    y with the rows. The default grid covers the house (world/house.ttt).
+
+    Each scan is fused into the grid (integrate): every beam is traced from the sensor to its
+    endpoint, the cells it crosses are free and its endpoint, for the beams that hit an obstacle,
+    is occupied. A cell is updated once per scan, however many beams cross it, and its log-odds
+    are clamped to [l_min, l_max] so that the map can still change.
+
+        grid = OccupancyGrid()
+        grid.integrate(youbot.hokuyo_read(vrep, simx_opmode_buffer, world_trans))
+        world_map = grid.occupied()
+
+    The beams are traced all at once with numpy: each beam is sampled every half cell, and the
+    samples of all the beams are turned into cell indices in one go.
+    """
+
+    def __init__(self, origin=(-7.5, -7.5), size=(15., 15.), resolution=.05, l_occupied=.85,
+                 l_free=-.4, l_min=-2., l_max=3.5):
+        self.origin = np.asarray(origin, np.float32)
+        self.resolution = resolution
+        self.shape = (int(np.ceil(size[1] / resolution)), int(np.ceil(size[0] / resolution)))
+        self.l_occupied = np.float32(l_occupied)
+        self.l_free = np.float32(l_free)
+        self.l_min = l_min
+        self.l_max = l_max
+        self._allocate()
+
+    def _allocate(self):
+        self.log_odds = np.zeros(self.shape, np.float32)
+
+    def cells(self, x, y):
+        # Rows and columns of the cells of the points (x, y), and whether they are in the grid.
+        cols = np.floor((x - self.origin[0]) / self.resolution).astype(np.intp)
+        rows = np.floor((y - self.origin[1]) / self.resolution).astype(np.intp)
+        inside = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        return rows, cols, inside
+
+    def integrate(self, scan):
+        # Fuses a Scan (see youbot/scan.py) into the grid. The scan must be expressed in the frame
+        # of the grid, i.e. read with the transformation of the robot pose in the world frame.
+        origins, directions = scan.geometry.in_frame(scan.trans)
+        # In cells, from the corner of the grid
+        x0 = (origins[0] - self.origin[0]) / self.resolution
+        y0 = (origins[1] - self.origin[1]) / self.resolution
+        ranges = scan.meters() / self.resolution
+        max_range = ranges.max()
+        # Only the window of the grid the beams can reach is updated
+        r0, c0 = max(int(y0.min() - max_range), 0), max(int(x0.min() - max_range), 0)
+        r1 = min(max(int(y0.max() + max_range) + 2, r0), self.shape[0])
+        c1 = min(max(int(x0.max() + max_range) + 2, c0), self.shape[1])
+        if r1 <= r0 or c1 <= c0:
+            return
+        x0 -= c0
+        y0 -= r0
+        # Cells of the window: 1 for free, 2 for occupied (0 elsewhere)
+        marks = np.zeros((r1 - r0, c1 - c0), np.uint8)
+
+        # Samples every half cell along all the beams (one row per beam), from the sensor up to 
+        # the endpoint (excluded)
+        t = np.arange(np.ceil(max_range * 2), dtype=np.float32) / 2
+        free = self._cells(marks.shape, x0[:, None] + directions[0, :, None] * t,
+                           y0[:, None] + directions[1, :, None] * t, t < ranges[:, None])
+
+        # Endpoints of the beams that hit an obstacle
+        hits = scan.contacts
+        occupied = self._cells(marks.shape, x0[hits] + directions[0, hits] * ranges[hits],
+                               y0[hits] + directions[1, hits] * ranges[hits])
+
+        marks.reshape(-1)[free] = 1
+        marks.reshape(-1)[occupied] = 2
+        self.update((slice(r0, r1), slice(c0, c1)), marks)
+
+    @staticmethod
+    def _cells(shape, x, y, mask=True):
+        # Indices in a flattened window of the given shape of the cells of the points (x, y, in
+        # cells from the corner of the window) that are in the window (and in the mask). The
+        # coordinates are shifted to be positive before being truncated, and the negative indices
+        # become large unsigned ones.
+        cols = (x + 1024).astype(np.int32) - 1024
+        rows = (y + 1024).astype(np.int32) - 1024
+        inside = mask & (cols.view(np.uint32) < shape[1]) & (rows.view(np.uint32) < shape[0])
+        return (rows * shape[1] + cols)[inside]
+
+    def update(self, window, marks, log_odds=None):
+        # Adds the log-odds of the marked cells of a window of the grid (or of the given array),
+        # and clamps them.
+        log_odds = (self.log_odds if log_odds is None else log_odds)[window]
+        log_odds[marks == 1] += self.l_free
+        log_odds[marks == 2] += self.l_occupied
+        np.clip(log_odds, self.l_min, self.l_max, out=log_odds)
+
+    def probabilities(self):
+        # Probability that each cell is occupied
+        return 1 - 1 / (1 + np.exp(self.log_odds))
+
+    def occupied(self, threshold=0.):
+        # The cells whose log-odds are above the threshold (0: more likely occupied than free)
+        return self.log_odds > threshold
+
+    def packed_occupied(self):
+        # The occupied cells, 8 per byte along the rows (see np.unpackbits)
+        return np.packbits(self.log_odds > 0, axis=1)
+
+    def packed_free(self):
+        return np.packbits(self.log_odds < 0, axis=1)
+
+    def log_odds_at(self, rows, cols):
+        # Log-odds of the cells [rows, cols], which must be in the grid.
+        return self.log_odds[rows, cols]
+
+    def occupied_at(self, x, y):
+        # Whether the points (x, y, in m) are in occupied cells (False outside of the grid), e.g.
+        # to check a path or the footprint of the robot for collisions.
+        rows, cols, inside = self.cells(np.asarray(x), np.asarray(y))
+        return inside & (self.log_odds_at(rows * inside, cols * inside) > 0)
+
+    def nbytes(self):
+        return self.log_odds.nbytes
+
+
+class TiledOccupancyGrid(OccupancyGrid):
+    """
+    Occupancy grid stored in square tiles of tile_size cells (a multiple of 8), which are only
+    allocated when a scan reaches them: the memory grows with the explored area rather than with
+    the rectangle covered by the grid, which can then be much larger (or finer) than the house.
+
+    Besides its log-odds (float32), each tile keeps its occupied and free cells as bits
+    (np.packbits, 8 cells per byte), updated with the log-odds, for the planners: packed_occupied
+    and packed_free assemble them for the whole grid without unpacking them, and occupied_at reads
+    them directly for collision queries.
+
+    The tiles are stacked in a pool (tiles, occupied_bits and free_bits) that doubles when full,
+    and tile_ids gives the tile of each block of the grid. The first tile of the pool is the tile
+    of all the blocks that were not reached yet: it is never written, so it reads as unknown, and
+    the reads of any cells are vectorized without checking which tiles exist.
+    """
+
+    def __init__(self, origin=(-7.5, -7.5), size=(15., 15.), resolution=.05, l_occupied=.85,
+                 l_free=-.4, l_min=-2., l_max=3.5, tile_size=64):
+        if tile_size % 8:
+            raise Exception('The size of the tiles must be a multiple of 8')
+        self.tile_size = tile_size
+        super().__init__(origin, size, resolution, l_occupied, l_free, l_min, l_max)
+
+    def _allocate(self, capacity=16):
+        size = self.tile_size
+        blocks = (-(-self.shape[0] // size), -(-self.shape[1] // size))
+        self.tile_ids = np.zeros(blocks, np.int32)
+        self.tile_count = 1
+        self.tiles = np.zeros((capacity, size, size), np.float32)
+        self.occupied_bits = np.zeros((capacity, size, size // 8), np.uint8)
+        self.free_bits = np.zeros((capacity, size, size // 8), np.uint8)
+
+    def _tile(self, block):
+        # Tile of a block of the grid, allocated if there is none yet.
+        tile = self.tile_ids[block]
+        if tile:
+            return tile
+        if self.tile_count == len(self.tiles):
+            self._grow()
+        tile = self.tile_ids[block] = self.tile_count
+        self.tile_count += 1
+        return tile
+
+    def _grow(self):
+        # Doubles the pool.
+        self.tiles, self.occupied_bits, self.free_bits = [
+            np.concatenate((pool, np.zeros_like(pool)))
+            for pool in (self.tiles, self.occupied_bits, self.free_bits)]
+
+    def update(self, window, marks):
+        size = self.tile_size
+        rows, cols = window
+        for block_row in range(rows.start // size, (rows.stop - 1) // size + 1):
+            # Rows of the window in the block, in the block and in the window
+            r0, r1 = max(rows.start, block_row * size), min(rows.stop, (block_row + 1) * size)
+            for block_col in range(cols.start // size, (cols.stop - 1) // size + 1):
+                c0, c1 = max(cols.start, block_col * size), min(cols.stop, (block_col + 1) * size)
+                block_marks = marks[r0 - rows.start:r1 - rows.start,
+                                    c0 - cols.start:c1 - cols.start]
+                if not block_marks.any():
+                    continue
+                self._update_tile(self._tile((block_row, block_col)),
+                                  (slice(r0 - block_row * size, r1 - block_row * size),
+                                   slice(c0 - block_col * size, c1 - block_col * size)),
+                                  block_marks)
+
+    def _update_tile(self, tile, window, marks):
+        # Updates a window of a tile, and its bits.
+        log_odds = self.tiles[tile]
+        super().update(window, marks, log_odds)
+        self.occupied_bits[tile] = np.packbits(log_odds > 0, axis=1)
+        self.free_bits[tile] = np.packbits(log_odds < 0, axis=1)
+
+    def _assemble(self, pool):
+        # The tiles of a pool laid out as the whole grid
+        blocks = self.tile_ids.shape
+        grid = pool[self.tile_ids].transpose(0, 2, 1, 3)
+        return grid.reshape(blocks[0] * pool.shape[1], blocks[1] * pool.shape[2])
+
+    @property
+    def log_odds(self):
+        # A dense copy of the log-odds
+        return self._assemble(self.tiles)[:self.shape[0], :self.shape[1]]
+
+    def packed_occupied(self):
+        return self._assemble(self.occupied_bits)[:self.shape[0], :-(-self.shape[1] // 8)]
+
+    def packed_free(self):
+        return self._assemble(self.free_bits)[:self.shape[0], :-(-self.shape[1] // 8)]
+
+    def log_odds_at(self, rows, cols):
+        size = self.tile_size
+        return self.tiles[self.tile_ids[rows // size, cols // size], rows % size, cols % size]
+
+    def occupied_at(self, x, y):
+        # Reads the bits of the tiles rather than their log-odds.
+        size = self.tile_size
+        rows, cols, inside = self.cells(np.asarray(x), np.asarray(y))
+        rows, cols = rows * inside, cols * inside
+        bits = self.occupied_bits[self.tile_ids[rows // size, cols // size], rows % size,
+                                  (cols % size) >> 3]
+        return inside & ((bits >> (7 - (cols & 7))) & 1).astype(bool)
+
+    def nbytes(self):
+        # Memory of the tiles in use (and of the table of the tiles)
+        tile = self.tiles[0].nbytes + self.occupied_bits[0].nbytes + self.free_bits[0].nbytes
+        return self.tile_count * tile + self.tile_ids.nbytes
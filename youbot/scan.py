@@ -0,0 +1,149 @@
+import numpy as np
+
+# Hokuyo scans, in polar form.
+#
+# The Hokuyo sends a point [xyzdistancetosensor] per beam, but the direction of each beam is
+# fixed with respect to the robot: it is computed once from the points of a scan and the
+# transforms of the subsensors (BeamGeometry), and a scan only keeps the distance of each beam
+# (Scan), as float32 meters or as uint16 millimeters. The Cartesian points are only computed when
+# they are asked for.
+
+# Range of the Hokuyo sensor (in m). If there are no obstacles, a point is returned at this limit,
+# and a beam is a contact if its distance is shorter than that (by more than range_tolerance, the
+# distance of the points at the limit is not exactly 5 m).
+hokuyo_range = 5.
+range_tolerance = 1e-4
+
+
+class BeamGeometry:
+    """
+    Origin and direction (unit vector) of each beam of the Hokuyo, in the youBot ref frame (3xN
+    float32 arrays), and its angle around the z axis of that frame. widths is the number of beams
+    of each subsensor.
+    """
+
+    def __init__(self, origins, directions, widths=None):
+        self.origins = origins
+        self.directions = directions
+        self.widths = tuple(widths) if widths is not None else (directions.shape[1],)
+        self.angles = np.arctan2(directions[1], directions[0]).astype(np.float32)
+        # Origins and directions in the frame of the last pose (see in_frame)
+        self._pose = None
+        # Buffer of the points, and the scan they were last computed for (see points_buffer)
+        self._points = None
+        self._owner = None
+
+    @classmethod
+    def from_points(cls, transforms, packets):
+        # Geometry of the beams of the subsensors, given their rotations (3x3) and translations
+        # (3x1) to the ref frame and the points of a scan of each one (Nx4: xyz and distance in
+        # the frame of the subsensor). The subsensors are vision sensors: the direction of a beam
+        # is that of its point, whatever the projection. A beam without a point (all zeros, e.g.
+        # before the Hokuyo is turned on) is left without a direction (see complete).
+        origins, directions, widths = [], [], []
+        for (rotation, translation), points in zip(transforms, packets):
+            norms = np.linalg.norm(points[:, :3], axis=1)
+            norms[norms < 1e-9] = np.inf
+            directions.append(np.dot(rotation, (points[:, :3] / norms[:, None]).T))
+            origins.append(np.repeat(np.reshape(translation, (3, 1)), len(points), axis=1))
+            widths.append(len(points))
+        return cls(np.hstack(origins).astype(np.float32), np.hstack(directions).astype(np.float32),
+                   widths)
+
+    @property
+    def complete(self):
+        # Whether every beam has a direction
+        return bool(np.all(np.any(self.directions != 0, axis=0)))
+
+    def __len__(self):
+        return self.directions.shape[1]
+
+    def points_buffer(self, scan):
+        # The buffer the points of scan are computed in (3xN float32), allocated once: the scan
+        # the points were computed for before computes them again if they are asked for.
+        if self._owner is not None and self._owner is not scan:
+            self._owner._points = None
+        if self._points is None:
+            self._points = np.empty(self.directions.shape, np.float32)
+        self._owner = scan
+        return self._points
+
+    def in_frame(self, trans=None):
+        # Origins and directions in the frame of trans (4x4, e.g. the world frame given the pose of
+        # the robot). Computed once per pose: the last ones are reused while trans is the same.
+        if trans is None:
+            return self.origins, self.directions
+        if self._pose is not None and np.array_equal(self._pose[0], trans):
+            return self._pose[1]
+        rotation = np.asarray(trans, np.float32)[:3, :3]
+        translation = np.asarray(trans, np.float32)[:3, 3:]
+        frame = (np.dot(rotation, self.origins) + translation, np.dot(rotation, self.directions))
+        self._pose = (np.array(trans), frame)
+        return frame
+
+
+class Scan:
+    """
+    A Hokuyo scan: the distance of each beam, as float32 meters or uint16 millimeters (see
+    quantized), along with the geometry of the beams and the frame (trans, 4x4) the points are
+    expressed in. A scan still unpacks like the former (points, contacts) pair:
+
+        pts, contacts = youbot.hokuyo_read(vrep, simx_opmode_buffer)
+
+    The points (3xN) and contacts (N booleans) are only computed on first access. The points are
+    computed in a buffer of the geometry, shared by all its scans (no allocation per scan): the
+    array is only valid until the points of another scan are computed, use np.array(scan.points)
+    to keep it (the scan itself computes its points again when they are asked for).
+    """
+
+    __slots__ = ('ranges', 'geometry', 'trans', '_points', '_contacts')
+
+    def __init__(self, ranges, geometry, trans=None):
+        self.ranges = ranges
+        self.geometry = geometry
+        self.trans = trans
+        self._points = None
+        self._contacts = None
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def meters(self):
+        # The distances in meters (float32)
+        if self.ranges.dtype == np.uint16:
+            return self.ranges * np.float32(.001)
+        return self.ranges
+
+    @property
+    def points(self):
+        if self._points is None:
+            origins, directions = self.geometry.in_frame(self.trans)
+            points = self.geometry.points_buffer(self)
+            np.multiply(directions, self.meters(), out=points)
+            points += origins
+            self._points = points
+        return self._points
+
+    @property
+    def contacts(self):
+        if self._contacts is None:
+            self._contacts = self.meters() < hokuyo_range - range_tolerance
+        return self._contacts
+
+    def __iter__(self):
+        yield self.points
+        yield self.contacts
+
+    def nbytes(self):
+        # Size of the scan itself (the geometry is shared by all the scans)
+        return self.ranges.nbytes
+
+    def quantized(self):
+        # The scan with its distances in millimeters (uint16), half the size of a float32 scan.
+        if self.ranges.dtype == np.uint16:
+            return self
+        ranges = np.rint(self.ranges * 1000).astype(np.uint16)
+        return Scan(ranges, self.geometry, self.trans)
+
+    def copy(self):
+        return Scan(self.ranges.copy(), self.geometry, self.trans)
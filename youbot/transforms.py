@@ -1,6 +1,6 @@
 import numpy as np
 
-# For functions that are missing from robopy
+# Functions of the Robotics Toolbox (the few that are used, without importing robopy)
 
 
 # Copyright (C) 1993-2014, by Peter I. Corke
@@ -23,6 +23,40 @@ import numpy as np
 # http://www.petercorke.com
 
 
+# TRANSL Create or unpack an SE(3) translational homogeneous transform
+#
+# T = TRANSL(P) is an SE(3) homogeneous transform (4x4) representing a pure translation of 
+# P = [X, Y, Z]. (Unlike robopy, the transforms of this file are plain arrays, not matrices: 
+# compose them with @ or np.dot. They also spare the import of robopy, and of vtk with it.)
+def transl(p) -> np.ndarray:
+    t = np.eye(4)
+    t[:3, 3] = p
+    return t
+
+# TROTX Rotation about X axis
+#
+# T = TROTX(THETA) is a homogeneous transformation (4x4) representing a rotation of THETA 
+# radians about the x-axis.
+def trotx(theta: float) -> np.ndarray:
+    c, s = np.cos(theta), np.sin(theta)
+    return np.array([[1, 0, 0, 0], [0, c, -s, 0], [0, s, c, 0], [0, 0, 0, 1]])
+
+# TROTY Rotation about Y axis
+#
+# T = TROTY(THETA) is a homogeneous transformation (4x4) representing a rotation of THETA 
+# radians about the y-axis.
+def troty(theta: float) -> np.ndarray:
+    c, s = np.cos(theta), np.sin(theta)
+    return np.array([[c, 0, s, 0], [0, 1, 0, 0], [-s, 0, c, 0], [0, 0, 0, 1]])
+
+# TROTZ Rotation about Z axis
+#
+# T = TROTZ(THETA) is a homogeneous transformation (4x4) representing a rotation of THETA 
+# radians about the z-axis.
+def trotz(theta: float) -> np.ndarray:
+    c, s = np.cos(theta), np.sin(theta)
+    return np.array([[c, -s, 0, 0], [s, c, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+
 # Euclidean to homogeneous
 # 
 # H = e2h(E) is the homogeneous version (K+1xN) of the Euclidean points E (KxN) where each 